@@ -1,30 +1,184 @@
 """API v1 route handlers."""
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
 from datetime import datetime
+from typing import AsyncIterator, List, NoReturn, Tuple
+import asyncio
+import math
 import time
 
-from models.schemas import HealthResponse, PricingResult, ErrorDetail, CardInfo, PricingData, ScanMetadata
+from models.schemas import (
+    HealthResponse,
+    PricingResult,
+    ErrorDetail,
+    CardInfo,
+    PricingData,
+    ScanMetadata,
+    BatchScanItem,
+    BatchScanMetadata,
+    BatchScanResult,
+    PriceHistoryResult,
+    PriceSource,
+    PricingSummary,
+    ScanJobStatus,
+    UpstreamHealth
+)
 from config import settings
+from utils.circuit_breaker import CLOSED
+from utils.deadline import Deadline
 from utils.error_handlers import (
+    BaseCardScannerException,
     OCRFailedException,
+    OCRUnavailableException,
     CardNotFoundException,
     PricingUnavailableException,
-    InvalidImageException
+    PricingRateLimitedException,
+    InvalidImageException,
+    JobNotFoundException,
+    ScanQueueFullException,
+    TooManyImagesException
+)
+from utils.log import get_logger, log_pipeline
+from utils.metrics import (
+    MetricFamily,
+    metrics_registry,
+    open_stage,
+    record_stage_since_start,
+    stage,
+    stage_breakdown
 )
+from utils.responses import ModelResponse, encode_model
+from utils.uploads import batch_image_limit, read_image_upload, upload_budget
 
 router = APIRouter()
 
+logger = get_logger("Scan")
+
+# HTTP status and error code returned for each domain exception
+ERROR_RESPONSES = (
+    (InvalidImageException, status.HTTP_400_BAD_REQUEST, "INVALID_IMAGE"),
+    (TooManyImagesException, status.HTTP_400_BAD_REQUEST, "TOO_MANY_IMAGES"),
+    (OCRFailedException, status.HTTP_400_BAD_REQUEST, "OCR_FAILED"),
+    (OCRUnavailableException, status.HTTP_503_SERVICE_UNAVAILABLE, "OCR_UNAVAILABLE"),
+    (CardNotFoundException, status.HTTP_404_NOT_FOUND, "CARD_NOT_FOUND"),
+    (PricingRateLimitedException, status.HTTP_503_SERVICE_UNAVAILABLE, "PRICING_RATE_LIMITED"),
+    (PricingUnavailableException, status.HTTP_503_SERVICE_UNAVAILABLE, "PRICING_UNAVAILABLE"),
+    (ScanQueueFullException, status.HTTP_429_TOO_MANY_REQUESTS, "SCAN_QUEUE_FULL"),
+    (JobNotFoundException, status.HTTP_404_NOT_FOUND, "JOB_NOT_FOUND"),
+)
+
+
+def _error_detail(error: Exception) -> Tuple[int, ErrorDetail]:
+    """
+    Map an exception raised while scanning to an HTTP status and ErrorDetail.
+
+    Args:
+        error: Exception from validation, OCR or pricing
+
+    Returns:
+        Tuple of (HTTP status code, ErrorDetail)
+    """
+    if isinstance(error, BaseCardScannerException):
+        for exception_type, status_code, code in ERROR_RESPONSES:
+            if isinstance(error, exception_type):
+                return status_code, ErrorDetail(code=code, message=error.message, details=error.details)
+
+    return status.HTTP_500_INTERNAL_SERVER_ERROR, ErrorDetail(
+        code="INTERNAL_ERROR",
+        message="An unexpected error occurred. Please try again.",
+        details={"error": str(error)}
+    )
+
+
+def _raise_http(error: Exception) -> NoReturn:
+    """
+    Raise the HTTPException for an exception raised while scanning.
+
+    Errors with a retry_after_s detail get a matching Retry-After header.
+
+    Args:
+        error: Exception from validation, OCR or pricing
+
+    Raises:
+        HTTPException: Always, with the status and ErrorDetail of _error_detail
+    """
+    status_code, detail = _error_detail(error)
+    retry_after = detail.details.get("retry_after_s") if detail.details else None
+    headers = {"Retry-After": str(math.ceil(retry_after))} if retry_after else None
+    raise HTTPException(status_code=status_code, detail={"error": detail.model_dump()}, headers=headers)
+
+
+def _validate_content_type(image: UploadFile) -> None:
+    """
+    Check that an upload declares an image content type.
+
+    Raises:
+        InvalidImageException: If the content type is missing or not image/*
+    """
+    if not image.content_type or not image.content_type.startswith("image/"):
+        logger.warning("invalid_content_type", content_type=image.content_type, filename=image.filename)
+        raise InvalidImageException(
+            "Invalid image format. Please upload a JPEG or PNG image.",
+            details={"content_type": image.content_type}
+        )
+
+
+async def _prepare_image(image: UploadFile) -> bytes:
+    """
+    Validate, read and preprocess one uploaded card image.
+
+    Returns:
+        Image bytes ready for OCR
+
+    Raises:
+        InvalidImageException: If the upload is not an image or is too large
+    """
+    from services.image_preprocessor import image_preprocessor
+
+    _validate_content_type(image)
+    with stage("image_read"):
+        image_bytes = await read_image_upload(
+            image,
+            max_bytes=settings.max_upload_bytes,
+            chunk_size=settings.upload_chunk_bytes
+        )
+    return await image_preprocessor.preprocess(image_bytes)
+
+
+def _stages_ms():
+    """This request's per-stage timings for ScanMetadata, if enabled."""
+    return stage_breakdown() if settings.metrics_stage_breakdown else None
+
+
+def _stream_event(event: str, payload: BaseModel, sse: bool) -> bytes:
+    """
+    Encode one /scan/stream event as an NDJSON line or a Server-Sent Event.
+
+    Args:
+        event: Event name (card, price, pricing, metadata or error)
+        payload: Event data
+        sse: Encode as text/event-stream instead of NDJSON
+
+    Returns:
+        Encoded event; the data is encoded as in the non-streaming
+        responses (see ModelResponse)
+    """
+    data = encode_model(payload)
+    if sse:
+        return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+    return b'{"event":"' + event.encode() + b'","data":' + data + b"}\n"
+
 
 @router.post("/scan-debug")
 async def scan_debug(image: UploadFile = File(...)):
     """Debug endpoint - logs everything about the upload without validation."""
-    print(f"[SCAN-DEBUG] ===== DEBUG REQUEST =====")
-    print(f"[SCAN-DEBUG] filename: {image.filename}")
-    print(f"[SCAN-DEBUG] content_type: '{image.content_type}'")
-    print(f"[SCAN-DEBUG] content_type repr: {repr(image.content_type)}")
-    print(f"[SCAN-DEBUG] content_type is None: {image.content_type is None}")
-    print(f"[SCAN-DEBUG] content_type == '': {image.content_type == ''}")
-    print(f"[SCAN-DEBUG] =======================")
+    logger.info(
+        "scan_debug",
+        filename=image.filename,
+        content_type=image.content_type,
+        content_type_repr=repr(image.content_type),
+    )
     return {
         "filename": image.filename,
         "content_type": image.content_type,
@@ -37,20 +191,185 @@ async def health_check():
     """
     Health check endpoint.
 
-    Returns the status of the API and its dependencies.
+    Returns the status of the API and its dependencies: each upstream's
+    circuit breaker state and call latency (moving average and p95). The
+    status is "degraded" while any circuit is open or half-open.
     """
-    # TODO: Add actual dependency checks (Google Vision, Pokemon TCG API)
+    from services.ocr_service import ocr_service
+    from services.price_service import price_service
+
+    upstreams = {
+        "google_vision": UpstreamHealth(**ocr_service.health()),
+        "pokemon_tcg_api": UpstreamHealth(**price_service.tcg_client.health()),
+    }
+    healthy = all(upstream.state == CLOSED for upstream in upstreams.values())
     return HealthResponse(
-        status="healthy",
+        status="healthy" if healthy else "degraded",
         version=settings.app_version,
         dependencies={
-            "google_vision": "ok",  # Placeholder
-            "pokemon_tcg_api": "ok"  # Placeholder
+            name: "ok" if upstream.state == CLOSED else upstream.state
+            for name, upstream in upstreams.items()
         },
+        upstreams=upstreams,
         timestamp=datetime.utcnow()
     )
 
 
+@router.get("/stats")
+async def runtime_stats():
+    """
+    Runtime statistics for capacity planning.
+
+    Returns per-worker counters such as HTTP connection pool usage and
+    cache hit ratios.
+    """
+    from services.continuous_scan import continuous_scan_metrics
+    from services.image_preprocessor import image_preprocessor
+    from services.ocr_service import ocr_service
+    from services.price_service import price_service
+    from services.scan_jobs import scan_jobs
+
+    return {
+        "preprocessing": image_preprocessor.stats(),
+        "upload_budget": upload_budget.stats(),
+        "ocr": ocr_service.concurrency_stats(),
+        "ocr_cache": ocr_service.result_cache.stats() if ocr_service.result_cache else None,
+        "tcg_http_pool": price_service.tcg_client.pool_stats(),
+        "tcg_rate_limit": price_service.tcg_client.rate_limit_stats(),
+        "tcg_hedging": price_service.tcg_client.hedging_stats(),
+        "price_cache": price_service.cache_stats(),
+        "price_providers": price_service.provider_stats(),
+        "prewarm": price_service.prewarm.stats() if price_service.prewarm else None,
+        "price_history": price_service.history.stats() if price_service.history else None,
+        "tcg_search": price_service.tcg_client.search_stats(),
+        "tcg_search_coalescing": price_service.tcg_client.search_flight.stats(),
+        "card_catalog": price_service.tcg_client.catalog.stats() if price_service.tcg_client.catalog else None,
+        "card_names": ocr_service.name_index.stats(),
+        "continuous_scan": continuous_scan_metrics.stats(),
+        "scan_jobs": scan_jobs.stats(),
+        "logging": log_pipeline.stats()
+    }
+
+
+def _runtime_metrics() -> List[MetricFamily]:
+    """Read upstream, cache and queue counters from the services for /metrics."""
+    from services.continuous_scan import continuous_scan_metrics
+    from services.ocr_service import ocr_service
+    from services.price_service import price_service
+    from services.scan_jobs import scan_jobs
+
+    pools = {"pokemon_tcg_api": price_service.tcg_client.http}
+    if price_service.marketplace_http is not None:
+        pools["price_marketplaces"] = price_service.marketplace_http
+    breakers = {"google_vision": ocr_service.breaker, "pokemon_tcg_api": price_service.tcg_client.breaker}
+
+    # Stale price hits are served from the cache too; near OCR hits likewise
+    price_cache = price_service.card_cache.stats()
+    caches = {"price": (price_cache["hits"] + price_cache["stale_hits"], price_cache["misses"], price_cache["size"])}
+    if ocr_service.result_cache is not None:
+        ocr_cache = ocr_service.result_cache.stats()
+        caches["ocr"] = (ocr_cache["exact_hits"] + ocr_cache["near_hits"], ocr_cache["misses"], ocr_cache["size"])
+
+    return [
+        MetricFamily(
+            "upstream_responses_total", "counter", "Upstream HTTP responses by status code",
+            ("upstream", "status"),
+            [((name, str(code)), count) for name, pool in pools.items() for code, count in pool.monitor.responses.items()],
+        ),
+        MetricFamily(
+            "upstream_errors_total", "counter", "Upstream HTTP requests failed without a response, by error type",
+            ("upstream", "error"),
+            [((name, error), count) for name, pool in pools.items() for error, count in pool.monitor.errors.items()],
+        ),
+        MetricFamily(
+            "upstream_calls_total", "counter", "Upstream calls by circuit breaker outcome",
+            ("upstream", "outcome"),
+            [
+                ((name, outcome), getattr(breaker, field))
+                for name, breaker in breakers.items()
+                for outcome, field in (("success", "successes"), ("failure", "failures"), ("rejected", "rejected"))
+            ],
+        ),
+        MetricFamily(
+            "upstream_requests_in_flight", "gauge", "Upstream requests in progress",
+            ("upstream",),
+            [(("google_vision",), ocr_service.pending)]
+            + [((name,), pool.monitor.requests_in_flight) for name, pool in pools.items()],
+        ),
+        MetricFamily(
+            "cache_hits_total", "counter", "Cache lookups answered from the cache",
+            ("cache",), [((name,), hits) for name, (hits, _, _) in caches.items()],
+        ),
+        MetricFamily(
+            "cache_misses_total", "counter", "Cache lookups not found in the cache",
+            ("cache",), [((name,), misses) for name, (_, misses, _) in caches.items()],
+        ),
+        MetricFamily(
+            "cache_entries", "gauge", "Entries held in the cache",
+            ("cache",), [((name,), size) for name, (_, _, size) in caches.items()],
+        ),
+        MetricFamily("scan_jobs_queued", "gauge", "Scan jobs waiting for a worker", (), [((), scan_jobs.depth)]),
+        MetricFamily(
+            "scan_jobs_running", "gauge", "Scan jobs being processed", (),
+            [((), scan_jobs.stats()["running"])],
+        ),
+        MetricFamily(
+            "upload_budget_in_use_bytes", "gauge", "Upload bytes held in memory by admitted scans", (),
+            [((), upload_budget.in_use)],
+        ),
+        MetricFamily(
+            "continuous_scan_sessions_active", "gauge", "Open /scan/live sessions", (),
+            [((), continuous_scan_metrics.sessions_active)],
+        ),
+    ]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Metrics in the Prometheus text exposition format.
+
+    Per-stage scan latency (upload, image read, preprocessing, OCR cache
+    lookup, Vision, parsing, card lookup, price providers, serialization
+    and, for jobs, queue wait), HTTP request counts and latency by route,
+    upstream status codes, cache hits and misses, and in-flight counts.
+    Values are per worker process.
+    """
+    return PlainTextResponse(
+        metrics_registry.render(_runtime_metrics()),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+@router.get("/prices/{card_id}/history", response_model=PriceHistoryResult)
+async def price_history(card_id: str):
+    """
+    Rolling price statistics for a card from recorded history.
+
+    Served from the local price history only; no upstream call is made.
+
+    Args:
+        card_id: Pokemon TCG API card ID (e.g., "base1-4")
+
+    Returns:
+        PriceHistoryResult with 7d/30d/90d windows
+
+    Raises:
+        HTTPException: 404 if no prices have been recorded for the card
+    """
+    from services.price_service import price_service
+
+    windows = price_service.history.windows(card_id) if price_service.history else {}
+    if not windows:
+        error = CardNotFoundException(
+            f"No price history recorded for card '{card_id}'.",
+            details={"card_id": card_id}
+        )
+        _raise_http(error)
+
+    return PriceHistoryResult(card_id=card_id, windows=windows)
+
+
 @router.post("/scan", response_model=PricingResult)
 async def scan_card(image: UploadFile = File(...)):
     """
@@ -65,112 +384,313 @@ async def scan_card(image: UploadFile = File(...)):
     Raises:
         400: Invalid image or OCR failed
         404: Card not found in database
-        503: Pricing service unavailable
+        413: Upload larger than the limit (rejected before the body is read)
+        503: OCR or pricing service unavailable, rate limited (with
+            Retry-After) or out of scan time, or upload budget exhausted
     """
     start_time = time.time()
+    # One time budget for the whole scan; each stage gets what is left
+    deadline = Deadline(settings.scan_deadline_ms / 1000)
+    # Receiving and parsing the multipart upload happens before the handler
+    record_stage_since_start("upload")
 
     try:
-        # Log incoming request details for debugging
-        print(f"[DEBUG] ===== NEW REQUEST =====")
-        print(f"[DEBUG] filename: {image.filename}")
-        print(f"[DEBUG] content_type: '{image.content_type}'")
-        print(f"[DEBUG] content_type is None: {image.content_type is None}")
-        print(f"[DEBUG] content_type type: {type(image.content_type)}")
-        if image.content_type:
-            print(f"[DEBUG] content_type starts with 'image/': {image.content_type.startswith('image/')}")
-        print(f"[DEBUG] =======================")
-
-        # Validate image
-        if not image.content_type or not image.content_type.startswith("image/"):
-            print(f"[ERROR] Invalid content_type: '{image.content_type}'")
-            raise InvalidImageException(
-                "Invalid image format. Please upload a JPEG or PNG image.",
-                details={"content_type": image.content_type}
-            )
-
-        # Read image bytes
-        image_bytes = await image.read()
-
-        if len(image_bytes) > 5 * 1024 * 1024:  # 5MB limit
-            raise InvalidImageException(
-                "Image file too large. Maximum size is 5MB.",
-                details={"size_bytes": len(image_bytes)}
-            )
+        # Upload details for debugging (discarded unless LOG_LEVEL=DEBUG)
+        logger.debug("scan_upload", filename=image.filename, content_type=image.content_type)
 
         # Import services (lazy import to avoid circular dependencies)
         from services.ocr_service import ocr_service
         from services.price_service import price_service
 
+        # Validate and read in chunks, rejecting oversized or non-image
+        # uploads early (the upload_admission middleware holds this upload's
+        # memory budget), then orient, downscale and re-encode for Vision
+        image_bytes = await _prepare_image(image)
+
         # Extract card info using OCR
-        card_info = await ocr_service.extract_card_info(image_bytes)
+        card_info = await ocr_service.extract_card_info(image_bytes, deadline=deadline)
 
         # Get pricing data
-        pricing_data = await price_service.get_pricing(card_info)
+        pricing_data = await price_service.get_pricing(card_info, deadline=deadline)
 
-        # Calculate total scan time
-        scan_time_ms = int((time.time() - start_time) * 1000)
-
-        return PricingResult(
+        # Building and encoding the response is timed until it is sent;
+        # the result is encoded as built, without response_model validation
+        open_stage("serialize")
+        return ModelResponse(PricingResult(
             card=card_info,
             pricing=pricing_data,
-            metadata=ScanMetadata(
-                scan_time_ms=scan_time_ms,
-                confidence_score=0.95  # TODO: Get actual confidence from OCR
-            )
-        )
+            metadata=ScanMetadata.for_scan(start_time, _stages_ms())
+        ))
 
-    except InvalidImageException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "error": {
-                    "code": "INVALID_IMAGE",
-                    "message": e.message,
-                    "details": e.details
-                }
-            }
-        )
-    except OCRFailedException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "error": {
-                    "code": "OCR_FAILED",
-                    "message": e.message,
-                    "details": e.details
-                }
-            }
-        )
-    except CardNotFoundException as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "error": {
-                    "code": "CARD_NOT_FOUND",
-                    "message": e.message,
-                    "details": e.details
-                }
-            }
-        )
-    except PricingUnavailableException as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={
-                "error": {
-                    "code": "PRICING_UNAVAILABLE",
-                    "message": e.message,
-                    "details": e.details
-                }
-            }
+    except Exception as e:
+        _raise_http(e)
+
+
+@router.post("/scan/stream")
+async def scan_card_stream(request: Request, image: UploadFile = File(...)):
+    """
+    Scan a Pokemon card, streaming results as each stage finishes.
+
+    The response is NDJSON (one `{"event": ..., "data": ...}` object per
+    line), or Server-Sent Events when the request accepts
+    `text/event-stream`. Events, in order:
+
+    - `card`: CardInfo, as soon as OCR has identified the card
+    - `price`: one PriceSource per source, as each price provider answers
+    - `pricing`: PricingSummary with statistics over all sources
+    - `metadata`: ScanMetadata; the stream ends after it
+
+    A pricing failure after the card was sent ends the stream with an
+    `error` event carrying the same ErrorDetail /scan would return.
+
+    Args:
+        image: Uploaded image file (JPEG/PNG)
+
+    Raises:
+        400: Invalid image or OCR failed (before the stream starts)
+        413: Upload larger than the limit (rejected before the body is read)
+        503: OCR unavailable or out of scan time (before the stream starts),
+            or upload budget exhausted
+    """
+    start_time = time.time()
+    deadline = Deadline(settings.scan_deadline_ms / 1000)
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    record_stage_since_start("upload")
+
+    # Import services (lazy import to avoid circular dependencies)
+    from services.ocr_service import ocr_service
+    from services.price_service import price_service
+
+    # Errors up to OCR get a regular error response with its status code
+    try:
+        image_bytes = await _prepare_image(image)
+        card_info = await ocr_service.extract_card_info(image_bytes, deadline=deadline)
+    except Exception as e:
+        _raise_http(e)
+
+    async def events() -> AsyncIterator[bytes]:
+        yield _stream_event("card", card_info, sse)
+        try:
+            async for item in price_service.stream_pricing(card_info, deadline=deadline):
+                if isinstance(item, PriceSource):
+                    yield _stream_event("price", item, sse)
+                else:
+                    yield _stream_event(
+                        "pricing",
+                        PricingSummary(statistics=item.statistics, missing_sources=item.missing_sources),
+                        sse
+                    )
+        except Exception as e:
+            yield _stream_event("error", _error_detail(e)[1], sse)
+            return
+
+        yield _stream_event("metadata", ScanMetadata.for_scan(start_time, _stages_ms()), sse)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        # Ask proxies not to buffer, so each event reaches the client at once
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _job_status(job, position=None) -> ScanJobStatus:
+    """Build the API view of a scan job."""
+    return ScanJobStatus(
+        job_id=job.job_id,
+        status=job.state,
+        queue_position=position,
+        queue_wait_ms=int(job.queue_wait_s * 1000) if job.queue_wait_s is not None else None,
+        processing_ms=int(job.processing_s * 1000) if job.processing_s is not None else None,
+        result=job.result,
+        error=_error_detail(job.error)[1] if job.error is not None else None
+    )
+
+
+@router.post("/scan/jobs", response_model=ScanJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def submit_scan_job(request: Request, response: Response, image: UploadFile = File(...)):
+    """
+    Queue a card scan and return its job ID immediately.
+
+    The scan runs on a fixed pool of workers; poll GET /scan/jobs/{job_id}
+    for the result. When the queue is full the job is rejected at once
+    rather than waiting.
+
+    Args:
+        image: Uploaded image file (JPEG/PNG)
+
+    Returns:
+        ScanJobStatus of the queued job (202, with a Location header)
+
+    Raises:
+        400: Invalid image
+        413: Upload larger than the limit (rejected before the body is read)
+        429: Queue full (details carry the queue depth; with Retry-After)
+    """
+    from services.scan_jobs import scan_jobs
+
+    try:
+        _validate_content_type(image)
+        image_bytes = await read_image_upload(
+            image,
+            max_bytes=settings.max_upload_bytes,
+            chunk_size=settings.upload_chunk_bytes
         )
+        job = await scan_jobs.submit(image_bytes)
     except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={
-                "error": {
-                    "code": "INTERNAL_ERROR",
-                    "message": "An unexpected error occurred. Please try again.",
-                    "details": {"error": str(e)}
-                }
-            }
+        _raise_http(e)
+
+    response.headers["Location"] = str(request.url_for("get_scan_job", job_id=job.job_id))
+    return _job_status(job, scan_jobs.position(job))
+
+
+@router.get("/scan/jobs/{job_id}", response_model=ScanJobStatus)
+async def get_scan_job(job_id: str):
+    """
+    Status of a scan job, with its result or error once finished.
+
+    Args:
+        job_id: ID returned by POST /scan/jobs
+
+    Returns:
+        ScanJobStatus; queue wait and processing time are reported separately
+
+    Raises:
+        404: Unknown job, or its result has expired
+    """
+    from services.scan_jobs import scan_jobs
+
+    try:
+        job = scan_jobs.get(job_id)
+    except JobNotFoundException as e:
+        _raise_http(e)
+
+    return ModelResponse(_job_status(job, scan_jobs.position(job)))
+
+
+@router.websocket("/scan/live")
+async def scan_live(websocket: WebSocket):
+    """
+    Recognize cards continuously from a camera feed.
+
+    The client sends frames as binary messages (JPEG/PNG). Frames are
+    scanned only once the picture is stable and differs from the last
+    scanned frame, always the newest such frame. The server sends JSON
+    text messages `{"event": ..., "data": ...}`:
+
+    - `card`: PricingResult, when a different card is identified
+    - `cleared`: the previously identified card is no longer readable
+    - `error`: ErrorDetail for a frame that failed (OCR or pricing
+      unavailable, card not found); a failed picture is retried after a
+      backoff, and a repeated error is not sent again
+    """
+    from services.continuous_scan import ContinuousScanSession, continuous_scan_metrics
+
+    async def publish(event: str, payload) -> None:
+        if isinstance(payload, Exception):
+            payload = _error_detail(payload)[1]
+        data = payload.model_dump(mode="json") if payload is not None else None
+        await websocket.send_json({"event": event, "data": data})
+
+    await websocket.accept()
+    session = ContinuousScanSession(
+        publish,
+        stable_frames=settings.continuous_scan_stable_frames,
+        stable_distance=settings.continuous_scan_stable_distance,
+        duplicate_distance=settings.continuous_scan_duplicate_distance,
+        max_frame_bytes=settings.max_upload_bytes,
+        retry_backoff_s=settings.continuous_scan_retry_backoff_ms / 1000,
+        retry_backoff_max_s=settings.continuous_scan_retry_backoff_max_ms / 1000,
+        metrics=continuous_scan_metrics,
+    )
+    session.start()
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            # Text messages are ignored; frames are binary
+            if message.get("bytes") is not None:
+                await session.feed(message["bytes"])
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await session.close()
+
+
+@router.post("/scan/batch", response_model=BatchScanResult)
+async def scan_batch(images: List[UploadFile] = File(...)):
+    """
+    Scan many Pokemon cards in one request.
+
+    Images are OCR'd with batched Vision requests and all recognized cards
+    are priced concurrently. Errors are reported per image, so one bad photo
+    does not fail the batch. The batch gets the scan deadline once per
+    Vision request it needs; images not done in time report a 503 error.
+
+    Args:
+        images: Uploaded image files (JPEG/PNG)
+
+    Returns:
+        BatchScanResult with one item per image, in upload order
+
+    Raises:
+        400: Too many images in one batch
+    """
+    start_time = time.time()
+
+    max_images = batch_image_limit()
+    if len(images) > max_images:
+        _raise_http(TooManyImagesException(
+            f"A batch can contain at most {max_images} images.",
+            details={"image_count": len(images), "max_images": max_images}
+        ))
+
+    # Import services (lazy import to avoid circular dependencies)
+    from clients.google_vision import MAX_BATCH_IMAGES
+    from services.ocr_service import ocr_service
+    from services.price_service import price_service
+
+    # One scan deadline per Vision batch request the images need
+    deadline = Deadline(settings.scan_deadline_ms / 1000 * math.ceil(len(images) / MAX_BATCH_IMAGES))
+
+    # Per-image outcome: bytes -> CardInfo -> PricingData, or the exception
+    outcomes = list(await asyncio.gather(*[_prepare_image(image) for image in images], return_exceptions=True))
+
+    readable = [i for i, outcome in enumerate(outcomes) if not isinstance(outcome, BaseException)]
+    card_infos = await ocr_service.extract_card_info_batch([outcomes[i] for i in readable], deadline=deadline)
+    for index, card_info in zip(readable, card_infos):
+        outcomes[index] = card_info
+
+    recognized = [i for i, outcome in enumerate(outcomes) if isinstance(outcome, CardInfo)]
+    pricing = await asyncio.gather(
+        *[price_service.get_pricing(outcomes[i], deadline=deadline) for i in recognized],
+        return_exceptions=True
+    )
+
+    metadata = ScanMetadata.for_scan(start_time)
+    items = [BatchScanItem(index=i, filename=image.filename) for i, image in enumerate(images)]
+    for index, pricing_data in zip(recognized, pricing):
+        if not isinstance(pricing_data, BaseException):
+            items[index].result = PricingResult(
+                card=outcomes[index],
+                pricing=pricing_data,
+                metadata=metadata
+            )
+        else:
+            outcomes[index] = pricing_data
+
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, BaseException):
+            items[index].error = _error_detail(outcome)[1]
+
+    failed = sum(1 for item in items if item.error is not None)
+    return ModelResponse(BatchScanResult(
+        items=items,
+        metadata=BatchScanMetadata(
+            scan_time_ms=metadata.scan_time_ms,
+            total=len(items),
+            succeeded=len(items) - failed,
+            failed=failed
         )
+    ))
@@ -0,0 +1 @@
+"""Benchmarks, verification scripts and local stub upstream servers."""
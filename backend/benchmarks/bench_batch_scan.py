@@ -0,0 +1,100 @@
+"""
+Compare batch scanning with one /scan request per image.
+
+The Vision client is replaced by a stub that blocks for a fixed round-trip
+latency per request plus a small per-image cost, and the TCG API is a local
+stub server. N card images are then scanned as N sequential /scan calls
+(what the mobile client does today) and as one /scan/batch call.
+
+The synthetic images are small, so the upload size limit is lowered to
+1 MB to fit the whole batch in the default upload budget (see
+batch_image_limit).
+
+Usage (from backend/):
+    python -m benchmarks.bench_batch_scan --images 30
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("MAX_UPLOAD_BYTES", str(1024 * 1024))
+
+import httpx  # noqa: E402
+
+from benchmarks.bench_ocr_cache import synthetic_card  # noqa: E402
+from benchmarks.stub_servers import StubTCGState, create_tcg_stub_app, serve_in_thread  # noqa: E402
+from clients.google_vision import STUB_TEXT, GoogleVisionClient  # noqa: E402
+
+
+class SlowBatchVisionStub:
+    """Vision stand-in: fixed latency per request plus a per-image cost."""
+
+    plan_batches = staticmethod(GoogleVisionClient.plan_batches)
+
+    def __init__(self, request_ms: float, per_image_ms: float):
+        self.request_s = request_ms / 1000
+        self.per_image_s = per_image_ms / 1000
+        self.requests = 0
+
+    def get_full_text(self, image_bytes, timeout=None):
+        self.requests += 1
+        time.sleep(self.request_s + self.per_image_s)
+        return STUB_TEXT
+
+    def batch_get_full_text(self, images, timeout=None):
+        self.requests += 1
+        time.sleep(self.request_s + self.per_image_s * len(images))
+        return [STUB_TEXT for _ in images]
+
+
+async def run(images: list, batch: bool) -> float:
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=300) as client:
+        start = time.perf_counter()
+        if batch:
+            files = [("images", (f"card{i}.jpg", data, "image/jpeg")) for i, data in enumerate(images)]
+            response = await client.post("/api/v1/scan/batch", files=files)
+            assert response.status_code == 200, response.text
+            assert response.json()["metadata"]["failed"] == 0, response.text
+        else:
+            for i, data in enumerate(images):
+                response = await client.post("/api/v1/scan", files={"image": (f"card{i}.jpg", data, "image/jpeg")})
+                assert response.status_code == 200, response.text
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--images", type=int, default=30)
+    parser.add_argument("--vision-request-ms", type=float, default=400.0)
+    parser.add_argument("--vision-per-image-ms", type=float, default=20.0)
+    parser.add_argument("--tcg-latency-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    from services.image_preprocessor import image_preprocessor
+    from services.ocr_service import ocr_service
+    from services.price_service import price_service
+
+    images = [synthetic_card(i, size=(900, 1260)) for i in range(args.images)]
+    stub = SlowBatchVisionStub(args.vision_request_ms, args.vision_per_image_ms)
+    ocr_service.vision_client = stub
+    # Every run must pay full OCR and lookup cost
+    ocr_service.result_cache = None
+
+    state = StubTCGState(latency_ms=args.tcg_latency_ms)
+    with serve_in_thread(create_tcg_stub_app(state)) as stub_url:
+        price_service.tcg_client.base_url = stub_url
+        for label, batch in (("sequential /scan", False), ("/scan/batch", True)):
+            price_service.card_cache.clear()
+            stub.requests = 0
+            elapsed = asyncio.run(run(images, batch))
+            print(f"{label:<17} images={args.images} elapsed_s={elapsed:6.2f} "
+                  f"images_per_s={args.images / elapsed:6.2f} vision_requests={stub.requests}")
+    image_preprocessor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
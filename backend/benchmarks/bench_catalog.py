@@ -0,0 +1,88 @@
+"""
+Measure the offline card catalog: file size, load time, memory and lookups.
+
+Generates a synthetic catalog of N cards spread over ~150 sets, writes it,
+loads it with CardCatalog (tracking Python allocations with tracemalloc)
+and times lookups by (name, set, number), (name, number/total) and
+(set, number) with an unreadable name.
+
+Usage (from backend/):
+    python -m benchmarks.bench_catalog --cards 20000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from clients.card_catalog import CardCatalog, write_catalog
+
+RARITIES = ["Common", "Uncommon", "Rare", "Rare Holo", "Rare Holo V", "Rare Ultra", "Rare Secret"]
+SYLLABLES = ["char", "pi", "ka", "chu", "bul", "ba", "saur", "mew", "two", "eev", "ee", "gar", "dos",
+             "sna", "lax", "gen", "gar", "dra", "go", "nite", "lu", "cario", "gre", "nin", "ja"]
+
+
+def synthetic_cards(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    names = sorted({
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        for _ in range(count // 3)
+    })
+    sets = [(f"set{i}", f"Synthetic Set {i}", rng.randint(60, 250)) for i in range(150)]
+    cards = []
+    for i in range(count):
+        set_id, set_name, total = sets[i % len(sets)]
+        number = str(i // len(sets) + 1)
+        cards.append({
+            "id": f"{set_id}-{number}",
+            "name": rng.choice(names),
+            "number": number,
+            "rarity": rng.choice(RARITIES),
+            "set": {"id": set_id, "name": set_name, "printedTotal": total},
+        })
+    return cards
+
+
+def time_lookups(label: str, catalog: CardCatalog, queries: list) -> None:
+    start = time.perf_counter()
+    found = sum(catalog.resolve(*query) is not None for query in queries)
+    per_lookup_us = (time.perf_counter() - start) / len(queries) * 1e6
+    print(f"{label:<28} lookups={len(queries)} resolved={found} avg_us={per_lookup_us:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cards", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=5_000)
+    args = parser.parse_args()
+
+    cards = synthetic_cards(args.cards)
+    path = os.path.join(tempfile.mkdtemp(), "catalog.bin")
+    write_catalog(cards, path)
+
+    # Memory and load time are measured separately; tracemalloc slows loading
+    tracemalloc.start()
+    CardCatalog(path).close()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    catalog = CardCatalog(path)
+    stats = catalog.stats()
+    print(f"cards={stats['records']} strings={stats['strings']} file_kb={stats['file_bytes'] / 1024:.0f} "
+          f"load_ms={stats['load_ms']:.0f} python_heap_peak_mb={peak / 2**20:.1f}")
+
+    rng = random.Random(2)
+    sample = [rng.choice(cards) for _ in range(args.queries)]
+    total = {card["id"]: card["set"]["printedTotal"] for card in cards}
+    time_lookups("name + set + number", catalog,
+                 [(c["name"], c["set"]["name"], c["number"]) for c in sample])
+    time_lookups("name + number/total", catalog,
+                 [(c["name"], None, f"{c['number']}/{total[c['id']]}") for c in sample])
+    time_lookups("unreadable name, set+number", catalog,
+                 [("Xqzzy", c["set"]["name"], c["number"]) for c in sample])
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Replay a kiosk camera feed over the /scan/live WebSocket.
+
+Frames are synthesized at a fixed frame rate: an empty tray, a card slid
+into view (moving frames), held still, swapped for a second card, the
+first card again, then the empty tray. Still frames carry JPEG re-encode
+and brightness noise, like a real camera. Vision is replaced by a stub
+with a fixed latency that recognizes the card in still frames only (a
+sliding card is blurred or partly out of view; image preprocessing is off
+so the stub sees the frame bytes as sent), and pricing uses a local TCG
+API stub.
+
+Reports frames received, scanned (Vision calls) and skipped by reason,
+the events pushed, and the delay from a card coming to rest to its result
+being pushed, against polling /scan with every frame.
+
+Usage (from backend/):
+    python -m benchmarks.bench_continuous_scan --fps 15 --vision-ms 250
+"""
+import argparse
+import io
+import os
+import random
+import threading
+import time
+from typing import List, Tuple
+
+os.environ.setdefault("PRICE_HISTORY_ENABLED", "false")
+os.environ.setdefault("PREWARM_ENABLED", "false")
+os.environ.setdefault("PREPROCESS_ENABLED", "false")
+
+from PIL import Image, ImageEnhance  # noqa: E402
+
+from benchmarks.bench_ocr_cache import synthetic_card  # noqa: E402
+from benchmarks.stub_servers import StubTCGState, create_tcg_stub_app, serve_in_thread  # noqa: E402
+
+TRAY = (640, 480)
+CARD_SIZE = (240, 336)
+CARD_TEXT = {
+    "charizard": "Charizard\nHP 120\nBase Set 4/102",
+    "blastoise": "Blastoise\nHP 100\nBase Set 2/102",
+}
+
+
+def tray_frame(card: Image.Image, x: int, rng: random.Random) -> bytes:
+    """Compose a camera frame with `card` at horizontal offset `x` (None for an empty tray)."""
+    frame = Image.new("RGB", TRAY, (30, 90, 40))
+    if card is not None:
+        frame.paste(card, (x, (TRAY[1] - CARD_SIZE[1]) // 2))
+    frame = ImageEnhance.Brightness(frame).enhance(rng.uniform(0.97, 1.03))
+    buffer = io.BytesIO()
+    frame.save(buffer, "JPEG", quality=rng.randint(80, 90))
+    return buffer.getvalue()
+
+
+def build_feed(fps: int, still_s: float, move_s: float) -> List[Tuple[str, str, bytes]]:
+    """Frames as (phase, card in view, bytes); phase is "still" or "moving"."""
+    rng = random.Random(3)
+    cards = {
+        name: Image.open(io.BytesIO(synthetic_card(seed, size=CARD_SIZE))).convert("RGB")
+        for seed, name in enumerate(CARD_TEXT, start=1)
+    }
+    center = (TRAY[0] - CARD_SIZE[0]) // 2
+    still, moving = int(still_s * fps), int(move_s * fps)
+    feed = [("still", "", tray_frame(None, 0, rng)) for _ in range(fps)]
+    for name in ("charizard", "blastoise", "charizard"):
+        for i in range(moving):
+            feed.append(("moving", name, tray_frame(cards[name], TRAY[0] - (TRAY[0] - center) * (i + 1) // moving, rng)))
+        feed += [("still", name, tray_frame(cards[name], center, rng)) for _ in range(still)]
+        for i in range(moving):
+            feed.append(("moving", name, tray_frame(cards[name], center - (center + CARD_SIZE[0]) * (i + 1) // moving, rng)))
+    feed += [("still", "", tray_frame(None, 0, rng)) for _ in range(fps)]
+    return feed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fps", type=int, default=15, help="Camera frame rate")
+    parser.add_argument("--vision-ms", type=float, default=250, help="Vision stub latency")
+    parser.add_argument("--still-s", type=float, default=3.0, help="Seconds each card is held still")
+    parser.add_argument("--move-s", type=float, default=0.5, help="Seconds a card takes to slide in or out")
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    from main import app
+    from services.continuous_scan import continuous_scan_metrics
+    from services.ocr_service import ocr_service
+    from services.price_service import price_service
+
+    feed = build_feed(args.fps, args.still_s, args.move_s)
+    shown = {frame: name for phase, name, frame in feed if phase == "still"}
+    vision_calls = []
+
+    def stub_vision(image_bytes, timeout=None):
+        vision_calls.append(time.perf_counter())
+        time.sleep(args.vision_ms / 1000)
+        name = shown.get(image_bytes, "")
+        return CARD_TEXT[name] if name else ""
+
+    ocr_service.vision_client.get_full_text = stub_vision
+    ocr_service.result_cache = None
+
+    events: List[Tuple[float, dict]] = []
+
+    with serve_in_thread(create_tcg_stub_app(StubTCGState(latency_ms=50))) as tcg_url, TestClient(app) as client:
+        price_service.tcg_client.base_url = tcg_url
+        with client.websocket_connect("/api/v1/scan/live") as ws:
+            def read() -> None:
+                try:
+                    while True:
+                        event = ws.receive_json()
+                        events.append((time.perf_counter(), event))
+                except Exception:
+                    pass
+
+            reader = threading.Thread(target=read, daemon=True)
+            reader.start()
+            started = time.perf_counter()
+            sent_at = []
+            for index, (_, _, frame) in enumerate(feed):
+                time.sleep(max(started + index / args.fps - time.perf_counter(), 0))
+                sent_at.append(time.perf_counter())
+                ws.send_bytes(frame)
+            time.sleep(args.vision_ms / 1000 * 3)
+        reader.join(timeout=2)
+
+    # A card comes to rest at the first still frame after it moved in
+    rests = [
+        (sent_at[i], name) for i, (phase, name, _) in enumerate(feed)
+        if phase == "still" and name and feed[i - 1][0] == "moving"
+    ]
+    pushed = [(at, event["data"]["card"]["name"]) for at, event in events if event["event"] == "card"]
+    print(
+        f"feed       frames={len(feed)} fps={args.fps} duration_s={len(feed) / args.fps:.1f} "
+        f"cards_shown={len(rests)}"
+    )
+    stats = continuous_scan_metrics.stats()
+    print(
+        f"live       received={stats['frames_received']} scanned={stats['frames_processed']} "
+        f"vision_calls={len(vision_calls)} skipped_unstable={stats['frames_skipped_unstable']} "
+        f"skipped_duplicate={stats['frames_skipped_duplicate']} dropped_stale={stats['frames_dropped_stale']} "
+        f"invalid={stats['frames_invalid']}"
+    )
+    print(f"           events={[(e['event'], (e['data'] or {}).get('card', {}).get('name')) for _, e in events]}")
+    for rest_at, name in rests:
+        push = next((at for at, pushed_name in pushed if at >= rest_at and pushed_name.lower() == name), None)
+        delay = f"{(push - rest_at) * 1000:.0f}" if push is not None else "never"
+        print(f"           {name:<10} at rest -> pushed_ms={delay}")
+    print(
+        f"poll /scan vision_calls={len(feed)} (one per frame; at {args.vision_ms:.0f} ms each a single "
+        f"connection keeps up with {1000 / args.vision_ms:.1f} of {args.fps} fps)"
+    )
+
+
+if __name__ == "__main__":
+    main()
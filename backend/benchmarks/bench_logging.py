@@ -0,0 +1,160 @@
+"""
+Compare per-request logging cost of the old print statements and the queued structured logger.
+
+Each simulated /scan request logs what the app logged for it:
+
+- before: the old log_requests middleware and scan_card debug prints
+  (13 print calls, including a dump of every request header)
+- after: the structured logger at LOG_LEVEL=INFO (the debug upload record
+  and the header field are skipped) with every request sampled, and with
+  the scan route sampled at 1%
+
+Output goes to a pipe drained by a thread at a fixed rate, like stdout
+read by a container log collector; once the pipe buffer is full, writes
+block. The time each request spends in logging calls on the calling
+thread is reported.
+
+Usage (from backend/):
+    python -m benchmarks.bench_logging --requests 20000 --sink-mb-s 2
+"""
+import argparse
+import io
+import os
+import threading
+import time
+
+from utils.log import LogPipeline, RouteSampler, StructuredLogger, log_pipeline
+
+HEADERS = {
+    "host": "api.example.com",
+    "user-agent": "PokeScan/2.3.1 (iPhone; iOS 17.4)",
+    "accept": "application/json",
+    "accept-encoding": "gzip, deflate, br",
+    "content-type": "multipart/form-data; boundary=----PokeScanBoundary7MA4YWxkTrZu0gW",
+    "content-length": "412873",
+    "x-request-id": "7f9c2ba4e88f827d616045507605853e",
+    "x-forwarded-for": "203.0.113.7",
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class ThrottledSink:
+    """A pipe whose reading end is drained at `bytes_per_s`."""
+
+    def __init__(self, bytes_per_s: float):
+        read_fd, write_fd = os.pipe()
+        self.reader = os.fdopen(read_fd, "rb", buffering=0)
+        # Line buffered, as stdout is with PYTHONUNBUFFERED in a container
+        self.stream = io.TextIOWrapper(os.fdopen(write_fd, "wb", buffering=0), line_buffering=True)
+        self.bytes_per_s = bytes_per_s
+        self.received = 0
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self) -> None:
+        chunk = 4096
+        while True:
+            data = self.reader.read(chunk)
+            if not data:
+                return
+            self.received += len(data)
+            time.sleep(len(data) / self.bytes_per_s)
+
+    def close(self) -> None:
+        self.stream.close()
+        self._thread.join()
+
+
+def old_prints(sink, filename: str, content_type: str, status: int) -> None:
+    """The per-request prints removed from log_requests and scan_card."""
+    print(f"[MIDDLEWARE] === INCOMING REQUEST TO /api/v1/scan ===", file=sink)
+    print(f"[MIDDLEWARE] Method: POST", file=sink)
+    print(f"[MIDDLEWARE] Headers: {dict(HEADERS)}", file=sink)
+    print(f"[MIDDLEWARE] Content-Type: {HEADERS.get('content-type')}", file=sink)
+    print(f"[DEBUG] ===== NEW REQUEST =====", file=sink)
+    print(f"[DEBUG] filename: {filename}", file=sink)
+    print(f"[DEBUG] content_type: '{content_type}'", file=sink)
+    print(f"[DEBUG] content_type is None: {content_type is None}", file=sink)
+    print(f"[DEBUG] content_type type: {type(content_type)}", file=sink)
+    if content_type:
+        print(f"[DEBUG] content_type starts with 'image/': {content_type.startswith('image/')}", file=sink)
+    print(f"[DEBUG] =======================", file=sink)
+    print(f"[MIDDLEWARE] Response status: {status}", file=sink)
+
+
+def structured(scan_log: StructuredLogger, access_log: StructuredLogger, sampler: RouteSampler,
+               filename: str, content_type: str, status: int) -> None:
+    """The per-request log calls of scan_card and the request middleware."""
+    scan_log.debug("scan_upload", filename=filename, content_type=content_type)
+    if status >= 500 or sampler.sample("/api/v1/scan"):
+        access_log.info(
+            "request",
+            method="POST",
+            path="/api/v1/scan",
+            route="/api/v1/scan",
+            status=status,
+            duration_ms=412.7,
+            debug=lambda: {"headers": dict(HEADERS)},
+        )
+
+
+def run(requests: int, log_one) -> tuple:
+    """Log `requests` requests; returns (seconds in logging per request, loop seconds)."""
+    durations = []
+    started = time.perf_counter()
+    for index in range(requests):
+        call_started = time.perf_counter()
+        log_one(index)
+        durations.append(time.perf_counter() - call_started)
+        # Requests arrive spread out, not back to back
+        if index % 100 == 99:
+            time.sleep(0.001)
+    return durations, time.perf_counter() - started
+
+
+def report(name: str, durations, loop_s: float, written: int, extra: str = "") -> None:
+    print(
+        f"{name:<26} us_per_request p50={percentile(durations, 0.5) * 1e6:.1f} "
+        f"p99={percentile(durations, 0.99) * 1e6:.1f} max={max(durations) * 1e6:.0f} "
+        f"logging_total_s={sum(durations):.2f} loop_s={loop_s:.2f} bytes={written}{extra}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000, help="Simulated requests")
+    parser.add_argument("--sink-mb-s", type=float, default=2.0, help="Rate the log reader drains output")
+    args = parser.parse_args()
+    sink_bytes_per_s = args.sink_mb_s * 1024 * 1024
+    # The benchmark's pipelines replace the app's (which writes to stdout)
+    log_pipeline.close()
+
+    sink = ThrottledSink(sink_bytes_per_s)
+    durations, loop_s = run(
+        args.requests,
+        lambda index: old_prints(sink.stream, f"card{index}.jpg", "image/jpeg", 200),
+    )
+    sink.close()
+    report("before: print", durations, loop_s, sink.received)
+
+    for label, rates in (("after: json, all sampled", {}), ("after: json, scan 1%", {"/api/v1/scan": 0.01})):
+        sink = ThrottledSink(sink_bytes_per_s)
+        pipeline = LogPipeline(level="INFO", fmt="json", queue_size=10000, stream=sink.stream)
+        sampler = RouteSampler(1.0, rates)
+        scan_log, access_log = StructuredLogger("Scan"), StructuredLogger("Access")
+        durations, loop_s = run(
+            args.requests,
+            lambda index: structured(scan_log, access_log, sampler, f"card{index}.jpg", "image/jpeg", 200),
+        )
+        dropped = pipeline.dropped
+        pipeline.close()
+        sink.close()
+        report(label, durations, loop_s, sink.received, f" dropped={dropped}")
+
+
+if __name__ == "__main__":
+    main()
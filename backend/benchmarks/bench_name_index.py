@@ -0,0 +1,118 @@
+"""
+Benchmark fuzzy card-name matching against a corpus of OCR outputs.
+
+Builds a CardNameIndex over a ~15k-name vocabulary: the bundled name list,
+realistic printed variants of it ("Pikachu V", "Dark Charizard",
+"Brock's Onix"...) and generated filler names. Every corpus entry is then
+parsed with and without the index, reporting accuracy and per-lookup
+latency.
+
+Usage (from backend/):
+    python -m benchmarks.bench_name_index --vocabulary 15000
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+from config import settings
+from services.card_parser import parse_card_name
+from services.name_index import CardNameIndex, normalize_name
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "ocr_names.tsv")
+
+SUFFIXES = ("V", "VMAX", "VSTAR", "GX", "EX", "ex", "BREAK")
+PREFIXES = ("Dark", "Light", "Shining", "Radiant", "Alolan", "Galarian", "Brock's", "Misty's", "Team Rocket's")
+# Filler names are built from syllables of real names so their trigram
+# distribution is close to the real vocabulary's
+SYLLABLES = (
+    "ab", "ar", "ba", "bel", "bra", "bul", "can", "cha", "chu", "cle", "cro", "cu", "da", "del",
+    "dra", "duo", "ee", "el", "fa", "fin", "flo", "gar", "gen", "geo", "gon", "gra", "gy", "hoo",
+    "ix", "jig", "ka", "kra", "la", "lax", "leo", "lix", "lu", "mag", "mar", "me", "mew", "mo",
+    "na", "nite", "no", "nox", "oc", "on", "pa", "pid", "pix", "po", "quil", "ra", "rex", "ro",
+    "sa", "saur", "scy", "sh", "sla", "sno", "ta", "tal", "ter", "tor", "tox", "ul", "va", "vee",
+    "vi", "wig", "xa", "yan", "zap", "zel", "zu",
+)
+
+
+def load_corpus(path: str):
+    entries = []
+    with open(path, encoding="utf-8") as source:
+        for line in source:
+            if not line.strip() or line.startswith("#"):
+                continue
+            text, expected = line.rstrip("\n").split("\t")
+            entries.append((text.replace("\\n", "\n"), expected))
+    return entries
+
+
+def build_vocabulary(size: int, seed: int = 7):
+    with open(settings.card_names_path, encoding="utf-8") as source:
+        base = [line.strip() for line in source if line.strip() and not line.startswith("#")]
+
+    names = list(base)
+    names += [f"{name} {suffix}" for name in base for suffix in SUFFIXES]
+    names += [f"{prefix} {name}" for name in base for prefix in PREFIXES]
+
+    rng = random.Random(seed)
+    seen = {normalize_name(name) for name in names}
+    while len(names) < size:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        if rng.random() < 0.3:
+            name = f"{name} {rng.choice(SUFFIXES)}"
+        if normalize_name(name) not in seen:
+            seen.add(normalize_name(name))
+            names.append(name)
+    return names[:size]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vocabulary", type=int, default=15000, help="Vocabulary size")
+    parser.add_argument("--rounds", type=int, default=20, help="Timing passes over the corpus")
+    parser.add_argument("--min-score", type=float, default=settings.name_match_min_score)
+    args = parser.parse_args()
+
+    corpus = load_corpus(CORPUS_PATH)
+    index = CardNameIndex()
+    index.build(build_vocabulary(args.vocabulary))
+    print(f"vocabulary={len(index)} trigrams={index.stats()['trigrams']} build_ms={index.build_ms:.0f}")
+
+    strict_ok = fuzzy_ok = 0
+    for text, expected in corpus:
+        strict = parse_card_name(text)
+        fuzzy = parse_card_name(text, index, args.min_score)
+        strict_ok += strict == expected
+        fuzzy_ok += fuzzy == expected
+        if fuzzy != expected:
+            print(f"  MISS {text!r}: expected {expected!r}, got {fuzzy!r}")
+    print(f"corpus={len(corpus)} strict_parser_correct={strict_ok} fuzzy_correct={fuzzy_ok}")
+
+    # Latency of single-name lookups (the first line of each entry)
+    queries = [text.split("\n")[0] for text, _ in corpus]
+    samples = []
+    for _ in range(args.rounds):
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query, limit=3, min_score=args.min_score)
+            samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    print(
+        f"search lookups={len(samples)} "
+        f"median_us={statistics.median(samples):.0f} "
+        f"p95_us={samples[int(len(samples) * 0.95)]:.0f} "
+        f"max_us={samples[-1]:.0f}"
+    )
+
+    # Whole-text parse cost (all candidate lines)
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for text, _ in corpus:
+            parse_card_name(text, index, args.min_score)
+    per_parse_us = (time.perf_counter() - started) * 1e6 / (args.rounds * len(corpus))
+    print(f"parse_card_name avg_us={per_parse_us:.0f}")
+
+
+if __name__ == "__main__":
+    main()
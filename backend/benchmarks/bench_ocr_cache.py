@@ -0,0 +1,91 @@
+"""
+Benchmark the perceptual-hash OCR result cache.
+
+1. Near-duplicate sanity check: a synthetic card image re-encoded at a
+   different size/quality must stay within the cache's Hamming radius,
+   while a different image must not.
+2. Index scale: fills an OCRResultCache with N random entries and times
+   near-duplicate and miss lookups, checking results against brute force.
+
+Usage (from backend/):
+    python -m benchmarks.bench_ocr_cache --entries 100000
+"""
+import argparse
+import io
+import random
+import time
+
+from PIL import Image, ImageDraw
+
+from config import settings
+from models.schemas import CardInfo
+from services.ocr_cache import OCRResultCache
+from utils.image_hash import dhash, hamming_distance
+
+
+def synthetic_card(seed: int, size=(1200, 1680), quality: int = 90) -> bytes:
+    """Draw a deterministic card-like image and encode it as JPEG."""
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, (250, 220, 90))
+    draw = ImageDraw.Draw(image)
+    w, h = size
+    draw.rectangle([w * 0.08, h * 0.1, w * 0.92, h * 0.5], fill=(rng.randrange(256), 80, 160))
+    for _ in range(12):
+        x, y = rng.uniform(0.1, 0.8) * w, rng.uniform(0.12, 0.45) * h
+        draw.ellipse([x, y, x + w * 0.1, y + w * 0.1], fill=tuple(rng.randrange(256) for _ in range(3)))
+    for i in range(6):
+        draw.rectangle([w * 0.1, h * (0.55 + i * 0.06), w * rng.uniform(0.4, 0.9), h * (0.58 + i * 0.06)], fill=(40, 40, 40))
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def flip_bits(value: int, count: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(64), count):
+        value ^= 1 << bit
+    return value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--max-distance", type=int, default=settings.ocr_cache_max_distance)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    original = dhash(synthetic_card(1))
+    rescan = dhash(synthetic_card(1, size=(900, 1260), quality=60))
+    other = dhash(synthetic_card(2))
+    print(f"near-duplicate distance={hamming_distance(original, rescan)} "
+          f"different-card distance={hamming_distance(original, other)} "
+          f"radius={args.max_distance}")
+
+    cache = OCRResultCache(max_entries=args.entries, max_distance=args.max_distance)
+    card = CardInfo(name="Charizard", set="Base Set", number="4/102")
+    hashes = [rng.getrandbits(64) for _ in range(args.entries)]
+    start = time.perf_counter()
+    for i, value in enumerate(hashes):
+        cache.put(i.to_bytes(8, "big"), value, card)
+    fill_s = time.perf_counter() - start
+
+    near_queries = [flip_bits(rng.choice(hashes), rng.randint(0, args.max_distance), rng) for _ in range(args.queries)]
+    miss_queries = [rng.getrandbits(64) for _ in range(args.queries)]
+
+    for label, queries in (("near", near_queries), ("random", miss_queries)):
+        start = time.perf_counter()
+        found = sum(cache._index.nearest(q) is not None for q in queries)
+        per_lookup_us = (time.perf_counter() - start) / len(queries) * 1e6
+        print(f"{label:<7} lookups={len(queries)} found={found} avg_us={per_lookup_us:.1f}")
+
+    # Brute-force cross-check on a sample
+    for q in near_queries[:50]:
+        best = min(hamming_distance(q, h) for h in hashes)
+        match = cache._index.nearest(q)
+        assert match is not None and match[1] == best, "index disagreed with brute force"
+
+    print(f"fill_s={fill_s:.2f} entries={len(cache)} brute-force check OK")
+
+
+if __name__ == "__main__":
+    main()
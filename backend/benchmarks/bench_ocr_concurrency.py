@@ -0,0 +1,75 @@
+"""
+Measure OCR throughput as the concurrency cap grows.
+
+Replaces the Vision client with a stub whose `get_full_text` blocks for a
+fixed latency (like the real gRPC call), then runs a fixed number of
+`OCRService.extract_card_info` calls at increasing concurrency caps. A
+"blocking" row calls the stub directly on the event loop, the way the
+service worked before OCR moved to a thread pool.
+
+Usage (from backend/):
+    python -m benchmarks.bench_ocr_concurrency --latency-ms 200 --requests 64
+"""
+import argparse
+import asyncio
+import time
+
+from config import settings
+from services.ocr_service import OCRService
+
+STUB_TEXT = "Charizard\nBase Set\n4/102\nRare Holo\nHP 120\n"
+
+
+class SlowVisionStub:
+    """Vision client stand-in that blocks its thread like a gRPC call."""
+
+    def __init__(self, latency_ms: float):
+        self.latency_s = latency_ms / 1000
+
+    def get_full_text(self, image_bytes: bytes, timeout=None):
+        time.sleep(self.latency_s)
+        return STUB_TEXT
+
+
+async def run(service: OCRService, requests: int) -> float:
+    """Run `requests` concurrent extractions and return throughput (req/s)."""
+    start = time.perf_counter()
+    await asyncio.gather(*[service.extract_card_info(b"image") for _ in range(requests)])
+    return requests / (time.perf_counter() - start)
+
+
+async def run_blocking(stub: SlowVisionStub, requests: int) -> float:
+    """Baseline: call the blocking stub directly on the event loop."""
+    async def extract():
+        return stub.get_full_text(b"image")
+
+    start = time.perf_counter()
+    await asyncio.gather(*[extract() for _ in range(requests)])
+    return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--caps", default="1,2,4,8,16,32")
+    args = parser.parse_args()
+
+    # Keep the timeout out of the way; this measures throughput only
+    settings.ocr_timeout_ms = 600_000
+    stub = SlowVisionStub(args.latency_ms)
+
+    baseline = asyncio.run(run_blocking(stub, args.requests))
+    print(f"{'mode':<10} {'cap':>4} {'req/s':>9} {'speedup':>8}")
+    print(f"{'blocking':<10} {'-':>4} {baseline:9.2f} {1.0:8.2f}")
+
+    for cap in (int(c) for c in args.caps.split(",")):
+        service = OCRService(max_concurrency=cap)
+        service.vision_client = stub
+        throughput = asyncio.run(run(service, args.requests))
+        service.shutdown()
+        print(f"{'pool':<10} {cap:>4} {throughput:9.2f} {throughput / baseline:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark card_parser over a corpus of full OCR texts.
+
+Checks every field parse_full_card_info extracts against the expected
+values in data/ocr_texts.txt, then reports per-call latency. As a
+reference it also times the previous approach on the same term lists:
+one lowercase `in` scan of the whole text per set and per rarity.
+
+Usage (from backend/):
+    python -m benchmarks.bench_parser --rounds 500
+"""
+import argparse
+import os
+import re
+import statistics
+import time
+
+from services.card_parser import get_term_matcher, parse_full_card_info
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "ocr_texts.txt")
+FIELDS = ("name", "set", "number", "rarity")
+
+
+def load_corpus(path: str):
+    with open(path, encoding="utf-8") as source:
+        content = "".join(line for line in source if not line.startswith("#"))
+    entries = []
+    for block in content.split("\n---\n"):
+        header, _, text = block.strip().partition("\n")
+        expected = [value.strip() or None for value in header[len("expect:"):].split("|")]
+        entries.append((text, dict(zip(FIELDS, expected))))
+    return entries
+
+
+def legacy_parse_terms(text: str, sets, rarities):
+    """Set/rarity/number extraction as card_parser did it before the matcher."""
+    card_number = None
+    for line in text.split("\n"):
+        match = re.search(r"(\d+)/(\d+)", line)
+        if match:
+            card_number = match.group(0)
+            break
+    text_lower = text.lower()
+    set_name = next((s for s in sets if s.lower() in text_lower), None)
+    text_lower = text.lower()
+    rarity = next((r for r in rarities if r.lower() in text_lower), None)
+    return set_name, card_number, rarity
+
+
+def time_calls(fn, texts, rounds):
+    samples = []
+    for _ in range(rounds):
+        for text in texts:
+            started = time.perf_counter()
+            fn(text)
+            samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=500, help="Timing passes over the corpus")
+    args = parser.parse_args()
+
+    corpus = load_corpus(CORPUS_PATH)
+    texts = [text for text, _ in corpus]
+
+    started = time.perf_counter()
+    matcher = get_term_matcher()
+    print(f"terms={len(matcher)} matcher_build_ms={(time.perf_counter() - started) * 1000:.1f}")
+
+    correct = {field: 0 for field in FIELDS}
+    for text, expected in corpus:
+        parsed = parse_full_card_info(text)
+        for field in FIELDS:
+            if parsed[field] == expected[field]:
+                correct[field] += 1
+            else:
+                print(f"  MISS {field}: expected {expected[field]!r}, got {parsed[field]!r} ({text.splitlines()[0]!r})")
+    print(f"texts={len(corpus)} " + " ".join(f"{field}_correct={count}" for field, count in correct.items()))
+
+    terms = matcher._terms.values()
+    sets = [term for kind, term, _ in sorted(terms, key=lambda t: t[2]) if kind == "sets"]
+    rarities = [term for kind, term, _ in sorted(terms, key=lambda t: t[2]) if kind == "rarities"]
+
+    avg_chars = sum(map(len, texts)) / len(texts)
+    median, p95 = time_calls(parse_full_card_info, texts, args.rounds)
+    print(f"parse_full_card_info   avg_text_chars={avg_chars:.0f} median_us={median:.1f} p95_us={p95:.1f}")
+    median, p95 = time_calls(matcher.best, texts, args.rounds)
+    print(f"  set+rarity scan      median_us={median:.1f} p95_us={p95:.1f}")
+    median, p95 = time_calls(lambda text: legacy_parse_terms(text, sets, rarities), texts, args.rounds)
+    print(f"  previous per-term scan (same {len(sets)} sets) median_us={median:.1f} p95_us={p95:.1f}")
+
+
+if __name__ == "__main__":
+    main()
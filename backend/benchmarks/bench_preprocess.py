@@ -0,0 +1,69 @@
+"""
+Measure image preprocessing cost and byte savings.
+
+Encodes synthetic phone-sized card photos, runs them through
+`preprocess_image` (in-process, for per-stage timings) and through the
+ImagePreprocessor process pool (for end-to-end latency), and reports the
+bytes saved before upload to Vision.
+
+Usage (from backend/):
+    python -m benchmarks.bench_preprocess --images 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.bench_ocr_cache import synthetic_card
+from config import settings
+from services.image_preprocessor import STAGES, ImagePreprocessor, preprocess_image
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=4000)
+    parser.add_argument("--crop", action="store_true", help="Enable card rectangle cropping")
+    args = parser.parse_args()
+
+    uploads = [synthetic_card(i, size=(args.width, args.height), quality=92) for i in range(args.images)]
+
+    stage_ms = {stage: [] for stage in STAGES}
+    for upload in uploads:
+        _, timings = preprocess_image(upload, settings.preprocess_max_edge, settings.preprocess_jpeg_quality, args.crop)
+        for stage, ms in timings.items():
+            stage_ms[stage].append(ms)
+
+    print(f"{'stage':<8} {'median_ms':>10}")
+    for stage, values in stage_ms.items():
+        print(f"{stage:<8} {statistics.median(values):10.2f}")
+
+    settings.preprocess_crop_card = args.crop
+    preprocessor = ImagePreprocessor()
+    preprocessor.start()
+
+    async def run_pool():
+        # Warm up worker processes (spawn start-up is paid once per worker)
+        await asyncio.gather(*[preprocessor.preprocess(uploads[0]) for _ in range(preprocessor.workers)])
+        warmup = preprocessor.stats()
+        start = time.perf_counter()
+        await asyncio.gather(*[preprocessor.preprocess(upload) for upload in uploads])
+        elapsed = time.perf_counter() - start
+        report = preprocessor.stats()
+        for key in ("images", "bytes_in", "bytes_out", "bytes_saved"):
+            report[key] -= warmup[key]
+        report["savings_ratio"] = report["bytes_saved"] / report["bytes_in"]
+        return elapsed, report
+
+    elapsed, report = asyncio.run(run_pool())
+    preprocessor.shutdown()
+
+    print(f"pool workers={preprocessor.workers} images={report['images']} "
+          f"elapsed_ms={elapsed * 1000:.1f} per_image_ms={elapsed * 1000 / len(uploads):.1f}")
+    print(f"bytes_in={report['bytes_in']} bytes_out={report['bytes_out']} "
+          f"saved={report['bytes_saved']} ({report['savings_ratio']:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Simulate skewed scan traffic with and without the pre-warming scheduler.
+
+Scans follow a Zipf distribution over the card pool and run against a
+TTLCache with the app's TTL settings on a simulated clock, so hours of
+traffic replay in seconds. The scan path mirrors PriceService._lookup_card:
+fresh hits are warm, stale hits are served while refreshed in the
+background, misses wait for upstream. With pre-warming, PrewarmScheduler
+ticks on the same clock and refreshes hot cards within its budget.
+
+Reports the share of scans served warm (overall and for the top-K cards
+by true popularity), scans that waited on upstream, and upstream calls by
+origin.
+
+Usage (from backend/):
+    python -m benchmarks.bench_prewarm --hours 6 --scans-per-s 2
+"""
+import argparse
+import asyncio
+import itertools
+import random
+
+from config import settings
+from models.schemas import CardInfo
+from services.prewarm import PrewarmScheduler
+from utils.cache import TTLCache
+
+
+class SimClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def zipf_sampler(cards: int, exponent: float, rng: random.Random):
+    weights = [1 / (rank ** exponent) for rank in range(1, cards + 1)]
+    cum_weights = list(itertools.accumulate(weights))
+    population = list(range(cards))
+    return lambda: rng.choices(population, cum_weights=cum_weights)[0]
+
+
+async def simulate(args, prewarm: bool) -> None:
+    clock = SimClock()
+    cache = TTLCache(max_entries=settings.price_cache_max_entries, stale_ttl_s=settings.price_cache_stale_ttl_s, clock=clock)
+    upstream = {"scan": 0, "stale": 0, "prewarm": 0}
+
+    async def prewarm_refresh(key, card_info):
+        upstream["prewarm"] += 1
+        cache.set(key, {"id": key}, settings.price_cache_ttl_s)
+
+    scheduler = PrewarmScheduler(
+        cache,
+        prewarm_refresh,
+        top_k=settings.prewarm_top_k,
+        interval_s=settings.prewarm_interval_s,
+        lead_s=settings.prewarm_lead_s,
+        budget_per_minute=settings.prewarm_budget_per_minute,
+        half_life_s=settings.prewarm_half_life_s,
+        clock=clock,
+    )
+    sample = zipf_sampler(args.cards, args.zipf, random.Random(4))
+    rng = random.Random(5)
+
+    scans = warm = waited = hot_scans = hot_warm = 0
+    next_tick = settings.prewarm_interval_s
+    end = args.hours * 3600
+    while clock.now < end:
+        clock.now += rng.expovariate(args.scans_per_s)
+        while prewarm and clock.now >= next_tick:
+            saved, clock.now = clock.now, next_tick
+            await scheduler.tick()
+            clock.now = saved
+            next_tick += settings.prewarm_interval_s
+
+        rank = sample()
+        key = f"card-{rank}"
+        cached = cache.get(key)
+        if not cached.found:
+            upstream["scan"] += 1
+            waited += 1
+            cache.set(key, {"id": key}, settings.price_cache_ttl_s)
+        elif cached.stale:
+            upstream["stale"] += 1
+            cache.set(key, {"id": key}, settings.price_cache_ttl_s)
+        scans += 1
+        is_warm = cached.found and not cached.stale
+        warm += is_warm
+        if rank < settings.prewarm_top_k:
+            hot_scans += 1
+            hot_warm += is_warm
+        scheduler.record_scan(key, CardInfo(name=key), warm=is_warm)
+
+    label = "prewarm" if prewarm else "baseline"
+    total_upstream = sum(upstream.values())
+    print(
+        f"{label:<9} scans={scans} warm={warm / scans:.1%} hot_warm={hot_warm / hot_scans:.1%} waited_on_upstream={waited / scans:.2%} "
+        f"upstream_calls={total_upstream} (scan={upstream['scan']} stale={upstream['stale']} "
+        f"prewarm={upstream['prewarm']}, {total_upstream / args.hours / 60:.1f}/min)"
+    )
+    if prewarm:
+        stats = scheduler.stats()
+        print(
+            f"          refreshes={stats['refreshes']} cold={stats['cold_refreshes']} late={stats['late_refreshes']} "
+            f"avg_lag_s={stats['avg_refresh_lag_s']} max_lag_s={stats['max_refresh_lag_s']} "
+            f"budget_deferred={stats['budget_deferred']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hours", type=float, default=6.0, help="Simulated traffic duration")
+    parser.add_argument("--scans-per-s", type=float, default=2.0, help="Mean scan rate")
+    parser.add_argument("--cards", type=int, default=5000, help="Distinct cards in the pool")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of card popularity")
+    args = parser.parse_args()
+
+    print(
+        f"ttl_s={settings.price_cache_ttl_s} top_k={settings.prewarm_top_k} lead_s={settings.prewarm_lead_s} "
+        f"budget_per_minute={settings.prewarm_budget_per_minute}"
+    )
+    asyncio.run(simulate(args, prewarm=False))
+    asyncio.run(simulate(args, prewarm=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark and verify the price history store.
+
+1. Request-path cost: time of PriceHistoryStore.record() and windows() calls
+   while the writer thread flushes batches in the background.
+2. Maintenance: writes 120 days of observations, runs compaction and
+   retention, and checks the stored windows against a brute-force
+   computation over the raw data. Also times the per-card query a window
+   refresh runs, over the daily aggregates, against the same query over
+   raw observations (how windows were computed before the aggregates).
+
+Usage (from backend/):
+    python -m benchmarks.bench_price_history --cards 2000 --scans 20000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from models.schemas import PriceSource
+from services.price_history import DAY_S, PriceHistoryStore, window_statistics
+
+SOURCES = ("TCGPlayer (Holofoil)", "TCGPlayer (Normal)", "CardMarket")
+
+
+def bench_request_path(path: str, cards: int, scans: int) -> None:
+    # Queue sized for the whole run: this measures writer throughput, not shedding
+    store = PriceHistoryStore(path, flush_interval_s=0.2, queue_size=scans * len(SOURCES))
+    store.start()
+    rng = random.Random(1)
+    card_ids = [f"set{i // 100}-{i % 100}" for i in range(cards)]
+
+    record_us, read_us = [], []
+    started = time.perf_counter()
+    for _ in range(scans):
+        card_id = rng.choice(card_ids)
+        sources = [PriceSource(name=name, price_usd=round(rng.uniform(1, 300), 2)) for name in SOURCES]
+        t0 = time.perf_counter()
+        store.record(card_id, sources)
+        t1 = time.perf_counter()
+        store.windows(card_id)
+        t2 = time.perf_counter()
+        record_us.append((t1 - t0) * 1e6)
+        read_us.append((t2 - t1) * 1e6)
+    submit_s = time.perf_counter() - started
+
+    store.shutdown()
+    drained_s = time.perf_counter() - started
+
+    stats = store.stats()
+    record_us.sort()
+    read_us.sort()
+    print(
+        f"scans={scans} observations={stats['written']} dropped={stats['dropped']} "
+        f"batches={stats['batches']} avg_batch_write_ms={stats['avg_batch_write_ms']}"
+    )
+    print(
+        f"record() median_us={statistics.median(record_us):.1f} p99_us={record_us[int(len(record_us) * 0.99)]:.1f} | "
+        f"windows() median_us={statistics.median(read_us):.2f} | "
+        f"submit_s={submit_s:.2f} all_written_s={drained_s:.2f} "
+        f"writer_obs_per_s={stats['written'] / drained_s:.0f}"
+    )
+
+
+def refresh_query_ms(connection: sqlite3.Connection, card_id: str, now: int, rounds: int = 200) -> None:
+    since = now - 90 * DAY_S
+    queries = {
+        "daily_aggregates": (
+            "SELECT card_id, day, price_sum / samples FROM daily_prices WHERE card_id = ? AND day >= ?"
+        ),
+        "raw_group_by": (
+            f"SELECT card_id, (observed_at / {DAY_S}) * {DAY_S} AS day, SUM(price_usd * samples) / SUM(samples) "
+            "FROM observations WHERE card_id = ? AND observed_at >= ? GROUP BY card_id, day, source"
+        ),
+    }
+    timings = []
+    for name, sql in queries.items():
+        started = time.perf_counter()
+        for _ in range(rounds):
+            points = connection.execute(sql, (card_id, since)).fetchall()
+        timings.append(f"{name}_ms={(time.perf_counter() - started) * 1000 / rounds:.2f}")
+    print(f"window refresh query, one card with {len(points)} day/source points: " + " ".join(timings))
+
+
+def bench_maintenance(path: str, cards: int, days: int = 120, scans_per_day: int = 6) -> None:
+    now = int(time.time())
+    rng = random.Random(2)
+    rows = []
+    for card in range(cards):
+        base = rng.uniform(5, 300)
+        for day in range(days):
+            for _ in range(scans_per_day):
+                at = now - day * DAY_S - rng.randrange(DAY_S)
+                for source in SOURCES:
+                    rows.append((f"card-{card}", source, round(base * rng.uniform(0.8, 1.2), 2), at))
+
+    store = PriceHistoryStore(path, retention_days=100, compact_after_days=2, clock=lambda: now)
+    store.start()
+    store.shutdown()  # Schema only; maintenance is driven directly below
+
+    connection = store._connect()
+    store._write(connection, rows)
+    refresh_query_ms(connection, "card-0", now)
+    expected = {}
+    for card in range(cards):
+        card_id = f"card-{card}"
+        daily = {}
+        for row_card, source, price, at in rows:
+            if row_card == card_id and at >= now - 90 * DAY_S:
+                daily.setdefault((at // DAY_S * DAY_S, source), []).append(price)
+        points = [(day, sum(prices) / len(prices)) for (day, _), prices in daily.items()]
+        expected[card_id] = window_statistics(points, now)
+
+    before = connection.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+    connection.execute("UPDATE window_stats SET updated_at = 0")
+    connection.executemany(
+        "INSERT OR REPLACE INTO window_stats VALUES (?, 7, 1, 0, 0, 0, 0, 0, 0, 0)",
+        [(f"card-{card}",) for card in range(cards)]
+    )
+    started = time.perf_counter()
+    store._maintain(connection)
+    maintain_ms = (time.perf_counter() - started) * 1000
+    after = connection.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+    connection.close()
+
+    mismatches = 0
+    for card_id, windows in expected.items():
+        stored = store._windows.get(card_id, {})
+        for days, stats in windows.items():
+            got = stored.get(days)
+            if got is None or abs(got.median - stats.median) > 0.015 or got.count != stats.count:
+                mismatches += 1
+    print(
+        f"maintenance cards={cards} rows_before={before} rows_after={after} "
+        f"compacted={store.compacted_rows} expired={store.expired_rows} "
+        f"ms={maintain_ms:.0f} window_mismatches={mismatches}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cards", type=int, default=2000, help="Distinct cards scanned")
+    parser.add_argument("--scans", type=int, default=20000, help="Scans recorded")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        bench_request_path(os.path.join(directory, "request_path.sqlite3"), args.cards, args.scans)
+        bench_maintenance(os.path.join(directory, "maintenance.sqlite3"), cards=50)
+        size = os.path.getsize(os.path.join(directory, "maintenance.sqlite3"))
+        print(f"maintenance db_bytes={size}")
+
+
+if __name__ == "__main__":
+    main()
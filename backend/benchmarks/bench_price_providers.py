@@ -0,0 +1,206 @@
+"""
+Verify concurrent price providers, per-provider timeouts and partial results.
+
+1. Variants: a card sold in both holofoil and normal. The previous price
+   extraction kept only one TCGPlayer variant; the TCG API provider now
+   returns every variant with a market price.
+2. Fan-out: fake providers with injected latency, queried one after another
+   (as a chain of per-source calls would be) and concurrently.
+3. Provider timeout: one fake provider hangs well past its own timeout; the
+   others' prices come back once that timeout fires.
+4. Deadline: the time left of the scan deadline runs out before the slowest
+   providers answer; the sources already collected are returned.
+5. End to end: PriceService.get_pricing with HTTP marketplace providers
+   against local stub marketplaces, one of them slower than its timeout.
+
+Usage (from backend/):
+    python -m benchmarks.bench_price_providers
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+os.environ.setdefault("PRICE_HISTORY_ENABLED", "false")
+os.environ.setdefault("PREWARM_ENABLED", "false")
+
+from benchmarks.stub_servers import (  # noqa: E402
+    SAMPLE_CARD,
+    StubTCGState,
+    create_marketplace_stub_app,
+    create_tcg_stub_app,
+    serve_in_thread,
+)
+from clients.http_pool import PooledHTTPClient  # noqa: E402
+from clients.pokemon_tcg import PokemonTCGClient  # noqa: E402
+from models.schemas import CardInfo, PriceSource  # noqa: E402
+from services.price_providers import (  # noqa: E402
+    MarketplaceProvider,
+    PriceProvider,
+    TCGAPIProvider,
+    iter_prices,
+    ordered_sources,
+)
+from utils.deadline import Deadline  # noqa: E402
+
+CARD = CardInfo(name="Charizard", set="Base", number="4")
+CARD_DATA = {
+    **SAMPLE_CARD,
+    "tcgplayer": {
+        "url": SAMPLE_CARD["tcgplayer"]["url"],
+        "prices": {
+            "holofoil": {"market": 310.25},
+            "normal": {"market": 120.0},
+            "reverseHolofoil": {"market": 140.0},
+        },
+    },
+}
+
+
+class FakeProvider(PriceProvider):
+    """Provider that answers one fixed price after an injected latency."""
+
+    def __init__(self, name: str, latency_s: float, price_usd: float, timeout_s: float = 5.0):
+        super().__init__(name, timeout_s)
+        self.latency_s = latency_s
+        self.price_usd = price_usd
+
+    async def fetch(self, card_info: CardInfo, card_data: Dict) -> List[PriceSource]:
+        await asyncio.sleep(self.latency_s)
+        return [PriceSource(name=self.name, price_usd=self.price_usd)]
+
+
+def legacy_extract(card_data: Dict) -> Dict[str, float]:
+    """The price extraction as it was: one TCGPlayer variant at most."""
+    prices = {}
+    tcg_prices = card_data.get("tcgplayer", {}).get("prices", {})
+    if "holofoil" in tcg_prices:
+        prices["holofoil"] = tcg_prices["holofoil"].get("market", 0.0)
+    elif "normal" in tcg_prices:
+        prices["normal"] = tcg_prices["normal"].get("market", 0.0)
+    elif "1stEditionHolofoil" in tcg_prices:
+        prices["1stEditionHolofoil"] = tcg_prices["1stEditionHolofoil"].get("market", 0.0)
+    return prices
+
+
+async def gather_prices(
+    providers: Sequence[PriceProvider], timeout_s: Optional[float] = None
+) -> Tuple[List[PriceSource], List[str]]:
+    """Collect every provider's prices as PriceService does: (sources, missing provider names)."""
+    results: Dict[str, Optional[List[PriceSource]]] = {}
+    async for provider, sources in iter_prices(providers, CARD, CARD_DATA, timeout_s):
+        results[provider.name] = sources
+    return ordered_sources(providers, results)
+
+
+def names(sources: List[PriceSource]) -> str:
+    return ", ".join(source.name for source in sources) or "-"
+
+
+async def bench_variants() -> None:
+    provider = TCGAPIProvider(PokemonTCGClient(), timeout_s=1.0)
+    sources = await provider.fetch(CARD, CARD_DATA)
+    print(f"variants   before: {sorted(legacy_extract(CARD_DATA))}")
+    print(f"variants   after:  {names(sources)}")
+
+
+async def bench_fan_out(latencies_ms: List[float]) -> None:
+    providers = [FakeProvider(f"fake-{ms:g}ms", ms / 1000, 100 + i) for i, ms in enumerate(latencies_ms)]
+
+    started = time.perf_counter()
+    sequential = []
+    for provider in providers:
+        sequential.extend(await provider.fetch(CARD, CARD_DATA))
+    sequential_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    sources, missing = await gather_prices(providers)
+    concurrent_ms = (time.perf_counter() - started) * 1000
+    print(
+        f"fan-out    providers={len(providers)} sequential_ms={sequential_ms:.0f} "
+        f"concurrent_ms={concurrent_ms:.0f} sources={len(sources)} missing={missing}"
+    )
+
+
+async def bench_provider_timeout() -> None:
+    hanging = FakeProvider("hanging", latency_s=30.0, price_usd=1.0, timeout_s=0.3)
+    providers = [FakeProvider("fast", 0.05, 100.0), FakeProvider("medium", 0.15, 110.0), hanging]
+    started = time.perf_counter()
+    sources, missing = await gather_prices(providers)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(
+        f"timeout    elapsed_ms={elapsed_ms:.0f} sources=[{names(sources)}] missing={missing} "
+        f"hanging_timeouts={hanging.timeouts}"
+    )
+
+
+async def bench_deadline(remaining_ms: float) -> None:
+    providers = [
+        FakeProvider("fast", 0.05, 100.0),
+        FakeProvider("medium", 0.15, 110.0),
+        FakeProvider("slow", 0.6, 120.0),
+        FakeProvider("slower", 1.2, 130.0),
+    ]
+    deadline = Deadline(remaining_ms / 1000)
+    started = time.perf_counter()
+    sources, missing = await gather_prices(providers, timeout_s=deadline.remaining())
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    misses = sum(provider.deadline_misses for provider in providers)
+    print(
+        f"deadline   budget_ms={remaining_ms:.0f} elapsed_ms={elapsed_ms:.0f} sources=[{names(sources)}] "
+        f"missing={missing} deadline_misses={misses}"
+    )
+
+
+async def bench_end_to_end(slow_ms: float, timeout_ms: float) -> None:
+    from services.price_service import PriceService
+
+    fast_state = StubTCGState(latency_ms=40)
+    slow_state = StubTCGState(latency_ms=slow_ms)
+    with serve_in_thread(create_tcg_stub_app(StubTCGState(latency_ms=20))) as tcg_url, \
+            serve_in_thread(create_marketplace_stub_app(fast_state, price_usd=295.0)) as fast_url, \
+            serve_in_thread(create_marketplace_stub_app(slow_state, price_usd=330.0)) as slow_url:
+        service = PriceService()
+        service.tcg_client.base_url = tcg_url
+        http = PooledHTTPClient(timeout_s=timeout_ms / 1000, max_connections=10,
+                                max_keepalive_connections=10, keepalive_expiry_s=30)
+        service.providers += [
+            MarketplaceProvider("FastMarket", fast_url, http, timeout_s=timeout_ms / 1000),
+            MarketplaceProvider("SlowMarket", slow_url, http, timeout_s=timeout_ms / 1000),
+        ]
+        await service.get_pricing(CARD)  # fills the card cache and opens connections
+
+        started = time.perf_counter()
+        pricing = await service.get_pricing(CARD)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(
+            f"end-to-end elapsed_ms={elapsed_ms:.0f} sources=[{names(pricing.sources)}] "
+            f"missing={pricing.missing_sources} median={pricing.statistics.median:.2f}"
+        )
+        stats = service.provider_stats()
+        print("           " + " ".join(
+            f"{name}: calls={s['calls']} timeouts={s['timeouts']} p95_ms={s['latency_p95_ms']}"
+            for name, s in stats.items()
+        ))
+        await http.aclose()
+        await service.tcg_client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latencies-ms", default="50,100,150,200", help="Fake provider latencies in the fan-out test")
+    parser.add_argument("--deadline-ms", type=float, default=300, help="Time left of the scan deadline in the deadline test")
+    parser.add_argument("--slow-ms", type=float, default=2000, help="Latency of the slow stub marketplace")
+    parser.add_argument("--timeout-ms", type=float, default=800, help="Marketplace provider timeout")
+    args = parser.parse_args()
+
+    asyncio.run(bench_variants())
+    asyncio.run(bench_fan_out([float(ms) for ms in args.latencies_ms.split(",")]))
+    asyncio.run(bench_provider_timeout())
+    asyncio.run(bench_deadline(args.deadline_ms))
+    asyncio.run(bench_end_to_end(args.slow_ms, args.timeout_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Verify the TCG API rate limiter against a stub that enforces a quota.
+
+1. Burst: interactive searches (scans) and background searches (cache
+   refreshes) arrive at once. The previous client sent them all and turned
+   each 429 into a generic error; the scheduler, matched to the quota,
+   serves scans first and sheds background work instead of being throttled.
+2. Retry-After: the scheduler is configured above the real quota. The
+   stub's 429 responses pause the scheduler for their Retry-After, so
+   throttled responses stay few instead of one per excess request.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rate_limit --requests 30 --quota-per-s 10
+"""
+import argparse
+import asyncio
+import time
+from typing import List, Tuple
+
+import httpx
+
+from benchmarks.stub_servers import StubTCGState, create_tcg_stub_app, serve_in_thread
+from clients.pokemon_tcg import PokemonTCGClient
+from clients.rate_limiter import BACKGROUND, INTERACTIVE, PRIORITY_NAMES, OutboundScheduler
+from utils.error_handlers import PricingRateLimitedException
+
+
+async def legacy_search(client: httpx.AsyncClient, base_url: str, name: str, priority: int) -> str:
+    """The search as it was: sent immediately, any error status raised as a generic error."""
+    response = await client.get(f"{base_url}/cards", params={"q": f'name:"{name}"'})
+    if response.status_code >= 400:
+        raise Exception(f"Pokemon TCG API error: {response.status_code}")
+    return "ok"
+
+
+async def scheduled_search(client: PokemonTCGClient, base_url: str, name: str, priority: int) -> str:
+    await client.search_card(name, priority=priority)
+    return "ok"
+
+
+async def run_burst(search, target, base_url: str, count: int) -> Tuple[dict, float]:
+    """Start `count` interactive and `count` background searches at once."""
+    outcomes = {INTERACTIVE: [], BACKGROUND: []}
+    latencies: List[float] = []
+
+    async def one(index: int, priority: int) -> None:
+        started = time.perf_counter()
+        try:
+            outcome = await search(target, base_url, f"Card {priority}-{index}", priority)
+        except PricingRateLimitedException:
+            outcome = "shed"
+        except Exception:
+            outcome = "error"
+        outcomes[priority].append(outcome)
+        if priority == INTERACTIVE and outcome == "ok":
+            latencies.append(time.perf_counter() - started)
+
+    # Background refreshes are already queued when the scans arrive
+    await asyncio.gather(*(
+        one(i, priority) for i in range(count) for priority in (BACKGROUND, INTERACTIVE)
+    ))
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    return outcomes, p95
+
+
+def summarize(outcomes: dict) -> str:
+    parts = []
+    for priority, results in outcomes.items():
+        counts = {kind: results.count(kind) for kind in ("ok", "shed", "error")}
+        parts.append(f"{PRIORITY_NAMES[priority]} ok={counts['ok']} shed={counts['shed']} error={counts['error']}")
+    return " | ".join(parts)
+
+
+def make_client(base_url: str, rate_per_s: float, burst: int) -> PokemonTCGClient:
+    client = PokemonTCGClient()
+    client.base_url = base_url
+    client.scheduler = OutboundScheduler(
+        rate_per_s=rate_per_s,
+        burst=burst,
+        max_wait_s={INTERACTIVE: 4.0, BACKGROUND: 4.0},
+        background_reserve=2,
+    )
+    return client
+
+
+async def main_async(args) -> None:
+    state = StubTCGState(latency_ms=20, quota_per_s=args.quota_per_s, quota_burst=args.quota_burst)
+    with serve_in_thread(create_tcg_stub_app(state)) as base_url:
+        print(f"stub quota: {args.quota_per_s}/s, burst {args.quota_burst}; {args.requests} scans + {args.requests} refreshes")
+
+        async with httpx.AsyncClient() as http:
+            outcomes, p95 = await run_burst(legacy_search, http, base_url, args.requests)
+        print(f"before     {summarize(outcomes)} | upstream_requests={len(state.requests)} throttled={state.throttled}")
+
+        await asyncio.sleep(args.quota_burst / args.quota_per_s + 1)
+        state.reset()
+        client = make_client(base_url, args.quota_per_s, args.quota_burst)
+        outcomes, p95 = await run_burst(scheduled_search, client, base_url, args.requests)
+        await client.aclose()
+        print(
+            f"scheduler  {summarize(outcomes)} | upstream_requests={len(state.requests)} "
+            f"throttled={state.throttled} interactive_p95_s={p95:.2f}"
+        )
+
+        await asyncio.sleep(args.quota_burst / args.quota_per_s + 1)
+        state.reset()
+        client = make_client(base_url, args.quota_per_s * 3, args.quota_burst * 3)
+        outcomes, p95 = await run_burst(scheduled_search, client, base_url, args.requests)
+        stats = client.rate_limit_stats()
+        await client.aclose()
+        print(
+            f"overquota  {summarize(outcomes)} | upstream_requests={len(state.requests)} "
+            f"throttled={state.throttled} pauses={stats['throttled_responses']} paused_s={stats['paused_s_total']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=30, help="Scans and refreshes each")
+    parser.add_argument("--quota-per-s", type=float, default=10.0, help="Stub API quota")
+    parser.add_argument("--quota-burst", type=int, default=5, help="Stub API burst allowance")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
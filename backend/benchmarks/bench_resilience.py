@@ -0,0 +1,158 @@
+"""
+Verify scan deadlines, hedged TCG requests and circuit breaking.
+
+1. Deadline: Vision and the Pokemon TCG API are both slow but each within
+   its own timeout. With per-stage timeouts only, a scan takes their sum;
+   with the scan deadline, pricing gets only what OCR left and the scan
+   fails fast at the deadline.
+2. Hedging: a stub TCG API with a small share of very slow responses.
+   Card lookups are timed with hedging off and on.
+3. Circuit breaker: the stub answers 500. After the failure threshold,
+   lookups fail fast without reaching upstream; once it recovers, a trial
+   call after the reset timeout closes the circuit again.
+
+Usage (from backend/):
+    python -m benchmarks.bench_resilience
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("PRICE_HISTORY_ENABLED", "false")
+
+import httpx  # noqa: E402
+
+from benchmarks.bench_ocr_cache import synthetic_card  # noqa: E402
+from benchmarks.stub_servers import StubTCGState, create_tcg_stub_app, serve_in_thread  # noqa: E402
+from clients.pokemon_tcg import PokemonTCGClient  # noqa: E402
+from clients.rate_limiter import OutboundScheduler  # noqa: E402
+from config import settings  # noqa: E402
+from utils.circuit_breaker import CircuitBreaker  # noqa: E402
+
+OCR_TEXT = "Charizard\nHP 120\nBase Set 4/102 Holo Rare"
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def bench_deadline(vision_ms: float, tcg_ms: float) -> None:
+    from main import app
+    from services.image_preprocessor import image_preprocessor
+    from services.ocr_service import ocr_service
+    from services.price_service import price_service
+
+    # Start the preprocessing pool outside the timed scans
+    image = synthetic_card(1, size=(600, 840))
+    await image_preprocessor.preprocess(image)
+
+    def slow_vision(image_bytes, timeout=None):
+        time.sleep(min(vision_ms / 1000, timeout or vision_ms))
+        return OCR_TEXT
+
+    ocr_service.vision_client.get_full_text = slow_vision
+    ocr_service.result_cache = None
+
+    state = StubTCGState(latency_ms=tcg_ms)
+    with serve_in_thread(create_tcg_stub_app(state)) as stub_url:
+        price_service.tcg_client.base_url = stub_url
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=30) as client:
+            for label, deadline_ms in (("stage timeouts only", 10 ** 6), ("scan deadline", settings.scan_deadline_ms)):
+                settings.scan_deadline_ms = deadline_ms
+                price_service.card_cache.clear()
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/scan", files={"image": ("card.jpg", image, "image/jpeg")}
+                )
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                code = response.json().get("detail", {}).get("error", {}).get("code", "") if response.status_code != 200 else ""
+                print(f"deadline   {label:<20} status={response.status_code} {code:<20} scan_ms={elapsed_ms:.0f}")
+            settings.scan_deadline_ms = deadline_ms
+
+
+async def bench_hedging(lookups: int, concurrency: int) -> None:
+    state = StubTCGState(latency_ms=20, slow_fraction=0.03, slow_latency_ms=800)
+    with serve_in_thread(create_tcg_stub_app(state)) as stub_url:
+        for enabled in (False, True):
+            settings.tcg_hedge_enabled = enabled
+            client = PokemonTCGClient()
+            client.base_url = stub_url
+            client.scheduler = OutboundScheduler(rate_per_s=10 ** 6, burst=10 ** 6)
+            semaphore = asyncio.Semaphore(concurrency)
+            latencies = []
+
+            async def lookup(index: int) -> None:
+                async with semaphore:
+                    started = time.perf_counter()
+                    await client.get_card_by_id(f"card-{enabled}-{index}")
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+            # Warm-up fills the latency window the hedge delay is taken from
+            await asyncio.gather(*(lookup(-i - 1) for i in range(100)))
+            latencies.clear()
+            await asyncio.gather(*(lookup(i) for i in range(lookups)))
+            stats = client.hedging_stats()
+            await client.aclose()
+            print(
+                f"hedging    {'on' if enabled else 'off':<4} p50_ms={statistics.median(latencies):.0f} "
+                f"p95_ms={percentile(latencies, 0.95):.0f} p99_ms={percentile(latencies, 0.99):.0f} "
+                f"max_ms={max(latencies):.0f} hedges={stats['hedges']} wins={stats['hedge_wins']} "
+                f"hedge_delay_ms={stats['hedge_delay_ms']}"
+            )
+
+
+async def bench_breaker(calls: int) -> None:
+    state = StubTCGState(latency_ms=20)
+    with serve_in_thread(create_tcg_stub_app(state)) as stub_url:
+        client = PokemonTCGClient()
+        client.base_url = stub_url
+        client.breaker = CircuitBreaker(failure_threshold=5, reset_timeout_s=1.0)
+
+        state.fail_status = 500
+        outcomes = []
+        for index in range(calls):
+            started = time.perf_counter()
+            try:
+                await client.get_card_by_id(f"card-{index}")
+                outcome = "upstream_error"
+            except Exception as e:
+                outcome = type(e).__name__
+            outcomes.append((outcome, (time.perf_counter() - started) * 1000))
+        failing = [ms for outcome, ms in outcomes if outcome == "upstream_error"]
+        fast = [ms for outcome, ms in outcomes if outcome == "PricingUnavailableException"]
+        print(
+            f"breaker    upstream down: calls={calls} reached_upstream={len(state.requests)} "
+            f"failed_upstream_ms={statistics.median(failing):.1f} failed_fast={len(fast)} "
+            f"failed_fast_ms={statistics.median(fast):.3f} state={client.breaker.state}"
+        )
+
+        state.fail_status = None
+        await asyncio.sleep(1.05)
+        state_before = client.breaker.state
+        card = await client.get_card_by_id("card-recovered")
+        print(
+            f"breaker    upstream back: state_before={state_before} trial_ok={card is not None} "
+            f"state_after={client.breaker.state} trips={client.breaker.trips}"
+        )
+        await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vision-ms", type=float, default=2400, help="Vision stub latency")
+    parser.add_argument("--tcg-ms", type=float, default=2800, help="TCG stub latency in the deadline test")
+    parser.add_argument("--lookups", type=int, default=600, help="Card lookups in the hedging test")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    asyncio.run(bench_deadline(args.vision_ms, args.tcg_ms))
+    asyncio.run(bench_hedging(args.lookups, args.concurrency))
+    asyncio.run(bench_breaker(calls=20))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Replay a traffic spike against synchronous /scan and the scan job queue.
+
+The app runs on a local uvicorn server with Vision replaced by a fixed
+delay and a local TCG API stub. A burst of scans arrives at once, well
+beyond what the OCR concurrency limit can serve within a client timeout.
+
+1. /scan: every request is held open until its scan finishes; requests
+   still unanswered at the client timeout fail (and their work is wasted),
+   and scans running out of deadline count against the Vision circuit
+   breaker (reset before the second spike).
+2. /scan/jobs: jobs beyond the queue's capacity are rejected with 429 and
+   a Retry-After hint before their upload is read; accepted jobs are polled to completion.
+   Queue wait and processing time are reported separately.
+
+Spike requests go over raw asyncio connections, one per request: httpx's
+connection pool slows down sharply with hundreds of concurrent
+connections and would spread the burst out on the client side.
+
+Usage (from backend/):
+    python -m benchmarks.bench_scan_jobs --requests 400 --vision-ms 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Dict, Tuple
+
+os.environ.setdefault("PRICE_HISTORY_ENABLED", "false")
+os.environ.setdefault("PREWARM_ENABLED", "false")
+
+import httpx  # noqa: E402
+
+from benchmarks.bench_ocr_cache import synthetic_card  # noqa: E402
+from benchmarks.stub_servers import StubTCGState, create_tcg_stub_app, serve_in_thread  # noqa: E402
+
+OCR_TEXT = "Charizard\nHP 120\nBase Set 4/102 Holo Rare"
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+def multipart_body(image: bytes) -> Tuple[bytes, str]:
+    """Encode an image upload as multipart/form-data; returns (body, content type)."""
+    boundary = "benchscanjobsboundary"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"image\"; filename=\"card.jpg\"\r\n"
+        f"Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + image + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+async def raw_request(port: int, method: str, path: str, body: bytes = b"", content_type: str = "") -> Tuple[int, Dict[str, str], bytes]:
+    """Send one HTTP/1.1 request on its own connection; returns (status, headers, body)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = f"{method} {path} HTTP/1.1\r\nHost: bench\r\nConnection: close\r\nContent-Length: {len(body)}\r\n"
+    if content_type:
+        head += f"Content-Type: {content_type}\r\n"
+    writer.write(head.encode() + b"\r\n" + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    if headers.get("transfer-encoding") == "chunked":
+        chunks, rest = [], payload
+        while rest:
+            size_line, _, rest = rest.partition(b"\r\n")
+            size = int(size_line, 16)
+            if not size:
+                break
+            chunks.append(rest[:size])
+            rest = rest[size + 2:]
+        payload = b"".join(chunks)
+    return int(lines[0].split()[1]), headers, payload
+
+
+async def spike_sync(port: int, image: bytes, requests: int, timeout_s: float) -> None:
+    body, content_type = multipart_body(image)
+    latencies, outcomes = [], {"ok": 0, "timeout": 0, "error": 0}
+
+    async def one() -> None:
+        started = time.perf_counter()
+        try:
+            status, _, _ = await asyncio.wait_for(
+                raw_request(port, "POST", "/api/v1/scan", body, content_type), timeout=timeout_s
+            )
+        except asyncio.TimeoutError:
+            outcomes["timeout"] += 1
+            return
+        outcomes["ok" if status == 200 else "error"] += 1
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    print(
+        f"/scan       requests={requests} ok={outcomes['ok']} client_timeouts={outcomes['timeout']} "
+        f"errors={outcomes['error']} ok_p50_ms={percentile(latencies, 0.5) * 1000:.0f} "
+        f"ok_p95_ms={percentile(latencies, 0.95) * 1000:.0f} wall_s={time.perf_counter() - started:.1f}"
+    )
+
+
+async def spike_jobs(client: httpx.AsyncClient, port: int, image: bytes, requests: int) -> None:
+    body, content_type = multipart_body(image)
+    accepted, accepted_ms, rejected_ms, retry_after = [], [], [], []
+
+    async def submit() -> None:
+        started = time.perf_counter()
+        status, headers, payload = await raw_request(port, "POST", "/api/v1/scan/jobs", body, content_type)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if status == 202:
+            accepted.append(json.loads(payload)["job_id"])
+            accepted_ms.append(elapsed_ms)
+        elif status == 429:
+            rejected_ms.append(elapsed_ms)
+            retry_after.append(int(headers["retry-after"]))
+        else:
+            raise RuntimeError(f"unexpected status {status}: {payload[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(submit() for _ in range(requests)))
+
+    finished = []
+
+    async def poll(job_id: str) -> None:
+        while True:
+            body = (await client.get(f"/api/v1/scan/jobs/{job_id}")).json()
+            if body["status"] in ("succeeded", "failed"):
+                finished.append(body)
+                return
+            await asyncio.sleep(0.1)
+
+    await asyncio.gather(*(poll(job_id) for job_id in accepted))
+    waits = [body["queue_wait_ms"] for body in finished]
+    processing = [body["processing_ms"] for body in finished]
+    succeeded = sum(1 for body in finished if body["status"] == "succeeded")
+    errors = {}
+    for body in finished:
+        if body["error"]:
+            errors[body["error"]["code"]] = errors.get(body["error"]["code"], 0) + 1
+    print(
+        f"/scan/jobs  requests={requests} accepted={len(accepted)} rejected_429={len(rejected_ms)} "
+        f"accept_p50_ms={statistics.median(accepted_ms):.0f} "
+        f"reject_p50_ms={statistics.median(rejected_ms) if rejected_ms else 0:.0f} "
+        f"retry_after_s={min(retry_after, default=0)}-{max(retry_after, default=0)} "
+        f"succeeded={succeeded}/{len(finished)} errors={errors} wall_s={time.perf_counter() - started:.1f}"
+    )
+    print(
+        f"            queue_wait p50_ms={percentile(waits, 0.5):.0f} p95_ms={percentile(waits, 0.95):.0f} | "
+        f"processing p50_ms={percentile(processing, 0.5):.0f} p95_ms={percentile(processing, 0.95):.0f}"
+    )
+    stats = (await client.get("/api/v1/stats")).json()["scan_jobs"]
+    print(f"            stats: {stats}")
+
+
+async def main_async(args, app_url: str) -> None:
+    image = synthetic_card(1, size=(600, 840))
+    port = int(app_url.rsplit(":", 1)[1])
+    async with httpx.AsyncClient(base_url=app_url, timeout=30) as client:
+        # Warm-up starts the preprocessing pool and the job workers
+        (await client.post("/api/v1/scan", files={"image": ("card.jpg", image, "image/jpeg")})).raise_for_status()
+        await spike_sync(port, image, args.requests, args.client_timeout_s)
+        # Let the abandoned /scan work drain before the second spike
+        await asyncio.sleep(args.requests * args.vision_ms / 1000 / 8)
+        vision = (await client.get("/api/v1/health")).json()["upstreams"]["google_vision"]
+        print(f"            vision breaker after /scan spike: state={vision['state']} trips={vision['trips']}")
+        reset_breaker()
+        await spike_jobs(client, port, image, args.requests)
+        vision = (await client.get("/api/v1/health")).json()["upstreams"]["google_vision"]
+        print(f"            vision breaker after /scan/jobs spike: state={vision['state']} trips={vision['trips']}")
+
+
+def reset_breaker() -> None:
+    """Start the second spike with a closed Vision circuit."""
+    from services.ocr_service import ocr_service
+    from utils.circuit_breaker import CircuitBreaker
+
+    ocr_service.breaker = CircuitBreaker(
+        failure_threshold=ocr_service.breaker.failure_threshold,
+        reset_timeout_s=ocr_service.breaker.reset_timeout_s,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400, help="Scans in the burst")
+    parser.add_argument("--vision-ms", type=float, default=200, help="Vision stub latency")
+    parser.add_argument("--client-timeout-s", type=float, default=5.0, help="Client timeout for /scan")
+    args = parser.parse_args()
+
+    from main import app
+    from services.ocr_service import ocr_service
+
+    def slow_vision(image_bytes, timeout=None):
+        time.sleep(args.vision_ms / 1000)
+        return OCR_TEXT
+
+    ocr_service.vision_client.get_full_text = slow_vision
+    ocr_service.result_cache = None
+
+    with serve_in_thread(create_tcg_stub_app(StubTCGState(latency_ms=20))) as tcg_url, serve_in_thread(app) as app_url:
+        from services.price_service import price_service
+        price_service.tcg_client.base_url = tcg_url
+        asyncio.run(main_async(args, app_url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Compare time to first useful byte of /scan and /scan/stream.
+
+The app runs on a local uvicorn server with Vision replaced by a fixed
+delay and the Pokemon TCG API and two extra marketplaces served by local
+stubs (one marketplace fast, one slow). Each scan starts with a cold card
+cache, so it waits for OCR, the card lookup and every price provider.
+
+For /scan the first useful byte is the whole response. For /scan/stream
+the card arrives after OCR, and prices follow as each provider answers.
+
+Usage (from backend/):
+    python -m benchmarks.bench_scan_stream --scans 10
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("PRICE_HISTORY_ENABLED", "false")
+os.environ.setdefault("PREWARM_ENABLED", "false")
+
+import httpx  # noqa: E402
+
+from benchmarks.bench_ocr_cache import synthetic_card  # noqa: E402
+from benchmarks.stub_servers import (  # noqa: E402
+    StubTCGState,
+    create_marketplace_stub_app,
+    create_tcg_stub_app,
+    serve_in_thread,
+)
+from clients.http_pool import PooledHTTPClient  # noqa: E402
+from services.price_providers import MarketplaceProvider  # noqa: E402
+
+OCR_TEXT = "Charizard\nHP 120\nBase Set 4/102 Holo Rare"
+
+
+def median_ms(values) -> str:
+    return f"{statistics.median(values) * 1000:.0f}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scans", type=int, default=10, help="Scans per endpoint")
+    parser.add_argument("--vision-ms", type=float, default=400, help="Vision stub latency")
+    parser.add_argument("--tcg-ms", type=float, default=300, help="TCG API stub latency")
+    parser.add_argument("--fast-market-ms", type=float, default=150, help="Fast marketplace stub latency")
+    parser.add_argument("--slow-market-ms", type=float, default=700, help="Slow marketplace stub latency")
+    parser.add_argument("--sse", action="store_true", help="Request Server-Sent Events instead of NDJSON")
+    args = parser.parse_args()
+
+    from main import app
+    from services.ocr_service import ocr_service
+    from services.price_service import price_service
+
+    def slow_vision(image_bytes, timeout=None):
+        time.sleep(args.vision_ms / 1000)
+        return OCR_TEXT
+
+    ocr_service.vision_client.get_full_text = slow_vision
+    ocr_service.result_cache = None
+
+    image = synthetic_card(1, size=(600, 840))
+    files = {"image": ("card.jpg", image, "image/jpeg")}
+    with serve_in_thread(create_tcg_stub_app(StubTCGState(latency_ms=args.tcg_ms))) as tcg_url, \
+            serve_in_thread(create_marketplace_stub_app(StubTCGState(latency_ms=args.fast_market_ms), 295.0)) as fast_url, \
+            serve_in_thread(create_marketplace_stub_app(StubTCGState(latency_ms=args.slow_market_ms), 330.0)) as slow_url, \
+            serve_in_thread(app) as app_url:
+        price_service.tcg_client.base_url = tcg_url
+        http = PooledHTTPClient(timeout_s=1.0, max_connections=10, max_keepalive_connections=10, keepalive_expiry_s=30)
+        price_service.providers += [
+            MarketplaceProvider("FastMarket", fast_url, http, timeout_s=1.0),
+            MarketplaceProvider("SlowMarket", slow_url, http, timeout_s=1.0),
+        ]
+
+        with httpx.Client(base_url=app_url, timeout=30) as client:
+            # Warm-up starts the preprocessing pool and opens upstream connections
+            client.post("/api/v1/scan", files=files).raise_for_status()
+
+            totals = []
+            for _ in range(args.scans):
+                price_service.card_cache.clear()
+                started = time.perf_counter()
+                response = client.post("/api/v1/scan", files=files)
+                response.raise_for_status()
+                totals.append(time.perf_counter() - started)
+            sources = len(response.json()["pricing"]["sources"])
+            print(f"/scan         first_useful_ms={median_ms(totals)} complete_ms={median_ms(totals)} sources={sources}")
+
+            headers = {"Accept": "text/event-stream"} if args.sse else {}
+            firsts = {"card": [], "price": [], "metadata": []}
+            for _ in range(args.scans):
+                price_service.card_cache.clear()
+                started = time.perf_counter()
+                seen = {}
+                with client.stream("POST", "/api/v1/scan/stream", files=files, headers=headers) as response:
+                    response.raise_for_status()
+                    for line in response.iter_lines():
+                        if args.sse:
+                            if not line.startswith("event: "):
+                                continue
+                            event = line[len("event: "):]
+                        elif line:
+                            event = json.loads(line)["event"]
+                        else:
+                            continue
+                        seen.setdefault(event, time.perf_counter() - started)
+                        seen[f"{event}_count"] = seen.get(f"{event}_count", 0) + 1
+                for event in firsts:
+                    firsts[event].append(seen[event])
+            print(
+                f"/scan/stream  first_useful_ms={median_ms(firsts['card'])} (card) "
+                f"first_price_ms={median_ms(firsts['price'])} complete_ms={median_ms(firsts['metadata'])} "
+                f"sources={seen.get('price_count', 0)} format={'sse' if args.sse else 'ndjson'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
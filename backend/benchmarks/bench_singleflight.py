@@ -0,0 +1,63 @@
+"""
+Verify that concurrent identical scans share one upstream TCG lookup.
+
+Fires N concurrent /api/v1/scan requests (stub OCR always yields the same
+card) at the app while the Pokemon TCG API is a local stub server, then
+asserts the stub saw exactly one search request.
+
+Usage (from backend/):
+    python -m benchmarks.bench_singleflight --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.bench_ocr_cache import synthetic_card
+from benchmarks.stub_servers import StubTCGState, create_tcg_stub_app, serve_in_thread
+
+
+async def fire_scans(concurrency: int) -> list:
+    """Send `concurrency` simultaneous scan requests through the ASGI app."""
+    from main import app
+
+    image_bytes = synthetic_card(0, size=(600, 840))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+        async def scan():
+            files = {"image": ("card.jpg", image_bytes, "image/jpeg")}
+            return await client.post("/api/v1/scan", files=files)
+
+        return await asyncio.gather(*[scan() for _ in range(concurrency)])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Stub TCG API latency")
+    args = parser.parse_args()
+
+    from services.price_service import price_service
+
+    state = StubTCGState(latency_ms=args.latency_ms)
+    with serve_in_thread(create_tcg_stub_app(state)) as stub_url:
+        price_service.tcg_client.base_url = stub_url
+        price_service.card_cache.clear()
+
+        start = time.perf_counter()
+        responses = asyncio.run(fire_scans(args.concurrency))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+    statuses = sorted({r.status_code for r in responses})
+    stats = price_service.tcg_client.search_flight.stats()
+    print(f"scans={args.concurrency} statuses={statuses} elapsed_ms={elapsed_ms:.1f}")
+    print(f"upstream_requests={len(state.requests)} coalescing={stats}")
+
+    assert statuses == [200], f"unexpected statuses {statuses}"
+    assert len(state.requests) == 1, f"expected 1 upstream request, got {len(state.requests)}"
+    print("OK: concurrent identical scans shared a single upstream request")
+
+
+if __name__ == "__main__":
+    main()
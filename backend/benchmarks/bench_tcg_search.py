@@ -0,0 +1,141 @@
+"""
+Measure upstream calls and bytes per card search, before and after the query planner.
+
+A stub Pokemon TCG API serves full-size card documents (attacks, abilities,
+images, legalities...) for many printings of a few popular cards, and
+filters searches by `q` like the real API. Each scenario is an OCR result;
+it is resolved with the previous single strict query (all fields, first
+result) and with PokemonTCGClient's query plan (cascade, `select`,
+`pageSize`, local ranking).
+
+Usage (from backend/):
+    python -m benchmarks.bench_tcg_search
+"""
+import asyncio
+import random
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.stub_servers import StubTCGState, create_tcg_stub_app, serve_in_thread
+from clients.pokemon_tcg import PokemonTCGClient
+
+SETS = [
+    ("base1", "Base", 102), ("base2", "Jungle", 64), ("base3", "Fossil", 62), ("base4", "Base Set 2", 130),
+    ("gym1", "Gym Heroes", 132), ("neo1", "Neo Genesis", 111), ("ex3", "Dragon", 97), ("dp1", "Diamond & Pearl", 130),
+    ("xy12", "Evolutions", 108), ("sm115", "Hidden Fates", 68), ("swsh4", "Vivid Voltage", 185),
+    ("swsh7", "Evolving Skies", 203), ("sv3", "Obsidian Flames", 197), ("sv3pt5", "151", 165),
+]
+NAMES = ["Charizard", "Pikachu", "Blastoise", "Mewtwo", "Gengar"]
+VARIANTS = ["{}", "{} V", "{} ex", "Dark {}", "{} VMAX"]
+
+# (label, OCR name, OCR set, OCR number, expected card id)
+SCENARIOS = [
+    ("exact name/set/number", "Charizard", "Base Set", "4/102", "base1-4"),
+    ("misread set name", "Charizard", "Jungle", "4/102", "base1-4"),
+    ("no set read", "Charizard", None, "4/102", "base1-4"),
+    ("number without total", "Pikachu V", "Vivid Voltage", "43", "swsh4-43"),
+    ("name only", "Mewtwo", None, None, None),
+]
+
+
+def full_card(card_id: str, name: str, number: str, set_info, rng: random.Random) -> Dict:
+    """A card document with the size and shape of a real /v2/cards result."""
+    set_id, set_name, total = set_info
+    attack_text = "Discard 2 Energy attached to this Pokémon. " * 3
+    return {
+        "id": card_id, "name": name, "supertype": "Pokémon", "subtypes": ["Stage 2"], "hp": "120",
+        "types": ["Fire"], "evolvesFrom": "Charmeleon",
+        "abilities": [{"name": "Energy Burn", "text": "As often as you like during your turn " * 3, "type": "Pokémon Power"}],
+        "attacks": [
+            {"name": f"Attack {i}", "cost": ["Fire"] * 3, "convertedEnergyCost": 3, "damage": "100", "text": attack_text}
+            for i in range(2)
+        ],
+        "weaknesses": [{"type": "Water", "value": "×2"}], "resistances": [{"type": "Fighting", "value": "-30"}],
+        "retreatCost": ["Colorless"] * 3, "convertedRetreatCost": 3,
+        "set": {
+            "id": set_id, "name": set_name, "series": "Series", "printedTotal": total, "total": total,
+            "legalities": {"unlimited": "Legal"}, "ptcgoCode": set_id.upper(), "releaseDate": "1999/01/09",
+            "updatedAt": "2022/10/10 15:12:00",
+            "images": {"symbol": f"https://images.pokemontcg.io/{set_id}/symbol.png",
+                       "logo": f"https://images.pokemontcg.io/{set_id}/logo.png"},
+        },
+        "number": number, "artist": "Mitsuhiro Arita", "rarity": "Rare Holo",
+        "flavorText": "Spits fire that is hot enough to melt boulders. " * 2,
+        "nationalPokedexNumbers": [6], "legalities": {"unlimited": "Legal"},
+        "images": {"small": f"https://images.pokemontcg.io/{set_id}/{number}.png",
+                   "large": f"https://images.pokemontcg.io/{set_id}/{number}_hires.png"},
+        "tcgplayer": {
+            "url": f"https://prices.pokemontcg.io/tcgplayer/{card_id}", "updatedAt": "2024/01/01",
+            "prices": {"holofoil": {"low": 10.0, "mid": 20.0, "high": 90.0, "market": round(rng.uniform(5, 500), 2)}},
+        },
+        "cardmarket": {
+            "url": f"https://prices.pokemontcg.io/cardmarket/{card_id}", "updatedAt": "2024/01/01",
+            "prices": {"averageSellPrice": round(rng.uniform(5, 500), 2), "trendPrice": 20.0, "avg1": 19.0,
+                       "avg7": 21.0, "avg30": 22.0, "lowPrice": 3.0, "reverseHoloTrend": 4.0},
+        },
+    }
+
+
+def build_cards() -> List[Dict]:
+    rng = random.Random(3)
+    cards = []
+    for set_info in SETS:
+        number = 1
+        for name in NAMES:
+            for variant in VARIANTS:
+                card_id = f"{set_info[0]}-{number}"
+                cards.append(full_card(card_id, variant.format(name), str(number), set_info, rng))
+                number += 1
+    # Pin the printings the scenarios expect
+    by_id = {card["id"]: card for card in cards}
+    by_id["base1-4"].update(name="Charizard", number="4")
+    by_id["swsh4-43"] = full_card("swsh4-43", "Pikachu V", "43", SETS[10], rng)
+    return list(by_id.values())
+
+
+async def legacy_search(base_url: str, name: str, set_name: Optional[str], number: Optional[str]) -> Optional[Dict]:
+    """The search as it was: one strict query, full documents, first result."""
+    parts = [f'name:"{name}"']
+    if set_name:
+        parts.append(f'set.name:"{set_name}"')
+    if number:
+        parts.append(f'number:"{number}"')
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"{base_url}/cards", params={"q": " ".join(parts)})
+        data = response.json().get("data")
+        return data[0] if data else None
+
+
+async def run(base_url: str, state: StubTCGState) -> None:
+    print(f"{'scenario':<24} {'approach':<8} {'calls':>5} {'bytes':>9}  result")
+    totals = {"before": [0, 0], "after": [0, 0]}
+    for label, name, set_name, number, expected in SCENARIOS:
+        for approach in ("before", "after"):
+            state.reset()
+            if approach == "before":
+                card = await legacy_search(base_url, name, set_name, number)
+            else:
+                client = PokemonTCGClient()
+                client.base_url = base_url
+                card = await client.search_card(name, set_name, number)
+                await client.aclose()
+            found = card["id"] if card else None
+            verdict = "ok" if expected is None and found or found == expected else "WRONG"
+            totals[approach][0] += len(state.requests)
+            totals[approach][1] += state.response_bytes
+            print(f"{label:<24} {approach:<8} {len(state.requests):>5} {state.response_bytes:>9}  {found} ({verdict})")
+
+    for approach, (calls, size) in totals.items():
+        print(f"total {approach}: calls_per_scan={calls / len(SCENARIOS):.1f} bytes_per_scan={size / len(SCENARIOS):.0f}")
+
+
+def main() -> None:
+    state = StubTCGState()
+    cards = build_cards()
+    with serve_in_thread(create_tcg_stub_app(state, cards)) as base_url:
+        asyncio.run(run(base_url, state))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Check that server memory stays bounded under a burst of large uploads.
+
+Starts the API in a uvicorn subprocess (stub OCR, no TCG access needed),
+fires N concurrent ~5 MB uploads at /api/v1/scan and reports the server's
+peak RSS (VmHWM from /proc, Linux only) along with the response mix. With
+the upload budget in place, the peak stays near the configured budget
+instead of growing with N; excess uploads get 503 SERVER_BUSY.
+
+The run fails (exit status 1) when the budget's peak reservation exceeds
+its capacity, when RSS grows by more than --max-growth-factor times the
+budget (each reserved byte is held a few times over: the parsed multipart
+part, the upload buffer and the preprocessed copy), or when an upload
+gets anything other than 200 or 503.
+
+Usage (from backend/):
+    python -m benchmarks.bench_upload_memory --uploads 200
+"""
+import argparse
+import asyncio
+import collections
+import io
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+from PIL import Image
+
+from benchmarks.stub_servers import _free_port
+
+
+def large_jpeg(target_bytes: int) -> bytes:
+    """Encode a noisy image sized just under `target_bytes`."""
+    rng = random.Random(7)
+    side = 1200
+    while True:
+        image = Image.frombytes("RGB", (side, side), bytes(rng.getrandbits(8) for _ in range(side * side * 3)))
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=95)
+        if buffer.tell() >= target_bytes * 0.8 or side > 3000:
+            data = buffer.getvalue()
+            return data[:target_bytes] if len(data) > target_bytes else data
+        side = int(side * 1.3)
+
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def burst(url: str, payload: bytes, uploads: int) -> collections.Counter:
+    limits = httpx.Limits(max_connections=uploads)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        async def upload():
+            files = {"image": ("card.jpg", payload, "image/jpeg")}
+            try:
+                response = await client.post("/api/v1/scan", files=files)
+                return response.status_code
+            except httpx.HTTPError as e:
+                return type(e).__name__
+
+        return collections.Counter(await asyncio.gather(*[upload() for _ in range(uploads)]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--size-mb", type=float, default=4.9)
+    parser.add_argument("--max-growth-factor", type=float, default=4.0,
+                        help="Largest RSS growth allowed, as a multiple of the upload budget")
+    args = parser.parse_args()
+
+    payload = large_jpeg(int(args.size_mb * 1024 * 1024))
+    port = _free_port()
+    env = {**os.environ, "POKEMON_TCG_API_URL": "http://127.0.0.1:9"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        for _ in range(100):
+            try:
+                httpx.get(f"{url}/api/v1/health")
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        idle_rss = peak_rss_mb(server.pid)
+
+        start = time.perf_counter()
+        statuses = asyncio.run(burst(url, payload, args.uploads))
+        elapsed = time.perf_counter() - start
+        budget = httpx.get(f"{url}/api/v1/stats").json()["upload_budget"]
+        peak = peak_rss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"uploads={args.uploads} size_bytes={len(payload)} elapsed_s={elapsed:.1f}")
+    print(f"statuses={dict(statuses)}")
+    print(f"server idle_rss_mb={idle_rss:.0f} peak_rss_mb={peak:.0f} growth_mb={peak - idle_rss:.0f}")
+    print(f"budget capacity_mb={budget['capacity_bytes'] / 2**20:.0f} "
+          f"peak_reserved_mb={budget['peak_in_use_bytes'] / 2**20:.1f} rejected={budget['rejected']}")
+    print(f"unbounded worst case would buffer {args.uploads * len(payload) / 2**20:.0f} MB")
+
+    capacity_mb = budget["capacity_bytes"] / 2**20
+    failures = []
+    if budget["peak_in_use_bytes"] > budget["capacity_bytes"]:
+        failures.append(f"peak reservation {budget['peak_in_use_bytes']} exceeds capacity {budget['capacity_bytes']}")
+    if peak - idle_rss > capacity_mb * args.max_growth_factor:
+        failures.append(f"RSS grew {peak - idle_rss:.0f} MB, over {args.max_growth_factor:g}x the {capacity_mb:.0f} MB budget")
+    unexpected = {status: count for status, count in statuses.items() if status not in (200, 503)}
+    if unexpected:
+        failures.append(f"unexpected responses {unexpected}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print("PASS memory stayed within the upload budget bounds")
+
+
+if __name__ == "__main__":
+    main()
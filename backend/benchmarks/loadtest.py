@@ -0,0 +1,250 @@
+"""
+Load-test /api/v1/scan at increasing concurrency against local stub upstreams.
+
+The API runs in a uvicorn subprocess (benchmarks.loadtest_server) with
+Vision replaced by a StubVision of configurable latency and error rate,
+and the Pokemon TCG API served by a local stub with configurable
+latency, error rate and quota (429 with Retry-After). Card lookups fail
+with 503 instead of falling back to placeholder prices
+(PRICE_STUB_FALLBACK=false), so upstream failures show up as errors.
+
+At each concurrency level, that many clients send scans back to back
+(closed loop) for a fixed time. Reported per level: throughput, end-to-end
+latency p50/p95/p99, p50/p95/p99 of each stage from the responses'
+stage breakdown (METRICS_STAGE_BREAKDOWN), and responses by status.
+
+--save-baseline writes the results to a JSON file; --baseline compares a
+run against one and exits with status 1 if throughput dropped, or
+latency or the error rate rose, beyond the tolerance.
+
+Usage (from backend/):
+    python -m benchmarks.loadtest --levels 1,4,16,64 --duration 5 --save-baseline benchmarks/data/loadtest_baseline.json
+    python -m benchmarks.loadtest --baseline benchmarks/data/loadtest_baseline.json
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.bench_ocr_cache import synthetic_card
+from benchmarks.bench_scan_jobs import multipart_body, percentile, raw_request
+from benchmarks.stub_servers import StubTCGState, _free_port, create_tcg_stub_app, serve_in_thread
+
+# Stages compared against the baseline; the rest are reported only
+COMPARED_STAGES = ("upload", "preprocess", "vision", "parse", "card_lookup")
+
+
+def server_env(args, tcg_url: str) -> Dict[str, str]:
+    """Environment of the API subprocess."""
+    return {
+        **os.environ,
+        "POKEMON_TCG_API_URL": tcg_url,
+        # Every scan goes through Vision; card lookups expire quickly so the
+        # TCG stub keeps being called
+        "OCR_CACHE_ENABLED": "false",
+        "PRICE_CACHE_TTL_S": str(args.price_cache_ttl_s),
+        "PRICE_CACHE_STALE_TTL_S": "0",
+        "PRICE_CACHE_NEGATIVE_TTL_S": "0",
+        "PRICE_STUB_FALLBACK": "false",
+        "PRICE_HISTORY_ENABLED": "false",
+        "PREWARM_ENABLED": "false",
+        "METRICS_STAGE_BREAKDOWN": "true",
+        # The stub's quota is what limits TCG requests here
+        "TCG_RATE_LIMIT_PER_MINUTE": "600000",
+        "TCG_RATE_LIMIT_BURST": "1000",
+        "LOG_LEVEL": "WARNING",
+    }
+
+
+def wait_ready(url: str, server: subprocess.Popen) -> None:
+    for _ in range(300):
+        if server.poll() is not None:
+            raise RuntimeError(f"API server exited with status {server.returncode}")
+        try:
+            if httpx.get(f"{url}/api/v1/health").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("API server did not start")
+
+
+async def run_level(port: int, uploads: List[tuple], concurrency: int, duration_s: float) -> dict:
+    """Run `concurrency` closed-loop clients for `duration_s`; returns the level's results."""
+    latencies: List[float] = []
+    stages: Dict[str, List[float]] = collections.defaultdict(list)
+    statuses: collections.Counter = collections.Counter()
+    deadline = time.perf_counter() + duration_s
+
+    async def client(offset: int) -> None:
+        index = offset
+        while time.perf_counter() < deadline:
+            body, content_type = uploads[index % len(uploads)]
+            index += concurrency
+            started = time.perf_counter()
+            try:
+                status, _, payload = await raw_request(port, "POST", "/api/v1/scan", body, content_type)
+            except OSError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            statuses[str(status)] += 1
+            if status != 200:
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            for name, ms in (json.loads(payload)["metadata"].get("stages_ms") or {}).items():
+                stages[name].append(ms)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client(offset) for offset in range(concurrency)])
+    elapsed_s = time.perf_counter() - started
+    total = sum(statuses.values())
+
+    def summary(values: List[float]) -> Dict[str, float]:
+        return {f"p{q}": round(percentile(values, q / 100), 1) for q in (50, 95, 99)}
+
+    return {
+        "requests": total,
+        "throughput_rps": round(len(latencies) / elapsed_s, 2),
+        "error_rate": round(1 - len(latencies) / total, 4) if total else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "latency_ms": summary(latencies),
+        "stages_ms": {name: summary(values) for name, values in sorted(stages.items())},
+    }
+
+
+def print_level(concurrency: int, result: dict) -> None:
+    latency = result["latency_ms"]
+    print(
+        f"c={concurrency:<4} requests={result['requests']:<5} rps={result['throughput_rps']:<7} "
+        f"p50_ms={latency['p50']:<7} p95_ms={latency['p95']:<7} p99_ms={latency['p99']:<7} "
+        f"statuses={result['statuses']}"
+    )
+    for name, values in result["stages_ms"].items():
+        print(f"       stage {name:<16} p50_ms={values['p50']:<7} p95_ms={values['p95']:<7} p99_ms={values['p99']}")
+
+
+def compare(baseline: dict, levels: Dict[str, dict], tolerance: float, min_delta_ms: float) -> List[str]:
+    """
+    Compare a run with a baseline.
+
+    Args:
+        baseline: Saved results (see --save-baseline)
+        levels: This run's results per concurrency level
+        tolerance: Relative change allowed (0.25 = 25%)
+        min_delta_ms: Latency increases smaller than this are never regressions
+
+    Returns:
+        One line per regression
+    """
+    regressions = []
+
+    def check_latency(level: str, label: str, before: float, after: float) -> None:
+        if after - before > max(before * tolerance, min_delta_ms):
+            regressions.append(f"c={level} {label} {before} -> {after} ms")
+
+    for level, before in baseline["levels"].items():
+        after = levels.get(level)
+        if after is None:
+            continue
+        if after["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"c={level} throughput {before['throughput_rps']} -> {after['throughput_rps']} rps")
+        if after["error_rate"] > before["error_rate"] + 0.01:
+            regressions.append(f"c={level} error_rate {before['error_rate']} -> {after['error_rate']}")
+        for q in ("p50", "p95", "p99"):
+            check_latency(level, f"latency {q}", before["latency_ms"][q], after["latency_ms"][q])
+        for name in COMPARED_STAGES:
+            if name in before["stages_ms"] and name in after["stages_ms"]:
+                check_latency(level, f"stage {name} p95", before["stages_ms"][name]["p95"], after["stages_ms"][name]["p95"])
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--levels", default="1,4,16,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per level")
+    parser.add_argument("--images", type=int, default=16, help="Distinct card images uploaded")
+    parser.add_argument("--vision-ms", type=float, default=150, help="Stub Vision minimum latency")
+    parser.add_argument("--vision-jitter-ms", type=float, default=50, help="Stub Vision extra latency (uniform)")
+    parser.add_argument("--vision-error-rate", type=float, default=0.0, help="Share of stub Vision calls failing")
+    parser.add_argument("--tcg-ms", type=float, default=60, help="Stub TCG API latency")
+    parser.add_argument("--tcg-slow-fraction", type=float, default=0.02, help="Share of TCG responses that are slow")
+    parser.add_argument("--tcg-slow-ms", type=float, default=400, help="Latency of the slow TCG responses")
+    parser.add_argument("--tcg-error-rate", type=float, default=0.0, help="Share of TCG requests answered 500")
+    parser.add_argument("--tcg-quota-per-s", type=float, default=None, help="Stub TCG quota (429 beyond it)")
+    parser.add_argument("--price-cache-ttl-s", type=float, default=1.0, help="Card lookup cache TTL in the API")
+    parser.add_argument("--save-baseline", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this baseline; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Relative change allowed vs the baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=15, help="Latency noise floor for the comparison")
+    args = parser.parse_args()
+    concurrency_levels = [int(level) for level in args.levels.split(",")]
+
+    config = {
+        key: getattr(args, key)
+        for key in ("duration", "images", "vision_ms", "vision_jitter_ms", "vision_error_rate", "tcg_ms",
+                    "tcg_slow_fraction", "tcg_slow_ms", "tcg_error_rate", "tcg_quota_per_s", "price_cache_ttl_s")
+    }
+    uploads = [multipart_body(synthetic_card(index, size=(600, 840))) for index in range(args.images)]
+    tcg_state = StubTCGState(
+        latency_ms=args.tcg_ms,
+        quota_per_s=args.tcg_quota_per_s,
+        quota_burst=max(1, int(args.tcg_quota_per_s or 1)),
+        slow_fraction=args.tcg_slow_fraction,
+        slow_latency_ms=args.tcg_slow_ms,
+        error_rate=args.tcg_error_rate,
+    )
+
+    port = _free_port()
+    with serve_in_thread(create_tcg_stub_app(tcg_state)) as tcg_url:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.loadtest_server", "--port", str(port),
+             "--vision-ms", str(args.vision_ms), "--vision-jitter-ms", str(args.vision_jitter_ms),
+             "--vision-error-rate", str(args.vision_error_rate)],
+            env=server_env(args, tcg_url),
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_ready(f"http://127.0.0.1:{port}", server)
+            # Warm up connections, the preprocessing pool and the TCG latency estimate
+            asyncio.run(run_level(port, uploads, 2, 1.0))
+            levels = {}
+            for concurrency in concurrency_levels:
+                tcg_state.reset()
+                levels[str(concurrency)] = asyncio.run(run_level(port, uploads, concurrency, args.duration))
+                print_level(concurrency, levels[str(concurrency)])
+                print(f"       tcg_stub requests={len(tcg_state.requests)} throttled={tcg_state.throttled} "
+                      f"errors={tcg_state.errors}")
+        finally:
+            server.terminate()
+            server.wait()
+
+    results = {"config": config, "levels": levels}
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        changed = {key for key in config if baseline["config"].get(key) != config[key]}
+        if changed:
+            print(f"note: configuration differs from the baseline: {sorted(changed)}")
+        regressions = compare(baseline, levels, args.tolerance, args.min_delta_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print(f"baseline comparison: {len(regressions)} regression(s) at tolerance {args.tolerance:.0%}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Run the API for load tests, with Vision replaced by a StubVision.
+
+Vision is called through its gRPC client inside the API process, so the
+stub is installed there rather than served on a port; the TCG API is
+reached over HTTP at POKEMON_TCG_API_URL as usual. Started by
+benchmarks.loadtest in a subprocess, so the load generator does not
+share the server's event loop or GIL.
+
+Usage (from backend/):
+    POKEMON_TCG_API_URL=http://127.0.0.1:8001 python -m benchmarks.loadtest_server --port 8000 --vision-ms 150
+"""
+import argparse
+
+import uvicorn
+
+# Distinct OCR texts, so scans spread over many card lookups
+VISION_TEXTS = [f"Charizard\nHP 120\nBase Set {number}/102 Holo Rare" for number in range(1, 103)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, required=True, help="Port to serve the API on")
+    parser.add_argument("--vision-ms", type=float, default=150, help="Stub Vision minimum latency")
+    parser.add_argument("--vision-jitter-ms", type=float, default=50, help="Stub Vision extra latency (uniform)")
+    parser.add_argument("--vision-error-rate", type=float, default=0.0, help="Share of stub Vision calls failing")
+    args = parser.parse_args()
+
+    from benchmarks.stub_servers import StubVision
+    from main import app
+    from services.ocr_service import ocr_service
+
+    StubVision(
+        latency_ms=args.vision_ms,
+        jitter_ms=args.vision_jitter_ms,
+        error_rate=args.vision_error_rate,
+        texts=VISION_TEXTS,
+    ).install(ocr_service)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", backlog=2048)
+
+
+if __name__ == "__main__":
+    main()
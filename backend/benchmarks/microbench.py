@@ -0,0 +1,308 @@
+"""
+Microbenchmarks of the in-process work every scan does, with a JSON report.
+
+Benchmarks, on fixed fixtures (the OCR texts of data/ocr_texts.txt and
+the stub TCG API's card document):
+
+- parse: parse_full_card_info with the bundled card-name index, once
+  per corpus text (one call is a pass over the corpus)
+- price_sources: the TCG API provider building PriceSource models
+- statistics: PriceService._calculate_statistics over those sources
+- build_result: the PricingResult the /scan handler returns
+- serialize_response_model: FastAPI's handling of a model returned with
+  response_model (validated again, then encoded with the route's
+  response class), as /scan responses were encoded before ModelResponse
+- serialize: encoding the PricingResult with ModelResponse, as /scan does
+- scan_cpu: all of the above for one scan (of the corpus' Charizard)
+
+Before timing, both encodings of the PricingResult built from every
+corpus text are checked to be byte-identical.
+
+Each benchmark is warmed up, then timed in repeats of a fixed number of
+calls with the garbage collector off; the report keeps the fastest and
+median repeat. Memory is measured separately under tracemalloc: the peak
+bytes allocated during one call and the blocks still allocated per call
+after many calls.
+
+--output writes the report as JSON; --compare checks a run against an
+earlier report and exits with status 1 when a benchmark got slower, or
+allocates more, beyond the tolerance. Timings depend on the machine and
+its load, so compare reports made on the same machine; the allocation
+figures do not.
+
+Usage (from backend/):
+    python -m benchmarks.microbench --output /tmp/before.json
+    python -m benchmarks.microbench --compare /tmp/before.json
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import serialize_response
+
+from benchmarks.bench_parser import CORPUS_PATH, load_corpus
+from benchmarks.stub_servers import SAMPLE_CARD
+from models.schemas import CardInfo, PricingData, PricingResult, RollingPriceStatistics, ScanMetadata
+from services.card_parser import parse_full_card_info
+from services.name_index import card_name_index
+from services.price_providers import TCGAPIProvider
+from utils.responses import ModelResponse
+
+# Stage breakdown of a typical scan, as returned with METRICS_STAGE_BREAKDOWN
+STAGES_MS = {"upload": 1.3, "image_read": 0.0, "preprocess": 6.3, "vision": 176.2, "parse": 0.2,
+             "card_lookup": 65.1, "price_providers": 0.2}
+
+
+def run_sync(coroutine):
+    """Run a coroutine that never suspends, without an event loop."""
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("coroutine suspended")
+
+
+def scan_route():
+    from main import app
+
+    return next(route for route in app.routes if getattr(route, "path", None) == "/api/v1/scan")
+
+
+class ScanFixtures:
+    """Inputs of each benchmarked step, and the steps themselves."""
+
+    def __init__(self):
+        from services.price_service import price_service
+
+        card_name_index.load()
+        self.texts = [text for text, _ in load_corpus(CORPUS_PATH)]
+        self.card_data = SAMPLE_CARD
+        self.provider = TCGAPIProvider(price_service.tcg_client, timeout_s=1.0)
+        self.price_service = price_service
+        self.windows = {
+            f"{days}d": RollingPriceStatistics(days=days, count=days * 3, average=305.2, median=301.5,
+                                               p10=280.0, p25=290.1, p75=315.9, p90=330.4)
+            for days in (7, 30, 90)
+        }
+
+        route = scan_route()
+        self.response_field = route.response_field
+        response_class = route.response_class
+        self.response_class = response_class.value if isinstance(response_class, DefaultPlaceholder) else response_class
+
+        self.card_info = self.parse_text(self.texts[0])
+        self.sources = self.price_sources()
+        self.result = self.build_result()
+
+    @staticmethod
+    def parse_text(text: str) -> CardInfo:
+        return CardInfo(**parse_full_card_info(text, name_index=card_name_index))
+
+    def parse(self) -> List[CardInfo]:
+        return [self.parse_text(text) for text in self.texts]
+
+    def price_sources(self):
+        return run_sync(self.provider.fetch(self.card_info, self.card_data))
+
+    def statistics(self):
+        return self.price_service._calculate_statistics(self.sources)
+
+    def build_result(self, card_info=None, sources=None) -> PricingResult:
+        sources = sources if sources is not None else self.sources
+        statistics_data = self.price_service._calculate_statistics(sources)
+        statistics_data.windows = self.windows
+        return PricingResult(
+            card=card_info or self.card_info,
+            pricing=PricingData(sources=sources, statistics=statistics_data, missing_sources=[]),
+            metadata=ScanMetadata(scan_time_ms=250, confidence_score=0.95, stages_ms=STAGES_MS),
+        )
+
+    def serialize_response_model(self, result=None) -> bytes:
+        content = run_sync(serialize_response(field=self.response_field, response_content=result or self.result))
+        return self.response_class(content).body
+
+    def serialize(self, result=None) -> bytes:
+        return ModelResponse(result or self.result).body
+
+    def identical_bodies(self) -> bool:
+        """Whether both encodings agree for the result of every corpus text."""
+        results = [self.build_result(card_info) for card_info in self.parse()]
+        return all(self.serialize(result) == self.serialize_response_model(result) for result in results)
+
+    def scan_cpu(self) -> bytes:
+        card_info = self.parse_text(self.texts[0])
+        sources = run_sync(self.provider.fetch(card_info, self.card_data))
+        return self.serialize(self.build_result(card_info, sources))
+
+
+def time_benchmark(fn: Callable[[], object], warmup_s: float, repeat_s: float, repeats: int) -> dict:
+    """Time `fn` in `repeats` repeats of about `repeat_s` each, after `warmup_s` of calls."""
+    warmup_until = time.perf_counter() + warmup_s
+    calls = 0
+    while time.perf_counter() < warmup_until:
+        fn()
+        calls += 1
+    number = max(1, int(calls * repeat_s / warmup_s)) if warmup_s else 1000
+
+    per_call_ns: List[float] = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            started = time.perf_counter_ns()
+            for _ in range(number):
+                fn()
+            per_call_ns.append((time.perf_counter_ns() - started) / number)
+    finally:
+        gc.enable()
+    median = statistics.median(per_call_ns)
+    return {
+        "ns_per_call_min": round(min(per_call_ns)),
+        "ns_per_call_median": round(median),
+        "rel_stdev": round(statistics.pstdev(per_call_ns) / median, 4),
+        "calls_per_repeat": number,
+        "repeats": repeats,
+    }
+
+
+def measure_memory(fn: Callable[[], object], calls: int) -> dict:
+    """Peak bytes allocated by one call, and blocks/bytes left allocated per call, under tracemalloc."""
+    tracemalloc.start()
+    try:
+        fn()
+        gc.collect()
+        peaks = []
+        for _ in range(5):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+
+        gc.collect()
+        before = tracemalloc.take_snapshot()
+        for _ in range(calls):
+            fn()
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = [stat for stat in after.compare_to(before, "filename") if stat.count_diff > 0]
+    return {
+        "peak_alloc_bytes": min(peaks),
+        "retained_blocks_per_call": round(sum(stat.count_diff for stat in retained) / calls, 2),
+        "retained_bytes_per_call": round(sum(stat.size_diff for stat in retained) / calls, 1),
+    }
+
+
+def compare(baseline: dict, results: Dict[str, dict], tolerance: float) -> List[str]:
+    """
+    Compare results with an earlier report.
+
+    Args:
+        baseline: Earlier report (see --output)
+        results: This run's results per benchmark
+        tolerance: Relative increase allowed (0.25 = 25%)
+
+    Returns:
+        One line per regression
+    """
+    regressions = []
+    for name, before in baseline["benchmarks"].items():
+        after = results.get(name)
+        if after is None:
+            continue
+        for key in ("ns_per_call_min", "peak_alloc_bytes"):
+            if after[key] > before[key] * (1 + tolerance):
+                regressions.append(f"{name} {key} {before[key]} -> {after[key]}")
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--only", help="Comma-separated benchmarks to run (default: all)")
+    parser.add_argument("--warmup", type=float, default=0.3, help="Warmup seconds per benchmark")
+    parser.add_argument("--repeat-s", type=float, default=0.2, help="Approximate seconds per timed repeat")
+    parser.add_argument("--repeats", type=int, default=9, help="Timed repeats per benchmark")
+    parser.add_argument("--memory-calls", type=int, default=200, help="Calls traced for retained allocations")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    parser.add_argument("--compare", help="Compare against this report; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Relative increase allowed vs --compare")
+    args = parser.parse_args()
+
+    fixtures = ScanFixtures()
+    benchmarks = {
+        "parse": fixtures.parse,
+        "price_sources": fixtures.price_sources,
+        "statistics": fixtures.statistics,
+        "build_result": fixtures.build_result,
+        "serialize_response_model": fixtures.serialize_response_model,
+        "serialize": fixtures.serialize,
+        "scan_cpu": fixtures.scan_cpu,
+    }
+    if args.only:
+        benchmarks = {name: benchmarks[name] for name in args.only.split(",")}
+
+    identical = fixtures.identical_bodies()
+    print(f"identical_bodies={identical}")
+    if not identical:
+        sys.exit(1)
+
+    results = {}
+    for name, fn in benchmarks.items():
+        results[name] = {
+            **time_benchmark(fn, args.warmup, args.repeat_s, args.repeats),
+            **measure_memory(fn, args.memory_calls),
+        }
+        result = results[name]
+        print(
+            f"{name:<24} ns_per_call min={result['ns_per_call_min']:<8} median={result['ns_per_call_median']:<8} "
+            f"rel_stdev={result['rel_stdev']:<7} peak_alloc_bytes={result['peak_alloc_bytes']:<7} "
+            f"retained_blocks_per_call={result['retained_blocks_per_call']}"
+        )
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "benchmarks": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"report saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"comparing with {baseline['meta']['commit']} ({baseline['meta']['python']})")
+        regressions = compare(baseline, results, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print(f"comparison: {len(regressions)} regression(s) at tolerance {args.tolerance:.0%}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""Local stub upstream servers for benchmarks and verification scripts."""
+import asyncio
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from fastapi.responses import Response
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+# Card document shaped like a Pokemon TCG API /v2/cards result
+SAMPLE_CARD = {
+    "id": "base1-4",
+    "name": "Charizard",
+    "number": "4",
+    "rarity": "Rare Holo",
+    "set": {"id": "base1", "name": "Base", "printedTotal": 102, "total": 102},
+    "tcgplayer": {
+        "url": "https://prices.pokemontcg.io/tcgplayer/base1-4",
+        "prices": {
+            "holofoil": {"low": 250.0, "mid": 320.0, "high": 900.0, "market": 310.25},
+            "1stEditionHolofoil": {"market": 5200.0},
+        },
+    },
+    "cardmarket": {
+        "url": "https://prices.pokemontcg.io/cardmarket/base1-4",
+        "prices": {"averageSellPrice": 289.9, "trendPrice": 301.5},
+    },
+}
+
+
+class StubTCGState:
+    """Configuration and request log of a stub Pokemon TCG API."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        quota_per_s: Optional[float] = None,
+        quota_burst: int = 1,
+        slow_fraction: float = 0.0,
+        slow_latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+    ):
+        """
+        Args:
+            latency_ms: Artificial latency added to every response
+            quota_per_s: Enforced request rate; excess requests get 429 with Retry-After
+            quota_burst: Requests allowed back to back under the quota
+            slow_fraction: Share of responses delayed by `slow_latency_ms` instead (tail latency)
+            slow_latency_ms: Latency of the slow responses
+            error_rate: Share of requests answered with `error_status`
+            error_status: Status of the injected errors (e.g. 500, 503)
+        """
+        self.latency_ms = latency_ms
+        self.slow_fraction = slow_fraction
+        self.slow_latency_ms = slow_latency_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.errors = 0
+        # When set, every request is answered with this status (e.g. 500)
+        self.fail_status: Optional[int] = None
+        self._rng = random.Random(7)
+        self.quota_per_s = quota_per_s
+        self.quota_burst = quota_burst
+        self.requests: List[str] = []
+        self.response_bytes = 0
+        self.throttled = 0
+        self._tokens = float(quota_burst)
+        self._updated_at = time.monotonic()
+
+    def reset(self) -> None:
+        """Forget all recorded requests and refill the quota."""
+        self.requests.clear()
+        self.response_bytes = 0
+        self.throttled = 0
+        self.errors = 0
+        self._tokens = float(self.quota_burst)
+        self._updated_at = time.monotonic()
+
+    async def delay(self) -> None:
+        """Sleep for this response's artificial latency."""
+        latency_ms = self.latency_ms
+        if self.slow_fraction and self._rng.random() < self.slow_fraction:
+            latency_ms = self.slow_latency_ms
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+    def injected_error(self) -> Optional[int]:
+        """Status to fail this request with (`fail_status`, or an `error_rate` error), if any."""
+        if self.fail_status is not None:
+            return self.fail_status
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            return self.error_status
+        return None
+
+    def over_quota(self) -> Optional[float]:
+        """Take one request from the quota; return seconds to wait if exhausted."""
+        if self.quota_per_s is None:
+            return None
+        now = time.monotonic()
+        self._tokens = min(float(self.quota_burst), self._tokens + (now - self._updated_at) * self.quota_per_s)
+        self._updated_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return None
+        self.throttled += 1
+        return (1 - self._tokens) / self.quota_per_s
+
+
+_QUERY_TERM = re.compile(r'([\w.]+):("(?:[^"\\]|\\.)*"|\S+)')
+
+
+def _field(card: Dict, path: str):
+    value = card
+    for key in path.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def matches_query(card: Dict, q: str) -> bool:
+    """
+    Evaluate a Pokemon TCG API `q` string against a card, roughly like the API.
+
+    Quoted values match when their words appear consecutively in the field
+    (name:"charizard" matches "Dark Charizard"); bare values match exactly.
+    All terms must match. Case is ignored.
+    """
+    for path, raw in _QUERY_TERM.findall(q):
+        value = _field(card, path)
+        if value is None:
+            return False
+        if raw.startswith('"'):
+            wanted = raw[1:-1].replace('\\"', '"').lower().split()
+            words = str(value).lower().split()
+            if not any(words[i:i + len(wanted)] == wanted for i in range(len(words) - len(wanted) + 1)):
+                return False
+        elif str(value).lower() != raw.lower():
+            return False
+    return True
+
+
+def create_tcg_stub_app(state: StubTCGState, cards: Optional[List[Dict]] = None) -> FastAPI:
+    """
+    Build a stub Pokemon TCG API.
+
+    Without `cards`, every search returns SAMPLE_CARD. With `cards`, searches
+    are filtered by `q` and honour `select`, `pageSize` and `page`, and
+    lookups by ID search that list. With a quota on `state`, requests over
+    it are answered 429 with a Retry-After header, like the real API, and
+    requests fail with `state.fail_status` when set, or at `state.error_rate`.
+
+    Args:
+        state: Shared configuration and request log
+        cards: Card documents to serve
+
+    Returns:
+        ASGI app exposing /cards and /cards/{card_id}
+    """
+    app = FastAPI()
+
+    def respond(payload: Dict) -> Response:
+        body = json.dumps(payload).encode()
+        state.response_bytes += len(body)
+        return Response(body, media_type="application/json")
+
+    def refused() -> Optional[Response]:
+        error_status = state.injected_error()
+        if error_status is not None:
+            return Response(status_code=error_status)
+        wait_s = state.over_quota()
+        if wait_s is None:
+            return None
+        return Response(status_code=429, headers={"Retry-After": str(math.ceil(wait_s))})
+
+    @app.get("/cards")
+    async def search_cards(request: Request):
+        state.requests.append(str(request.url))
+        refusal = refused()
+        if refusal is not None:
+            return refusal
+        await state.delay()
+        if cards is None:
+            return respond({"data": [SAMPLE_CARD], "page": 1, "pageSize": 250, "count": 1, "totalCount": 1})
+
+        params = request.query_params
+        found = [card for card in cards if matches_query(card, params.get("q", ""))]
+        page_size = min(int(params.get("pageSize", 250)), 250)
+        page = int(params.get("page", 1))
+        data = found[(page - 1) * page_size:page * page_size]
+        if params.get("select"):
+            fields = params["select"].split(",")
+            data = [{field: card[field] for field in fields if field in card} for card in data]
+        return respond({"data": data, "page": page, "pageSize": page_size, "count": len(data), "totalCount": len(found)})
+
+    @app.get("/cards/{card_id}")
+    async def get_card(card_id: str, request: Request):
+        state.requests.append(str(request.url))
+        refusal = refused()
+        if refusal is not None:
+            return refusal
+        await state.delay()
+        if cards is None:
+            return respond({"data": {**SAMPLE_CARD, "id": card_id}})
+        for card in cards:
+            if card["id"] == card_id:
+                return respond({"data": card})
+        return Response(status_code=404)
+
+    return app
+
+
+def create_marketplace_stub_app(state: StubTCGState, price_usd: float = 300.0) -> FastAPI:
+    """
+    Build a stub marketplace price API for MarketplaceProvider.
+
+    Every card is listed at `price_usd` in Near Mint. Latency, tail latency and failures come from `state`.
+
+    Args:
+        state: Shared configuration and request log
+        price_usd: Near Mint price returned for every card
+
+    Returns:
+        ASGI app exposing /prices
+    """
+    app = FastAPI()
+
+    @app.get("/prices")
+    async def prices(request: Request):
+        state.requests.append(str(request.url))
+        error_status = state.injected_error()
+        if error_status is not None:
+            return Response(status_code=error_status)
+        await state.delay()
+        card_id = request.query_params.get("card_id", "")
+        return {"prices": [
+            {"price_usd": price_usd, "condition": "Near Mint", "url": f"https://market.example/{card_id}"},
+        ]}
+
+    return app
+
+
+class StubVision:
+    """
+    Stand-in for the Google Vision client's blocking text detection.
+
+    Each call sleeps for `latency_ms` (plus up to `jitter_ms`, uniformly),
+    fails with `error_rate`, and otherwise returns one of `texts` at random,
+    so scans resolve to a spread of cards rather than one cache key.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        texts: Optional[List[str]] = None,
+        seed: int = 11,
+    ):
+        """
+        Args:
+            latency_ms: Minimum latency of every call
+            jitter_ms: Extra latency, uniform between 0 and this
+            error_rate: Share of calls raising an error
+            texts: OCR texts to return (defaults to one Charizard)
+            seed: Random seed for latency, errors and text choice
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.texts = texts or ["Charizard\nHP 120\nBase Set 4/102 Holo Rare"]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def _call(self, timeout: Optional[float]) -> str:
+        with self._lock:
+            self.calls += 1
+            latency_s = (self.latency_ms + self._rng.random() * self.jitter_ms) / 1000
+            failed = self._rng.random() < self.error_rate
+            text = self._rng.choice(self.texts)
+        if timeout is not None and latency_s > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("stub Vision deadline exceeded")
+        time.sleep(latency_s)
+        if failed:
+            with self._lock:
+                self.errors += 1
+            raise RuntimeError("stub Vision error")
+        return text
+
+    def get_full_text(self, image_bytes: bytes, timeout: Optional[float] = None) -> str:
+        """Like GoogleVisionClient.get_full_text."""
+        return self._call(timeout)
+
+    def batch_get_full_text(self, images: List[bytes], timeout: Optional[float] = None) -> List[str]:
+        """Like GoogleVisionClient.batch_get_full_text (one latency for the whole batch)."""
+        text = self._call(timeout)
+        return [text] * len(images)
+
+    def install(self, ocr_service) -> None:
+        """Route an OCRService's Vision calls to this stub."""
+        ocr_service.vision_client.get_full_text = self.get_full_text
+        ocr_service.vision_client.batch_get_full_text = self.batch_get_full_text
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve_in_thread(app, port: Optional[int] = None) -> Iterator[str]:
+    """
+    Run an ASGI app on a local uvicorn server in a background thread.
+
+    Args:
+        app: ASGI application
+        port: Port to bind (a free one is picked by default)
+
+    Yields:
+        Base URL of the running server
+    """
+    port = port or _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
@@ -0,0 +1,308 @@
+"""Offline Pokemon TCG card catalog with in-memory lookup indexes.
+
+The catalog is a compact binary snapshot of card identities (no prices),
+built by `python -m scripts.build_catalog` and memory-mapped at startup.
+
+File layout (little-endian):
+
+    magic            8 bytes   b"PKCAT\\x00\\x01\\x00"
+    record_count     uint32
+    string_count     uint32
+    string_offsets   uint32 * (string_count + 1)   byte offsets into the blob
+    records          uint32 * (record_count * len(FIELDS))   string indexes
+    string_blob      UTF-8 bytes of every distinct string, concatenated
+
+Every distinct string (set names, rarities, numbers...) is stored once.
+"""
+import mmap
+import re
+import struct
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAGIC = b"PKCAT\x00\x01\x00"
+HEADER = struct.Struct("<8sII")
+FIELDS = ("id", "name", "number", "set_id", "set_name", "set_total", "rarity")
+_FIELD_COUNT = len(FIELDS)
+
+_NUMBER_PATTERN = re.compile(r"^\s*([A-Za-z]*\d+[A-Za-z]*)\s*(?:/\s*([A-Za-z]*\d+))?\s*$")
+
+
+class CardRecord:
+    """Identity of one card in the catalog."""
+    __slots__ = FIELDS
+
+    def __init__(self, id, name, number, set_id, set_name, set_total, rarity):
+        self.id = id
+        self.name = name
+        self.number = number
+        self.set_id = set_id
+        self.set_name = set_name
+        self.set_total = set_total
+        self.rarity = rarity
+
+    def to_dict(self) -> Dict[str, str]:
+        """Return the record as a plain dict."""
+        return {field: getattr(self, field) for field in FIELDS}
+
+
+def split_card_number(number: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Split an OCR'd card number into the card number and the set total.
+
+    Args:
+        number: Card number as printed, e.g. "4/102", "TG05/TG30" or "25"
+
+    Returns:
+        Tuple of (number, set total), e.g. ("4", "102"); parts may be None
+    """
+    if not number:
+        return None, None
+    match = _NUMBER_PATTERN.match(number)
+    if not match:
+        return None, None
+    card_number, total = match.groups()
+    # Printed numbers are zero-padded on some sets ("004/102")
+    if card_number.isdigit():
+        card_number = str(int(card_number))
+    if total and total.isdigit():
+        total = str(int(total))
+    return card_number, total
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase and collapse whitespace for comparisons."""
+    return " ".join((text or "").lower().split())
+
+
+def normalize_set_name(text: Optional[str]) -> str:
+    """Normalize a set name; the parser says "Base Set", the API says "Base"."""
+    name = normalize_text(text)
+    return name[:-4] if name.endswith(" set") else name
+
+
+def card_to_record(card: Dict) -> Tuple[str, ...]:
+    """Extract catalog fields from a Pokemon TCG API card document."""
+    card_set = card.get("set") or {}
+    return (
+        card.get("id") or "",
+        card.get("name") or "",
+        card.get("number") or "",
+        card_set.get("id") or "",
+        card_set.get("name") or "",
+        str(card_set.get("printedTotal") or card_set.get("total") or ""),
+        card.get("rarity") or "",
+    )
+
+
+def write_catalog(cards: Iterable[Dict], path: str) -> int:
+    """
+    Write card documents to a catalog file.
+
+    Args:
+        cards: Pokemon TCG API card documents
+        path: Output file path
+
+    Returns:
+        Number of records written
+    """
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+    records: List[int] = []
+
+    for card in cards:
+        for value in card_to_record(card):
+            string_id = string_ids.get(value)
+            if string_id is None:
+                string_id = string_ids[value] = len(strings)
+                strings.append(value)
+            records.append(string_id)
+
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = [0]
+    for blob in encoded:
+        offsets.append(offsets[-1] + len(blob))
+
+    record_count = len(records) // _FIELD_COUNT
+    with open(path, "wb") as out:
+        out.write(HEADER.pack(MAGIC, record_count, len(strings)))
+        out.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        out.write(struct.pack(f"<{len(records)}I", *records))
+        out.write(b"".join(encoded))
+    return record_count
+
+
+class CardCatalog:
+    """
+    Memory-mapped card catalog with lookup indexes.
+
+    Records stay in the mapped file as uint32 string indexes. Distinct
+    strings are decoded and interned once at load, and three indexes are
+    built over record numbers: by exact name, by (set, number) and by
+    (number, set total) - the "4/102" printed on the card.
+    """
+
+    def __init__(self, path: str):
+        """
+        Load and index a catalog file.
+
+        Args:
+            path: Catalog file written by write_catalog
+
+        Raises:
+            ValueError: If the file is not a catalog
+        """
+        started = time.perf_counter()
+        self.path = path
+        with open(path, "rb") as source:
+            self._mmap = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.record_count, string_count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a card catalog file")
+
+        words = memoryview(self._mmap)[HEADER.size:].cast("B")
+        offsets_end = (string_count + 1) * 4
+        records_end = offsets_end + self.record_count * _FIELD_COUNT * 4
+        offsets = words[:offsets_end].cast("I")
+        self._records = words[offsets_end:records_end].cast("I")
+        blob = words[records_end:]
+
+        self._strings: List[str] = [
+            sys.intern(str(blob[offsets[i]:offsets[i + 1]], "utf-8"))
+            for i in range(string_count)
+        ]
+        # Only the record array stays mapped; strings now live in _strings
+        offsets.release()
+        blob.release()
+        words.release()
+
+        self._by_name: Dict[str, List[int]] = {}
+        self._by_set_number: Dict[Tuple[str, str], List[int]] = {}
+        self._by_number_total: Dict[Tuple[str, str], List[int]] = {}
+        self._build_indexes()
+
+        self.load_ms = (time.perf_counter() - started) * 1000
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def _build_indexes(self) -> None:
+        """Build lookup indexes, normalizing each distinct string only once."""
+        strings = self._strings
+        ids = self._records.tolist()
+        name_keys: Dict[int, str] = {}
+        set_keys: Dict[int, str] = {}
+        number_keys: Dict[int, Optional[str]] = {}
+        name_field, number_field = FIELDS.index("name"), FIELDS.index("number")
+        set_field, total_field = FIELDS.index("set_name"), FIELDS.index("set_total")
+
+        for index in range(self.record_count):
+            base = index * _FIELD_COUNT
+            name_id = ids[base + name_field]
+            number_id = ids[base + number_field]
+            set_id = ids[base + set_field]
+
+            name = name_keys.get(name_id)
+            if name is None:
+                name = name_keys[name_id] = normalize_text(strings[name_id])
+            set_key = set_keys.get(set_id)
+            if set_key is None:
+                set_key = set_keys[set_id] = normalize_set_name(strings[set_id])
+            if number_id in number_keys:
+                number = number_keys[number_id]
+            else:
+                number = number_keys[number_id] = split_card_number(strings[number_id])[0]
+            total = strings[ids[base + total_field]]
+
+            self._by_name.setdefault(name, []).append(index)
+            self._by_set_number.setdefault((set_key, number), []).append(index)
+            self._by_number_total.setdefault((number, total), []).append(index)
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._records.release()
+        self._mmap.close()
+
+    def record(self, index: int) -> CardRecord:
+        """Materialize the record at `index`."""
+        base = index * _FIELD_COUNT
+        strings = self._strings
+        ids = self._records[base:base + _FIELD_COUNT]
+        return CardRecord(*(strings[i] for i in ids))
+
+    def names(self) -> List[str]:
+        """Return every distinct card name in the catalog."""
+        return [self.record(indexes[0]).name for indexes in self._by_name.values()]
+
+    def resolve(
+        self,
+        name: str,
+        set_name: Optional[str] = None,
+        number: Optional[str] = None
+    ) -> Optional[CardRecord]:
+        """
+        Resolve OCR'd card details to a single catalog record.
+
+        Candidates come from the exact-name index, narrowed by set and by
+        number/set total when those were read. When the name is unknown
+        (OCR noise), the (set, number) and (number, total) indexes are used.
+
+        Args:
+            name: Card name (e.g., "Charizard")
+            set_name: Set name (e.g., "Base Set")
+            number: Card number as printed (e.g., "4/102")
+
+        Returns:
+            The matching CardRecord, or None if no record matches unambiguously
+        """
+        card_number, total = split_card_number(number)
+        set_key = normalize_set_name(set_name)
+
+        candidates = self._by_name.get(normalize_text(name))
+        if candidates:
+            matches = [i for i in candidates if self._matches(i, set_key, card_number, total)]
+            # Without set or number, a name alone only resolves if unique
+            if not matches or (len(matches) > 1 and not (set_key or card_number)):
+                matches = []
+        elif set_key and card_number:
+            matches = self._by_set_number.get((set_key, card_number), [])
+        elif card_number and total:
+            matches = self._by_number_total.get((card_number, total), [])
+        else:
+            matches = []
+
+        if len(matches) != 1:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self.record(matches[0])
+
+    def _matches(self, index: int, set_key: str, card_number: Optional[str], total: Optional[str]) -> bool:
+        record = self.record(index)
+        if set_key and normalize_set_name(record.set_name) != set_key:
+            return False
+        if card_number:
+            record_number, _ = split_card_number(record.number)
+            if record_number != card_number:
+                return False
+        if total and record.set_total and record.set_total != total:
+            return False
+        return True
+
+    def stats(self) -> dict:
+        """Return size, load time and lookup counters."""
+        return {
+            "path": self.path,
+            "records": self.record_count,
+            "strings": len(self._strings),
+            "file_bytes": len(self._mmap),
+            "load_ms": round(self.load_ms, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
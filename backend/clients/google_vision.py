@@ -1,10 +1,26 @@
 """Google Cloud Vision API client wrapper."""
 import os
-from typing import List, Optional
+from typing import List, Optional, Union
 from google.cloud import vision
 from google.cloud.vision_v1 import types
 
 from config import settings
+from utils.log import get_logger
+
+logger = get_logger("GoogleVision")
+
+# Per-request limits of images:annotate / batch_annotate_images
+MAX_BATCH_IMAGES = 16
+MAX_BATCH_BYTES = 8 * 1024 * 1024
+
+STUB_TEXT = """
+            Charizard
+            Base Set
+            4/102
+            Rare Holo
+            HP 120
+            Fire Pokemon
+            """
 
 
 class GoogleVisionClient:
@@ -21,7 +37,7 @@ class GoogleVisionClient:
             # No credentials - use stub mode for testing
             self.client = None
             self.use_stub = True
-            print("[GoogleVision] No credentials found - using STUB mode")
+            logger.warning("no_credentials_using_stub")
 
     async def detect_text(self, image_bytes: bytes) -> List[str]:
         """
@@ -52,29 +68,30 @@ class GoogleVisionClient:
 
         return texts
 
-    def get_full_text(self, image_bytes: bytes) -> Optional[str]:
+    def get_full_text(self, image_bytes: bytes, timeout: Optional[float] = None) -> Optional[str]:
         """
         Get the full detected text from an image (synchronous version).
 
+        This blocks on the gRPC call, so async callers should run it in a
+        worker thread (see OCRService).
+
         Args:
             image_bytes: Image data as bytes
+            timeout: gRPC deadline in seconds (None for the library default)
 
         Returns:
             Full text as a single string, or None if no text detected
         """
         # Stub mode for testing without credentials
         if self.use_stub:
-            return """
-            Charizard
-            Base Set
-            4/102
-            Rare Holo
-            HP 120
-            Fire Pokemon
-            """
+            return STUB_TEXT
 
-        image = types.Image(content=image_bytes)
-        response = self.client.text_detection(image=image)
+        # The proto field only accepts bytes (uploads are read into a bytearray)
+        image = types.Image(content=bytes(image_bytes))
+        if timeout is not None:
+            response = self.client.text_detection(image=image, timeout=timeout)
+        else:
+            response = self.client.text_detection(image=image)
 
         if response.error.message:
             raise Exception(f"Google Vision API error: {response.error.message}")
@@ -84,3 +101,78 @@ class GoogleVisionClient:
             return response.text_annotations[0].description
 
         return None
+
+    @staticmethod
+    def plan_batches(images: List[bytes]) -> List[List[int]]:
+        """
+        Split images into batches that fit one batch_annotate_images request.
+
+        Args:
+            images: Image data in request order
+
+        Returns:
+            Lists of indexes into `images`, each within the per-request
+            image count and payload size limits
+        """
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_bytes = 0
+
+        for index, image_bytes in enumerate(images):
+            if current and (
+                len(current) >= MAX_BATCH_IMAGES
+                or current_bytes + len(image_bytes) > MAX_BATCH_BYTES
+            ):
+                batches.append(current)
+                current, current_bytes = [], 0
+            current.append(index)
+            current_bytes += len(image_bytes)
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def batch_get_full_text(
+        self,
+        images: List[bytes],
+        timeout: Optional[float] = None
+    ) -> List[Union[Optional[str], Exception]]:
+        """
+        Get the full detected text for several images in one request.
+
+        The caller is responsible for keeping `images` within the limits
+        (see plan_batches). Blocks on the gRPC call.
+
+        Args:
+            images: Image data for each image
+            timeout: gRPC deadline in seconds (None for the library default)
+
+        Returns:
+            One entry per image: full text, None if no text was detected,
+            or an Exception carrying that image's API error
+        """
+        if self.use_stub:
+            return [STUB_TEXT for _ in images]
+
+        feature = types.Feature(type_=types.Feature.Type.TEXT_DETECTION)
+        requests = [
+            types.AnnotateImageRequest(
+                image=types.Image(content=bytes(image_bytes)),
+                features=[feature]
+            )
+            for image_bytes in images
+        ]
+        if timeout is not None:
+            response = self.client.batch_annotate_images(requests=requests, timeout=timeout)
+        else:
+            response = self.client.batch_annotate_images(requests=requests)
+
+        results: List[Union[Optional[str], Exception]] = []
+        for image_response in response.responses:
+            if image_response.error.message:
+                results.append(Exception(f"Google Vision API error: {image_response.error.message}"))
+            elif image_response.text_annotations:
+                results.append(image_response.text_annotations[0].description)
+            else:
+                results.append(None)
+        return results
@@ -0,0 +1,226 @@
+"""Shared, instrumented HTTP connection pool for outbound API calls."""
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from utils.log import get_logger
+
+logger = get_logger("HTTPPool")
+
+
+def _http2_available() -> bool:
+    """Check whether the optional `h2` package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class PoolMonitor:
+    """
+    Track connection pool usage for a single httpx client.
+
+    Pool wait time is measured with httpcore trace events: the time between a
+    request entering the transport and its headers being sent, minus any time
+    spent opening a new TCP/TLS connection, is time spent waiting for a free
+    connection in the pool.
+    """
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.requests_total = 0
+        self.requests_in_flight = 0
+        self.connections_opened = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.connect_ms_total = 0.0
+        # Responses by status code, and transport errors by exception type
+        self.responses: Dict[int, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record(self, wait_ms: float, connect_ms: Optional[float]) -> None:
+        """Record the pool wait and connect time of one finished request."""
+        self.requests_total += 1
+        self.wait_ms_total += wait_ms
+        self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+        if connect_ms is not None:
+            self.connections_opened += 1
+            self.connect_ms_total += connect_ms
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that feeds a PoolMonitor from httpcore trace events."""
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport, monitor: PoolMonitor):
+        """
+        Wrap an existing transport.
+
+        Args:
+            transport: Underlying pooled transport
+            monitor: Monitor receiving per-request timings
+        """
+        self.transport = transport
+        self.monitor = monitor
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, recording how long it waited for a connection."""
+        start = time.perf_counter()
+        marks = {}
+        parent_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict) -> None:
+            if event_name in (
+                "connection.connect_tcp.started",
+                "connection.start_tls.complete",
+                "connection.connect_tcp.complete",
+            ):
+                marks[event_name] = time.perf_counter()
+            elif event_name.endswith("send_request_headers.started") and "send" not in marks:
+                marks["send"] = time.perf_counter()
+            if parent_trace is not None:
+                await parent_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        self.monitor.requests_in_flight += 1
+        try:
+            response = await self.transport.handle_async_request(request)
+            self.monitor.responses[response.status_code] = self.monitor.responses.get(response.status_code, 0) + 1
+            return response
+        except Exception as e:
+            name = type(e).__name__
+            self.monitor.errors[name] = self.monitor.errors.get(name, 0) + 1
+            raise
+        finally:
+            self.monitor.requests_in_flight -= 1
+            connect_ms = None
+            if "connection.connect_tcp.started" in marks:
+                connected_at = marks.get(
+                    "connection.start_tls.complete",
+                    marks.get("connection.connect_tcp.complete", start)
+                )
+                connect_ms = (connected_at - marks["connection.connect_tcp.started"]) * 1000
+            if "send" in marks:
+                wait_ms = (marks["send"] - start) * 1000 - (connect_ms or 0.0)
+                self.monitor.record(max(wait_ms, 0.0), connect_ms)
+
+    async def aclose(self) -> None:
+        """Close the underlying transport and its pooled connections."""
+        await self.transport.aclose()
+
+
+class PooledHTTPClient:
+    """Owner of one long-lived httpx.AsyncClient and its pool statistics."""
+
+    def __init__(
+        self,
+        timeout_s: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry_s: float,
+        http2: bool = False,
+        headers: Optional[dict] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Configure (but do not yet open) the pooled client.
+
+        Args:
+            timeout_s: Default per-request timeout in seconds
+            max_connections: Maximum concurrent connections in the pool
+            max_keepalive_connections: Maximum idle connections kept alive
+            keepalive_expiry_s: Seconds an idle connection is kept open
+            http2: Negotiate HTTP/2 when the optional `h2` package is installed
+            headers: Default headers sent with every request
+            transport: Override transport (e.g. httpx.MockTransport for benchmarks)
+        """
+        self.timeout_s = timeout_s
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_s,
+        )
+        self.http2 = http2
+        if http2 and not _http2_available():
+            logger.warning("http2_unavailable", reason="h2 is not installed", using="HTTP/1.1")
+            self.http2 = False
+        self.headers = headers or {}
+        self.monitor = PoolMonitor()
+        self._transport_override = transport
+        self._pool_transport: Optional[httpx.AsyncHTTPTransport] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the underlying client has been created and not closed."""
+        return self._client is not None and not self._client.is_closed
+
+    async def start(self) -> None:
+        """Create the shared client. Safe to call more than once."""
+        if self.is_open:
+            return
+
+        if self._transport_override is not None:
+            transport = self._transport_override
+        else:
+            self._pool_transport = httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2)
+            transport = InstrumentedTransport(self._pool_transport, self.monitor)
+
+        self._client = httpx.AsyncClient(
+            transport=transport,
+            timeout=self.timeout_s,
+            headers=self.headers,
+        )
+
+    async def aclose(self) -> None:
+        """Close the shared client and release all pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._pool_transport = None
+
+    async def get_client(self) -> httpx.AsyncClient:
+        """Return the shared client, creating it lazily outside the app lifespan."""
+        if not self.is_open:
+            await self.start()
+        return self._client
+
+    def stats(self) -> dict:
+        """
+        Return a snapshot of pool usage for sizing.
+
+        Returns:
+            Dict with connection counts (in use / idle), request counts,
+            average/max time spent waiting for a pooled connection, and
+            responses by status code and errors by type
+        """
+        in_use = idle = 0
+        pool = getattr(self._pool_transport, "_pool", None)
+        for connection in getattr(pool, "connections", []):
+            if connection.is_idle():
+                idle += 1
+            else:
+                in_use += 1
+
+        monitor = self.monitor
+        completed = monitor.requests_total
+        return {
+            "open": self.is_open,
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "connections_in_use": in_use,
+            "connections_idle": idle,
+            "requests_in_flight": monitor.requests_in_flight,
+            "requests_total": completed,
+            "connections_opened": monitor.connections_opened,
+            "avg_wait_ms": round(monitor.wait_ms_total / completed, 3) if completed else 0.0,
+            "max_wait_ms": round(monitor.wait_ms_max, 3),
+            "avg_connect_ms": (
+                round(monitor.connect_ms_total / monitor.connections_opened, 3)
+                if monitor.connections_opened else 0.0
+            ),
+            "responses": {str(code): count for code, count in sorted(monitor.responses.items())},
+            "errors": dict(monitor.errors),
+        }
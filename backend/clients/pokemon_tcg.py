@@ -1,8 +1,22 @@
 """Pokemon TCG API client wrapper."""
+import asyncio
+import os
+import time
 import httpx
 from typing import Optional, Dict, List
 
+from clients.card_catalog import CardCatalog
+from clients.http_pool import PooledHTTPClient
+from clients.rate_limiter import BACKGROUND, INTERACTIVE, OutboundScheduler, parse_retry_after
+from clients.tcg_query_planner import SEARCH_FIELDS, CardQuery, plan_queries, rank_cards
 from config import settings
+from utils.circuit_breaker import CircuitBreaker, LatencyTracker
+from utils.deadline import Deadline, stage_timeout
+from utils.error_handlers import PricingRateLimitedException, PricingUnavailableException
+from utils.log import get_logger
+from utils.singleflight import SingleFlight
+
+logger = get_logger("PokemonTCG")
 
 
 class PokemonTCGClient:
@@ -17,108 +31,407 @@ class PokemonTCGClient:
         if self.api_key:
             self.headers["X-Api-Key"] = self.api_key
 
+        # One shared, keep-alive connection pool per worker. Opened and closed
+        # by the FastAPI lifespan in main.py (or lazily on first use).
+        self.http = PooledHTTPClient(
+            timeout_s=settings.pricing_timeout_ms / 1000,
+            max_connections=settings.tcg_max_connections,
+            max_keepalive_connections=settings.tcg_max_keepalive_connections,
+            keepalive_expiry_s=settings.tcg_keepalive_expiry_s,
+            http2=settings.tcg_http2,
+            headers=self.headers,
+        )
+
+        # Every upstream request takes a token; scans go ahead of refreshes
+        self.scheduler = OutboundScheduler(
+            rate_per_s=settings.tcg_rate_limit_per_minute / 60,
+            burst=settings.tcg_rate_limit_burst,
+            max_queue=settings.tcg_rate_limit_max_queue,
+            max_wait_s={
+                INTERACTIVE: settings.tcg_interactive_max_wait_ms / 1000,
+                BACKGROUND: settings.tcg_background_max_wait_ms / 1000,
+            },
+            background_reserve=settings.tcg_rate_limit_background_reserve,
+        )
+
+        # Fail fast while the API is erroring or timing out
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.breaker_failure_threshold,
+            reset_timeout_s=settings.breaker_reset_timeout_s,
+        )
+
+        # Response latencies; slow interactive requests are hedged after the p95
+        self.latency = LatencyTracker()
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+        # Concurrent identical searches share one upstream request
+        self.search_flight = SingleFlight()
+
+        # Offline catalog resolving card identity without a search request
+        self.catalog: Optional[CardCatalog] = None
+
+        # Upstream cost of card searches
+        self.searches = 0
+        self.search_calls = 0
+        self.search_bytes = 0
+        self.searches_not_found = 0
+        self.resolved_by_step: Dict[str, int] = {}
+
+    def load_catalog(self, path: Optional[str] = None) -> None:
+        """
+        Load the offline card catalog if the file exists.
+
+        Args:
+            path: Catalog file (defaults to settings.card_catalog_path)
+        """
+        path = path if path is not None else settings.card_catalog_path
+        if not path or not os.path.exists(path):
+            logger.info("catalog_missing", path=path, effect="resolving cards via API search")
+            return
+
+        self.close_catalog()
+        self.catalog = CardCatalog(path)
+        logger.info("catalog_loaded", cards=len(self.catalog), load_ms=round(self.catalog.load_ms))
+
+    def close_catalog(self) -> None:
+        """Release the offline card catalog."""
+        if self.catalog is not None:
+            self.catalog.close()
+            self.catalog = None
+
+    async def start(self) -> None:
+        """Open the shared HTTP connection pool."""
+        await self.http.start()
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP connection pool."""
+        await self.http.aclose()
+
+    def pool_stats(self) -> dict:
+        """Return connection pool statistics (in use, idle, wait time)."""
+        return self.http.stats()
+
+    def rate_limit_stats(self) -> dict:
+        """Return outbound rate limiter tokens, queue depth and shed counts."""
+        return self.scheduler.stats()
+
+    def hedging_stats(self) -> dict:
+        """Return hedged request counters and the current hedge delay."""
+        delay_s = self._hedge_delay()
+        return {
+            "enabled": settings.tcg_hedge_enabled,
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_ratio": round(self.hedges / self.requests, 4) if self.requests else 0.0,
+            "hedge_delay_ms": round(delay_s * 1000, 1) if delay_s is not None else None,
+        }
+
+    def health(self) -> dict:
+        """Return circuit breaker state and response latency."""
+        return {**self.breaker.stats(), **self.latency.stats()}
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Delay before hedging a request: the recent p95, once enough samples exist."""
+        if not settings.tcg_hedge_enabled:
+            return None
+        p95_s = self.latency.p95_s()
+        if p95_s is None:
+            return None
+        return max(p95_s, settings.tcg_hedge_min_delay_ms / 1000)
+
+    def _unavailable(self, message: str, **details) -> PricingUnavailableException:
+        return PricingUnavailableException(message, details={"upstream": "pokemon_tcg_api", **details})
+
+    async def _get(
+        self,
+        path: str,
+        params: Optional[Dict] = None,
+        priority: int = INTERACTIVE,
+        deadline: Optional[Deadline] = None
+    ) -> httpx.Response:
+        """
+        Send a GET request through the circuit breaker and outbound scheduler.
+
+        The request gets the per-request timeout or the time left before
+        `deadline`, whichever is shorter. A 429 pauses all requests for its
+        Retry-After; the request is then retried once if it can still be
+        sent in time.
+
+        Raises:
+            PricingRateLimitedException: If the request is shed or still throttled
+            PricingUnavailableException: If the circuit is open or the deadline passes
+        """
+        if not self.breaker.allow():
+            raise self._unavailable(
+                "Pricing service is temporarily unavailable. Please try again shortly.",
+                retry_after_s=round(max(self.breaker.retry_after_s(), 1.0), 1)
+            )
+
+        for _ in range(2):
+            cap_s = settings.pricing_timeout_ms / 1000
+            await self.scheduler.acquire(priority, max_wait_s=deadline.remaining() if deadline else None)
+            timeout_s = stage_timeout(deadline, cap_s)
+            if timeout_s <= 0:
+                raise self._unavailable("Pricing lookup ran out of time.", timeout_ms=0)
+
+            try:
+                response = await self._send(path, params, priority, timeout_s)
+            except httpx.TransportError as e:
+                # A timeout cut short by the scan deadline says nothing about upstream
+                if timeout_s < cap_s and isinstance(e, httpx.TimeoutException):
+                    raise self._unavailable("Pricing lookup ran out of time.", timeout_ms=int(timeout_s * 1000))
+                self.breaker.record_failure()
+                raise
+
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            if response.status_code != 429:
+                return response
+            retry_after_s = parse_retry_after(response.headers.get("Retry-After"))
+            logger.warning("rate_limited", status=429, pause_s=round(retry_after_s, 1))
+            self.scheduler.pause(retry_after_s)
+
+        raise PricingRateLimitedException(
+            "Pricing is temporarily rate limited. Please try again shortly.",
+            details={"retry_after_s": round(max(retry_after_s, 1.0), 1)}
+        )
+
+    async def _timed_get(self, client: httpx.AsyncClient, url: str, params: Optional[Dict], timeout_s: float) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.get(url, params=params, timeout=timeout_s)
+        self.latency.record(time.perf_counter() - started)
+        return response
+
+    async def _send(self, path: str, params: Optional[Dict], priority: int, timeout_s: float) -> httpx.Response:
+        """
+        Send one request, hedging it if it is slower than usual.
+
+        Interactive requests still running after the hedge delay (the
+        recent p95 latency) get a second, identical request if the rate
+        limiter has a token to spare and hedges stay under
+        settings.tcg_hedge_max_ratio of requests. The first response wins
+        and the other request is cancelled.
+        """
+        client = await self.http.get_client()
+        url = f"{self.base_url}{path}"
+        self.requests += 1
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self._timed_get(client, url, params, timeout_s))
+
+        delay_s = self._hedge_delay() if priority == INTERACTIVE else None
+        if delay_s is None or delay_s >= timeout_s:
+            return await primary
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay_s)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done or self.hedges >= self.requests * settings.tcg_hedge_max_ratio \
+                or not self.scheduler.try_acquire(priority):
+            return await primary
+
+        self.hedges += 1
+        remaining_s = timeout_s - (time.monotonic() - started)
+        hedge = asyncio.ensure_future(self._timed_get(client, url, params, remaining_s))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+            # Both failed; report the original request's error
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def search_card(
         self,
         name: str,
         set_name: Optional[str] = None,
-        number: Optional[str] = None
+        number: Optional[str] = None,
+        priority: int = INTERACTIVE,
+        deadline: Optional[Deadline] = None
     ) -> Optional[Dict]:
         """
         Search for a Pokemon card by name, set, and number.
 
+        Without a catalog match, the query plan runs: progressively looser
+        searches, most selective first, each fetching only the fields
+        pricing reads. The returned candidates are ranked locally.
+
         Args:
             name: Card name (e.g., "Charizard")
             set_name: Set name (e.g., "Base Set")
             number: Card number (e.g., "4/102")
+            priority: INTERACTIVE for scans, BACKGROUND for cache refreshes
+            deadline: Scan deadline bounding every request made (concurrent
+                identical searches of the same priority share the first
+                caller's)
 
         Returns:
             Card data dict if found, None otherwise
+
+        Raises:
+            PricingRateLimitedException: If the rate limiter sheds the request
+            PricingUnavailableException: If the circuit is open or the deadline passes
         """
-        # Build search query
-        query_parts = [f'name:"{name}"']
+        # Resolve identity locally; only the live card document (prices)
+        # is then fetched by ID
+        if self.catalog is not None:
+            record = self.catalog.resolve(name, set_name, number)
+            if record is not None:
+                card_data = await self.get_card_by_id(record.id, priority, deadline)
+                if card_data:
+                    return card_data
+
+        plan = plan_queries(name, set_name, number)
+        # Scans never join a refresh's flight, which would queue them at
+        # background priority under the refresh's deadline
+        key = (priority, *(query.q for query in plan))
+        return await self.search_flight.do(key, lambda: self._search_planned(plan, name, set_name, number, priority, deadline))
+
+    async def _search_planned(
+        self,
+        plan: List[CardQuery],
+        name: str,
+        set_name: Optional[str],
+        number: Optional[str],
+        priority: int = INTERACTIVE,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[Dict]:
+        """Run the query cascade until a query returns cards, then rank them locally."""
+        self.searches += 1
+        for query in plan:
+            cards = await self._search(query, priority, deadline)
+            if cards:
+                self.resolved_by_step[query.label] = self.resolved_by_step.get(query.label, 0) + 1
+                return rank_cards(cards, name, set_name, number)
+
+        self.searches_not_found += 1
+        return None
 
-        if set_name:
-            query_parts.append(f'set.name:"{set_name}"')
+    async def _search(
+        self,
+        query: CardQuery,
+        priority: int = INTERACTIVE,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict]:
+        """Run one card search against the Pokemon TCG API, fetching only pricing fields."""
+        try:
+            response = await self._get(
+                "/cards",
+                params={
+                    "q": query.q,
+                    "select": ",".join(SEARCH_FIELDS),
+                    "pageSize": query.page_size,
+                },
+                priority=priority,
+                deadline=deadline
+            )
+            self.search_calls += 1
+            self.search_bytes += len(response.content)
+            response.raise_for_status()
+            return response.json().get("data") or []
 
-        if number:
-            query_parts.append(f'number:"{number}"')
+        except PricingUnavailableException:
+            raise
+        except httpx.TimeoutException:
+            raise Exception("Pokemon TCG API request timed out")
+        except httpx.HTTPStatusError as e:
+            raise Exception(f"Pokemon TCG API error: {e.response.status_code}")
+        except Exception as e:
+            raise Exception(f"Failed to search Pokemon TCG API: {str(e)}")
 
-        query = " ".join(query_parts)
+    def search_stats(self) -> dict:
+        """Return upstream calls and bytes per card search, and which plan step resolved it."""
+        searches = self.searches
+        return {
+            "searches": searches,
+            "not_found": self.searches_not_found,
+            "upstream_calls": self.search_calls,
+            "response_bytes": self.search_bytes,
+            "calls_per_search": round(self.search_calls / searches, 3) if searches else 0.0,
+            "bytes_per_search": round(self.search_bytes / searches) if searches else 0,
+            "resolved_by_step": dict(self.resolved_by_step),
+        }
 
-        async with httpx.AsyncClient(timeout=settings.pricing_timeout_ms / 1000) as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/cards",
-                    params={"q": query},
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                if data.get("data") and len(data["data"]) > 0:
-                    # Return first match
-                    return data["data"][0]
-
-                return None
-
-            except httpx.TimeoutException:
-                raise Exception("Pokemon TCG API request timed out")
-            except httpx.HTTPStatusError as e:
-                raise Exception(f"Pokemon TCG API error: {e.response.status_code}")
-            except Exception as e:
-                raise Exception(f"Failed to search Pokemon TCG API: {str(e)}")
-
-    async def get_card_by_id(self, card_id: str) -> Optional[Dict]:
+    async def get_card_by_id(
+        self,
+        card_id: str,
+        priority: int = INTERACTIVE,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[Dict]:
         """
         Get card details by ID.
 
         Args:
             card_id: Pokemon TCG API card ID
+            priority: INTERACTIVE for scans, BACKGROUND for cache refreshes
+            deadline: Scan deadline bounding the request
 
         Returns:
             Card data dict if found, None otherwise
+
+        Raises:
+            PricingRateLimitedException: If the rate limiter sheds the request
+            PricingUnavailableException: If the circuit is open or the deadline passes
         """
-        async with httpx.AsyncClient(timeout=settings.pricing_timeout_ms / 1000) as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/cards/{card_id}",
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                data = response.json()
+        return await self.search_flight.do(("id", card_id, priority), lambda: self._get_by_id(card_id, priority, deadline))
 
-                return data.get("data")
+    async def _get_by_id(
+        self,
+        card_id: str,
+        priority: int = INTERACTIVE,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[Dict]:
+        """Fetch a card document by ID from the Pokemon TCG API."""
+        try:
+            response = await self._get(f"/cards/{card_id}", priority=priority, deadline=deadline)
+            response.raise_for_status()
+            data = response.json()
 
-            except httpx.HTTPStatusError:
-                return None
-            except Exception as e:
-                raise Exception(f"Failed to get card from Pokemon TCG API: {str(e)}")
+            return data.get("data")
+
+        except PricingUnavailableException:
+            raise
+        except httpx.HTTPStatusError:
+            return None
+        except Exception as e:
+            raise Exception(f"Failed to get card from Pokemon TCG API: {str(e)}")
 
     def extract_market_prices(self, card_data: Dict) -> Dict[str, float]:
         """
         Extract market prices from card data.
 
+        Every TCGPlayer variant the card is sold in is kept (a card can have
+        both normal and holofoil prices), keyed by the API's variant name,
+        plus the CardMarket average sell price under "cardmarket".
+
         Args:
             card_data: Card data from Pokemon TCG API
 
         Returns:
-            Dict with price information
+            Dict of variant (or "cardmarket") -> price; missing prices are 0.0
         """
         prices = {}
 
-        if "tcgplayer" in card_data and "prices" in card_data["tcgplayer"]:
-            tcg_prices = card_data["tcgplayer"]["prices"]
-
-            # Try to get holofoil or normal price
-            if "holofoil" in tcg_prices:
-                prices["holofoil"] = tcg_prices["holofoil"].get("market", 0.0)
-            elif "normal" in tcg_prices:
-                prices["normal"] = tcg_prices["normal"].get("market", 0.0)
-            elif "1stEditionHolofoil" in tcg_prices:
-                prices["1stEditionHolofoil"] = tcg_prices["1stEditionHolofoil"].get("market", 0.0)
+        tcg_prices = (card_data.get("tcgplayer") or {}).get("prices") or {}
+        for variant, variant_prices in tcg_prices.items():
+            if isinstance(variant_prices, dict):
+                prices[variant] = variant_prices.get("market") or 0.0
 
         if "cardmarket" in card_data and "prices" in card_data["cardmarket"]:
             cm_prices = card_data["cardmarket"]["prices"]
-            prices["cardmarket"] = cm_prices.get("averageSellPrice", 0.0)
+            prices["cardmarket"] = cm_prices.get("averageSellPrice") or 0.0
 
         return prices
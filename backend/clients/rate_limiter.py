@@ -0,0 +1,307 @@
+"""Outbound request scheduling under an upstream rate limit."""
+import asyncio
+import heapq
+import itertools
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.error_handlers import PricingRateLimitedException
+
+# Request priorities; lower values are served first
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Pause applied for a 429 response without a usable Retry-After header
+DEFAULT_RETRY_AFTER_S = 1.0
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> float:
+    """
+    Parse a Retry-After header (delay seconds or HTTP date).
+
+    Args:
+        value: Header value
+        now: Current epoch time (defaults to time.time())
+
+    Returns:
+        Seconds to wait, never negative
+    """
+    if not value:
+        return DEFAULT_RETRY_AFTER_S
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_S
+    return max(retry_at - (time.time() if now is None else now), 0.0)
+
+
+class _Waiter:
+    """A queued request waiting for a token."""
+    __slots__ = ("priority", "future", "expires_at", "active")
+
+    def __init__(self, priority: int, future: asyncio.Future, expires_at: float):
+        self.priority = priority
+        self.future = future
+        # When the request stops waiting (its own max wait, on the scheduler's clock)
+        self.expires_at = expires_at
+        self.active = True
+
+
+class OutboundScheduler:
+    """
+    Token bucket with a priority queue in front of a rate-limited API.
+
+    Requests take one token each. When the bucket is empty they queue, and
+    queued interactive requests are always served before background ones.
+    Background requests also leave `background_reserve` tokens in the
+    bucket, so refreshes never spend the headroom a burst of scans needs.
+
+    Low-priority work is shed first: a full queue evicts its newest
+    background waiter to admit an interactive one, and each priority has a
+    maximum queueing time after which the request fails with
+    PricingRateLimitedException instead of waiting further. When upstream
+    answers 429, `pause()` empties the bucket until its Retry-After has
+    passed; waiters that cannot be served before their deadline fail
+    immediately.
+    """
+
+    def __init__(
+        self,
+        rate_per_s: float,
+        burst: int,
+        max_queue: int = 100,
+        max_wait_s: Optional[Dict[int, float]] = None,
+        background_reserve: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            rate_per_s: Sustained requests per second allowed upstream
+            burst: Bucket capacity (requests that may be sent back to back)
+            max_queue: Requests allowed to wait for a token
+            max_wait_s: Longest queueing time per priority
+            background_reserve: Tokens background requests leave in the bucket
+            clock: Monotonic time source in seconds
+        """
+        self.rate_per_s = rate_per_s
+        self.burst = max(burst, 1)
+        self.max_queue = max_queue
+        self.max_wait_s = {INTERACTIVE: 2.0, BACKGROUND: 10.0, **(max_wait_s or {})}
+        self.background_reserve = min(background_reserve, self.burst - 1)
+        self.clock = clock
+
+        self._tokens = float(self.burst)
+        self._updated_at = clock()
+        self._paused_until = 0.0
+        self._heap: List[Tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._queued = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.granted = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.shed = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.wait_s_total = {INTERACTIVE: 0.0, BACKGROUND: 0.0}
+        self.throttled = 0
+        self.paused_s_total = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated_at:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) * self.rate_per_s)
+            self._updated_at = now
+
+    def _needed(self, priority: int) -> float:
+        return 1.0 + (self.background_reserve if priority == BACKGROUND else 0)
+
+    def _can_send(self, priority: int, now: float) -> bool:
+        return now >= self._paused_until and self._tokens >= self._needed(priority)
+
+    def try_acquire(self, priority: int = INTERACTIVE) -> bool:
+        """
+        Take a token only if one is available now, without queueing.
+
+        Args:
+            priority: INTERACTIVE or BACKGROUND
+
+        Returns:
+            True if the request may be sent
+        """
+        now = self.clock()
+        self._refill(now)
+        # Requests of equal or higher priority that are waiting go first
+        ahead = self._queued[INTERACTIVE] + (self._queued[BACKGROUND] if priority == BACKGROUND else 0)
+        if ahead or not self._can_send(priority, now):
+            return False
+        self._tokens -= 1
+        self.granted[priority] += 1
+        return True
+
+    async def acquire(self, priority: int = INTERACTIVE, max_wait_s: Optional[float] = None) -> None:
+        """
+        Wait for permission to send one request.
+
+        Args:
+            priority: INTERACTIVE or BACKGROUND
+            max_wait_s: Shorter queueing limit than the priority's own (e.g.
+                the time left before the request's deadline)
+
+        Raises:
+            PricingRateLimitedException: If the request is shed instead of sent
+        """
+        if self.try_acquire(priority):
+            return
+
+        now = self.clock()
+        max_wait_s = self.max_wait_s[priority] if max_wait_s is None else min(max_wait_s, self.max_wait_s[priority])
+        if self._paused_until - now > max_wait_s:
+            self._shed(priority)
+            raise self._rate_limited(priority, now)
+
+        if sum(self._queued.values()) >= self.max_queue and not self._evict_below(priority):
+            self._shed(priority)
+            raise self._rate_limited(priority, now)
+
+        waiter = _Waiter(priority, asyncio.get_running_loop().create_future(), now + max_wait_s)
+        heapq.heappush(self._heap, (priority, next(self._sequence), waiter))
+        self._queued[priority] += 1
+        self._schedule()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=max_wait_s)
+        except asyncio.TimeoutError:
+            if waiter.future.done() and not waiter.future.exception():
+                # Granted just as the wait timed out; keep the token
+                pass
+            else:
+                self._deactivate(waiter)
+                self._shed(priority)
+                raise self._rate_limited(priority, self.clock())
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled() and not waiter.future.exception():
+                # Token granted to a caller that went away; return it
+                self._tokens = min(float(self.burst), self._tokens + 1)
+                self.granted[priority] -= 1
+            self._deactivate(waiter)
+            raise
+        waiter.future.result()
+        self.wait_s_total[priority] += self.clock() - now
+
+    def pause(self, retry_after_s: float) -> None:
+        """
+        Stop sending until `retry_after_s` has passed (upstream answered 429).
+
+        Args:
+            retry_after_s: Delay from the response's Retry-After header
+        """
+        now = self.clock()
+        self.throttled += 1
+        resume_at = now + retry_after_s
+        if resume_at > self._paused_until:
+            self.paused_s_total += resume_at - max(now, self._paused_until)
+            self._paused_until = resume_at
+        self._tokens = 0.0
+        self._updated_at = max(now, self._paused_until)
+
+        # Fail waiters that cannot be served before they stop waiting
+        for _, _, waiter in self._heap:
+            if waiter.active and self._paused_until > waiter.expires_at:
+                self._reject(waiter, now)
+        self._schedule(reset=True)
+
+    def _rate_limited(self, priority: int, now: float) -> PricingRateLimitedException:
+        retry_after_s = max(self._paused_until - now, 1.0 / self.rate_per_s if self.rate_per_s else 1.0)
+        return PricingRateLimitedException(
+            "Pricing is temporarily rate limited. Please try again shortly.",
+            details={"priority": PRIORITY_NAMES[priority], "retry_after_s": round(retry_after_s, 1)}
+        )
+
+    def _shed(self, priority: int) -> None:
+        self.shed[priority] += 1
+
+    def _deactivate(self, waiter: _Waiter) -> None:
+        if waiter.active:
+            waiter.active = False
+            self._queued[waiter.priority] -= 1
+
+    def _reject(self, waiter: _Waiter, now: float) -> None:
+        self._deactivate(waiter)
+        self._shed(waiter.priority)
+        if not waiter.future.done():
+            waiter.future.set_exception(self._rate_limited(waiter.priority, now))
+
+    def _evict_below(self, priority: int) -> bool:
+        """Reject the newest waiter of lower priority than `priority`, if any."""
+        victim = None
+        for entry in self._heap:
+            waiter = entry[2]
+            if waiter.active and waiter.priority > priority and (victim is None or entry[:2] > victim[:2]):
+                victim = entry
+        if victim is None:
+            return False
+        self._reject(victim[2], self.clock())
+        return True
+
+    def _dispatch(self) -> None:
+        """Grant tokens to queued requests in priority order."""
+        self._timer = None
+        now = self.clock()
+        self._refill(now)
+        while self._heap:
+            priority, _, waiter = self._heap[0]
+            if not waiter.active or waiter.future.done():
+                heapq.heappop(self._heap)
+                self._deactivate(waiter)
+                continue
+            if not self._can_send(priority, now):
+                break
+            heapq.heappop(self._heap)
+            self._deactivate(waiter)
+            self._tokens -= 1
+            self.granted[priority] += 1
+            waiter.future.set_result(None)
+        self._schedule()
+
+    def _schedule(self, reset: bool = False) -> None:
+        """Arrange a dispatch for when the first queued request can be sent."""
+        if reset and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._timer is not None or not self._heap:
+            return
+
+        now = self.clock()
+        self._refill(now)
+        priority = self._heap[0][0]
+        shortfall = max(self._needed(priority) - self._tokens, 0.0)
+        delay = max(self._paused_until - now, 0.0)
+        if shortfall and self.rate_per_s:
+            delay += shortfall / self.rate_per_s
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def stats(self) -> dict:
+        """Return tokens, queue depth and grant/shed counters per priority."""
+        now = self.clock()
+        self._refill(now)
+        return {
+            "rate_per_minute": round(self.rate_per_s * 60, 2),
+            "burst": self.burst,
+            "tokens": round(max(self._tokens, 0.0), 2),
+            "paused_for_s": round(max(self._paused_until - now, 0.0), 2),
+            "throttled_responses": self.throttled,
+            "paused_s_total": round(self.paused_s_total, 2),
+            **{
+                name: {
+                    "queued": self._queued[priority],
+                    "granted": self.granted[priority],
+                    "shed": self.shed[priority],
+                    "avg_wait_ms": round(self.wait_s_total[priority] / self.granted[priority] * 1000, 2)
+                    if self.granted[priority] else 0.0,
+                }
+                for priority, name in PRIORITY_NAMES.items()
+            },
+        }
@@ -0,0 +1,124 @@
+"""Search planning and local ranking for Pokemon TCG API card lookups."""
+from typing import Dict, List, NamedTuple, Optional
+
+from clients.card_catalog import normalize_set_name, normalize_text, split_card_number
+
+# Card fields pricing reads; everything else (attacks, images, legalities...)
+# is left out of search responses
+SEARCH_FIELDS = ("id", "name", "number", "rarity", "set", "tcgplayer", "cardmarket")
+
+
+class CardQuery(NamedTuple):
+    """One search request of a query plan."""
+    label: str
+    q: str
+    page_size: int
+
+
+def _phrase(value: str) -> str:
+    return '"' + value.replace('"', '\\"') + '"'
+
+
+def plan_queries(
+    name: str,
+    set_name: Optional[str] = None,
+    number: Optional[str] = None
+) -> List[CardQuery]:
+    """
+    Build the search cascade for OCR'd card details, most selective first.
+
+    Each step drops the constraint most likely to be misread: the set name
+    first, then the set total, then the card number. Steps whose query
+    would repeat an earlier one are skipped. Tighter queries ask for fewer
+    results, since their candidates are ranked locally anyway.
+
+    Args:
+        name: Card name (e.g., "Charizard")
+        set_name: Set name (e.g., "Base Set")
+        number: Card number as printed (e.g., "4/102")
+
+    Returns:
+        Queries to try in order until one returns cards
+    """
+    card_number, total = split_card_number(number)
+    set_key = normalize_set_name(set_name)
+
+    name_part = f"name:{_phrase(name)}"
+    set_part = f"set.name:{_phrase(set_key)}" if set_key else None
+    number_part = f"number:{_phrase(card_number)}" if card_number else None
+    total_part = f"set.printedTotal:{total}" if total and total.isdigit() else None
+
+    # (label, required constraints, optional constraints, page size)
+    steps = (
+        ("name+set+number", (name_part, set_part, number_part), (total_part,), 5),
+        ("name+number+total", (name_part, number_part, total_part), (), 5),
+        ("name+number", (name_part, number_part), (), 10),
+        ("name+set", (name_part, set_part), (), 25),
+        ("name", (name_part,), (), 25),
+    )
+
+    plan: List[CardQuery] = []
+    seen = set()
+    for label, required, optional, page_size in steps:
+        if any(part is None for part in required):
+            continue
+        q = " ".join(part for part in required + optional if part)
+        if q not in seen:
+            seen.add(q)
+            plan.append(CardQuery(label, q, page_size))
+    return plan
+
+
+def score_card(
+    card: Dict,
+    name: str,
+    set_name: Optional[str] = None,
+    number: Optional[str] = None
+) -> int:
+    """
+    Score how well a card document agrees with the OCR'd details.
+
+    Args:
+        card: Pokemon TCG API card document
+        name: Card name as read
+        set_name: Set name as read
+        number: Card number as read (e.g., "4/102")
+
+    Returns:
+        Higher is better; 0 means nothing but the query matched
+    """
+    card_number, total = split_card_number(number)
+    card_set = card.get("set") or {}
+    score = 0
+
+    if normalize_text(card.get("name")) == normalize_text(name):
+        score += 4
+    if card_number and split_card_number(card.get("number"))[0] == card_number:
+        score += 3
+    if total and str(card_set.get("printedTotal") or "") == total:
+        score += 2
+    if set_name and normalize_set_name(card_set.get("name")) == normalize_set_name(set_name):
+        score += 2
+    return score
+
+
+def rank_cards(
+    cards: List[Dict],
+    name: str,
+    set_name: Optional[str] = None,
+    number: Optional[str] = None
+) -> Optional[Dict]:
+    """
+    Pick the candidate that best matches the OCR'd details.
+
+    Ties keep the API's order.
+
+    Returns:
+        Best card document, or None if `cards` is empty
+    """
+    best, best_score = None, -1
+    for card in cards:
+        score = score_card(card, name, set_name, number)
+        if score > best_score:
+            best, best_score = card, score
+    return best
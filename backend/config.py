@@ -13,12 +13,141 @@ class Settings(BaseSettings):
     pokemon_tcg_api_key: str = ""
     pokemon_tcg_api_url: str = "https://api.pokemontcg.io/v2"
 
+    # Pokemon TCG API connection pool (one shared client per worker)
+    tcg_max_connections: int = 20
+    tcg_max_keepalive_connections: int = 10
+    tcg_keepalive_expiry_s: float = 30.0
+    tcg_http2: bool = False
+
+    # Pokemon TCG API outbound rate limit (per worker; match the API key's quota)
+    tcg_rate_limit_per_minute: float = 60.0
+    tcg_rate_limit_burst: int = 20
+    tcg_rate_limit_max_queue: int = 100
+    tcg_rate_limit_background_reserve: int = 5
+    tcg_interactive_max_wait_ms: int = 2000
+    tcg_background_max_wait_ms: int = 10000
+
+    # Additional marketplaces queried alongside the TCG API for prices
+    # (comma-separated `name=base_url` pairs) and their per-request timeout
+    price_marketplaces: str = ""
+    price_marketplace_timeout_ms: int = 800
+
+    # Offline card catalog (build with `python -m scripts.build_catalog`)
+    card_catalog_path: str = "data/card_catalog.bin"
+
+    # Fuzzy card-name matching (bundled names + catalog names)
+    card_names_path: str = "data/card_names.txt"
+    name_match_min_score: float = 0.7
+
+    # Set and rarity terms recognised in OCR text
+    card_terms_path: str = "data/card_terms.txt"
+
+    # Card lookup cache (per worker)
+    price_cache_max_entries: int = 2048
+    price_cache_ttl_s: float = 3600.0
+    price_cache_stale_ttl_s: float = 600.0
+    price_cache_negative_ttl_s: float = 300.0
+
+    # When a card lookup fails unexpectedly, answer with placeholder prices
+    # (development only; set false to return 503 PRICING_UNAVAILABLE instead)
+    price_stub_fallback: bool = True
+
+    # Pre-warming of popular card lookups before their cache entries expire
+    prewarm_enabled: bool = True
+    prewarm_top_k: int = 200
+    prewarm_interval_s: float = 30.0
+    prewarm_lead_s: float = 300.0
+    prewarm_budget_per_minute: int = 30
+    prewarm_half_life_s: float = 3600.0
+    prewarm_max_tracked: int = 10000
+
+    # Price history (SQLite, written in batches off the request path)
+    price_history_enabled: bool = True
+    price_history_path: str = "data/price_history.sqlite3"
+    price_history_flush_ms: int = 1000
+    price_history_batch_size: int = 500
+    price_history_queue_size: int = 10000
+    price_history_retention_days: int = 365
+    price_history_compact_after_days: int = 2
+
     # CORS - Allow both localhost and WSL IP for development
     cors_origins: str = "http://localhost:19006,http://localhost:8081,http://192.168.50.229:8081"
 
-    # Timeouts (milliseconds)
+    # Timeouts (milliseconds): per stage, and for a whole scan; each stage
+    # gets its own timeout or what is left of the scan's, whichever is less
     ocr_timeout_ms: int = 2500
     pricing_timeout_ms: int = 3000
+    scan_deadline_ms: int = 4500
+
+    # Circuit breakers for Vision and the Pokemon TCG API
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout_s: float = 15.0
+
+    # Hedged Pokemon TCG API requests (second request after the p95 latency)
+    tcg_hedge_enabled: bool = True
+    tcg_hedge_min_delay_ms: int = 100
+    tcg_hedge_max_ratio: float = 0.1
+
+    # OCR concurrency (blocking Vision calls run in a bounded thread pool)
+    ocr_max_concurrency: int = 8
+
+    # OCR result cache (exact + perceptual image hash, per worker)
+    ocr_cache_enabled: bool = True
+    ocr_cache_max_entries: int = 20000
+    ocr_cache_max_distance: int = 4
+
+    # Uploads: size limit and per-worker budget of upload bytes held in memory
+    max_upload_bytes: int = 5 * 1024 * 1024
+    upload_memory_budget_bytes: int = 64 * 1024 * 1024
+    upload_budget_wait_ms: int = 2000
+    upload_chunk_bytes: int = 64 * 1024
+
+    # Batch scans; capped at the number of MAX_UPLOAD_BYTES images that fit
+    # in UPLOAD_MEMORY_BUDGET_BYTES (12 with the defaults)
+    batch_max_images: int = 50
+
+    # Image preprocessing before OCR (runs in a process pool)
+    preprocess_enabled: bool = True
+    preprocess_max_edge: int = 1600
+    preprocess_jpeg_quality: int = 85
+    preprocess_crop_card: bool = False
+    preprocess_workers: int = 2
+
+    # Asynchronous scan jobs: fixed worker pool behind a bounded queue; a
+    # full queue rejects new jobs with 429. Finished results are kept for
+    # RESULT_TTL_S.
+    scan_jobs_workers: int = 8
+    scan_jobs_max_queue: int = 100
+    scan_jobs_max_queued_bytes: int = 64 * 1024 * 1024
+    scan_jobs_result_ttl_s: float = 300.0
+    scan_jobs_max_results: int = 10000
+
+    # Continuous scanning (WebSocket camera feed): frames are scanned once
+    # STABLE_FRAMES consecutive frames are within STABLE_DISTANCE dHash bits,
+    # and skipped within DUPLICATE_DISTANCE bits of the last scanned frame.
+    # A picture whose scan failed is retried after RETRY_BACKOFF_MS, doubling
+    # per consecutive failure up to RETRY_BACKOFF_MAX_MS
+    continuous_scan_stable_frames: int = 3
+    continuous_scan_stable_distance: int = 6
+    continuous_scan_duplicate_distance: int = 4
+    continuous_scan_retry_backoff_ms: int = 2000
+    continuous_scan_retry_backoff_max_ms: int = 30000
+
+    # Metrics: per-stage latency histograms are always recorded (served on
+    # /api/v1/metrics); METRICS_STAGE_BREAKDOWN also returns each scan's stage
+    # timings in its response metadata
+    metrics_stage_breakdown: bool = False
+
+    # Logging: records are queued and written by a background thread
+    # (LOG_FORMAT json or text). Requests get an access log record at
+    # LOG_SAMPLE_RATE, or the rate given for their route in
+    # LOG_ROUTE_SAMPLE_RATES (comma-separated `route=rate` pairs); server
+    # errors are always logged. Request headers are logged at DEBUG only.
+    log_level: str = "INFO"
+    log_format: str = "json"
+    log_queue_size: int = 10000
+    log_sample_rate: float = 1.0
+    log_route_sample_rates: str = ""
 
     # Environment
     environment: str = "development"
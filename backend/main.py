@@ -1,15 +1,67 @@
 """FastAPI application entry point."""
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from config import settings
 from api.v1 import routes as v1_routes
+from utils.error_handlers import InvalidImageException, ScanQueueFullException, ServerBusyException
+from utils.log import access_log_sampler, get_logger, log_pipeline
+from utils.metrics import (
+    close_open_stage,
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+    start_trace,
+)
+from utils.uploads import MULTIPART_OVERHEAD_BYTES, batch_image_limit, upload_budget
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared per-worker resources on startup and release them on shutdown."""
+    from services.image_preprocessor import image_preprocessor
+    from services.name_index import card_name_index
+    from services.ocr_service import ocr_service
+    from services.price_service import price_service
+    from services.scan_jobs import scan_jobs
+
+    image_preprocessor.start()
+    if price_service.history is not None:
+        price_service.history.start()
+    price_service.tcg_client.load_catalog()
+    catalog = price_service.tcg_client.catalog
+    card_name_index.load(extra_names=catalog.names() if catalog is not None else ())
+    await price_service.tcg_client.start()
+    await price_service.start()
+    if price_service.prewarm is not None:
+        price_service.prewarm.start()
+    scan_jobs.start()
+    try:
+        yield
+    finally:
+        await scan_jobs.shutdown()
+        if price_service.prewarm is not None:
+            await price_service.prewarm.shutdown()
+        await price_service.aclose()
+        await price_service.tcg_client.aclose()
+        price_service.tcg_client.close_catalog()
+        ocr_service.shutdown()
+        image_preprocessor.shutdown()
+        if price_service.history is not None:
+            price_service.history.shutdown()
+        log_pipeline.shutdown()
+
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="API for scanning Pokemon cards and retrieving pricing information",
+    lifespan=lifespan,
 )
 
 # Configure CORS - Allow all origins for development
@@ -21,23 +73,100 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add request logging middleware
-from fastapi import Request
+def _upload_error(status_code: int, code: str, message: str, details: dict, headers: dict = None) -> JSONResponse:
+    """Build an error response in the same shape as the route handlers' errors."""
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": {"error": {"code": code, "message": message, "details": details}}},
+        headers=headers
+    )
+
 
 @app.middleware("http")
-async def log_requests(request: Request, call_next):
-    if request.url.path == "/api/v1/scan":
-        print(f"[MIDDLEWARE] === INCOMING REQUEST TO /api/v1/scan ===")
-        print(f"[MIDDLEWARE] Method: {request.method}")
-        print(f"[MIDDLEWARE] Headers: {dict(request.headers)}")
-        print(f"[MIDDLEWARE] Content-Type: {request.headers.get('content-type')}")
+async def upload_admission(request: Request, call_next):
+    """
+    Admit scan uploads against the size limit and the memory budget.
+
+    Oversized bodies, and scan jobs while the job queue is full, are
+    rejected before any of the body is read. Admitted uploads hold their
+    size in the worker's upload budget while the body is parsed and the
+    scan runs, so a burst of large uploads queues (then gets a 503) instead
+    of growing worker memory.
+    """
+    if request.method != "POST" or request.url.path not in ("/api/v1/scan", "/api/v1/scan/stream", "/api/v1/scan/jobs", "/api/v1/scan/batch"):
+        return await call_next(request)
 
-    response = await call_next(request)
+    max_images = batch_image_limit() if request.url.path.endswith("/batch") else 1
+    limit = (settings.max_upload_bytes + MULTIPART_OVERHEAD_BYTES) * max_images
+    content_length = request.headers.get("content-length")
+    declared = int(content_length) if content_length and content_length.isdigit() else None
+    if declared is not None and declared > limit:
+        max_mb = settings.max_upload_bytes * max_images // (1024 * 1024)
+        subject = "Batch upload" if max_images > 1 else "Image file"
+        return _upload_error(
+            413,
+            "INVALID_IMAGE",
+            f"{subject} too large. Maximum size is {max_mb}MB.",
+            {"content_length": declared}
+        )
 
-    if request.url.path == "/api/v1/scan":
-        print(f"[MIDDLEWARE] Response status: {response.status_code}")
+    if request.url.path == "/api/v1/scan/jobs":
+        from services.scan_jobs import scan_jobs
+
+        try:
+            scan_jobs.check_capacity(declared or 0)
+        except ScanQueueFullException as e:
+            retry_after = e.details["retry_after_s"]
+            return _upload_error(429, "SCAN_QUEUE_FULL", e.message, e.details, {"Retry-After": str(retry_after)})
+
+    try:
+        async with upload_budget.reserve(declared or limit):
+            return await call_next(request)
+    except InvalidImageException as e:
+        return _upload_error(413, "INVALID_IMAGE", e.message, e.details)
+    except ServerBusyException as e:
+        retry_after = e.details.get("retry_after_s", 1)
+        return _upload_error(503, "SERVER_BUSY", e.message, e.details, {"Retry-After": str(retry_after)})
+
+
+access_log = get_logger("Access")
+
+
+@app.middleware("http")
+async def request_telemetry(request: Request, call_next):
+    """
+    Count, time and log requests, and collect their per-stage timings.
 
-    return response
+    Runs outermost, so rejections by the other middleware are counted too.
+    Requests are labelled by route template (not the raw path) to keep the
+    number of series bounded. Access log records are sampled per route
+    (server errors always logged); headers are only logged at DEBUG.
+    """
+    trace = start_trace()
+    http_requests_in_flight.inc()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        close_open_stage(trace)
+        http_requests_in_flight.dec()
+        route = request.scope.get("route")
+        template = route.path if route is not None else "unmatched"
+        duration_s = time.perf_counter() - trace.started_at
+        http_request_duration_seconds.labels(request.method, template).observe(duration_s)
+        http_requests_total.labels(request.method, template, str(status_code)).inc()
+        if status_code >= 500 or access_log_sampler.sample(template):
+            access_log.info(
+                "request",
+                method=request.method,
+                path=request.url.path,
+                route=template,
+                status=status_code,
+                duration_ms=round(duration_s * 1000, 1),
+                debug=lambda: {"headers": dict(request.headers)},
+            )
 
 # Include API routes
 app.include_router(v1_routes.router, prefix="/api/v1", tags=["v1"])
@@ -1,6 +1,8 @@
 """Pydantic models for request/response validation."""
+import time
+
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -21,24 +23,75 @@ class PriceSource(BaseModel):
     last_updated: datetime = Field(default_factory=datetime.utcnow, description="Last update time")
 
 
+class RollingPriceStatistics(BaseModel):
+    """Price statistics over a rolling window of recorded history."""
+    days: int = Field(..., description="Window length in days")
+    count: int = Field(..., description="Daily price points in the window (one per source per day)")
+    average: float = Field(..., description="Average price")
+    median: float = Field(..., description="Median price")
+    p10: float = Field(..., description="10th percentile price")
+    p25: float = Field(..., description="25th percentile price")
+    p75: float = Field(..., description="75th percentile price")
+    p90: float = Field(..., description="90th percentile price")
+
+
 class PricingStatistics(BaseModel):
     """Statistical analysis of pricing data."""
     median: float = Field(..., description="Median price")
     average: float = Field(..., description="Average price")
     count: int = Field(..., description="Number of sources")
     recommendation: str = Field(default="median", description="Recommended price type")
+    windows: Dict[str, RollingPriceStatistics] = Field(
+        default_factory=dict,
+        description="Rolling 7d/30d/90d statistics from recorded price history"
+    )
 
 
 class PricingData(BaseModel):
     """Aggregated pricing data."""
     sources: List[PriceSource] = Field(default_factory=list, description="Price sources")
     statistics: PricingStatistics = Field(..., description="Price statistics")
+    missing_sources: List[str] = Field(
+        default_factory=list,
+        description="Price providers that failed or did not answer before the deadline"
+    )
+
+
+class PriceHistoryResult(BaseModel):
+    """Recorded price history statistics for one card."""
+    card_id: str = Field(..., description="Pokemon TCG API card ID")
+    windows: Dict[str, RollingPriceStatistics] = Field(
+        default_factory=dict,
+        description="Rolling 7d/30d/90d statistics"
+    )
 
 
 class ScanMetadata(BaseModel):
     """Metadata about the scan operation."""
     scan_time_ms: int = Field(..., description="Total scan time in milliseconds")
     confidence_score: float = Field(default=0.0, description="OCR confidence (0-1)")
+    stages_ms: Optional[Dict[str, float]] = Field(
+        None,
+        description="Milliseconds spent in each processing stage (when METRICS_STAGE_BREAKDOWN is on)"
+    )
+
+    @classmethod
+    def for_scan(cls, start_time: float, stages_ms: Optional[Dict[str, float]] = None) -> "ScanMetadata":
+        """
+        Metadata of a scan that started at `start_time` and finishes now.
+
+        Args:
+            start_time: time.time() when the scan started
+            stages_ms: Per-stage timings, when reported
+
+        Returns:
+            ScanMetadata shared by every scan endpoint
+        """
+        return cls(
+            scan_time_ms=int((time.time() - start_time) * 1000),
+            confidence_score=0.95,  # TODO: Get actual confidence from OCR
+            stages_ms=stages_ms
+        )
 
 
 class PricingResult(BaseModel):
@@ -48,6 +101,15 @@ class PricingResult(BaseModel):
     metadata: ScanMetadata = Field(..., description="Scan metadata")
 
 
+class PricingSummary(BaseModel):
+    """Statistics over the prices streamed by /scan/stream."""
+    statistics: PricingStatistics = Field(..., description="Price statistics over all sources")
+    missing_sources: List[str] = Field(
+        default_factory=list,
+        description="Price providers that failed or did not answer before the deadline"
+    )
+
+
 class ErrorDetail(BaseModel):
     """Error details."""
     code: str = Field(..., description="Error code")
@@ -55,9 +117,57 @@ class ErrorDetail(BaseModel):
     details: Optional[dict] = Field(None, description="Additional error context")
 
 
+class UpstreamHealth(BaseModel):
+    """Circuit breaker state and latency of one upstream service."""
+    state: str = Field(..., description="Circuit breaker state: closed, open or half_open")
+    consecutive_failures: int = Field(0, description="Failures since the last success")
+    failures: int = Field(0, description="Failed calls (errors, timeouts, 5xx)")
+    successes: int = Field(0, description="Successful calls")
+    rejected: int = Field(0, description="Calls refused while the circuit was open")
+    trips: int = Field(0, description="Times the circuit has opened")
+    retry_after_s: float = Field(0.0, description="Seconds until an open circuit allows a trial call")
+    samples: int = Field(0, description="Latency samples recorded")
+    latency_ewma_ms: Optional[float] = Field(None, description="Moving average call latency")
+    latency_p95_ms: Optional[float] = Field(None, description="95th percentile of recent call latencies")
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
-    status: str = Field(..., description="Health status")
+    status: str = Field(..., description="Health status: healthy, or degraded while a circuit is not closed")
     version: str = Field(..., description="API version")
     dependencies: dict = Field(default_factory=dict, description="Dependency status")
+    upstreams: Dict[str, UpstreamHealth] = Field(default_factory=dict, description="Upstream breaker state and latency")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Current time")
+
+
+class BatchScanItem(BaseModel):
+    """Result for one image of a batch scan."""
+    index: int = Field(..., description="Position of the image in the upload")
+    filename: Optional[str] = Field(None, description="Uploaded file name")
+    result: Optional[PricingResult] = Field(None, description="Scan result, if successful")
+    error: Optional[ErrorDetail] = Field(None, description="Error, if this image failed")
+
+
+class BatchScanMetadata(BaseModel):
+    """Metadata about a batch scan operation."""
+    scan_time_ms: int = Field(..., description="Total batch time in milliseconds")
+    total: int = Field(..., description="Number of images received")
+    succeeded: int = Field(..., description="Images scanned and priced successfully")
+    failed: int = Field(..., description="Images that returned an error")
+
+
+class BatchScanResult(BaseModel):
+    """Complete response for a batch scan."""
+    items: List[BatchScanItem] = Field(default_factory=list, description="Per-image results, in upload order")
+    metadata: BatchScanMetadata = Field(..., description="Batch metadata")
+
+
+class ScanJobStatus(BaseModel):
+    """State of an asynchronous scan job."""
+    job_id: str = Field(..., description="Job ID to poll at /scan/jobs/{job_id}")
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    queue_position: Optional[int] = Field(None, description="Place in the queue while queued (1 = next)")
+    queue_wait_ms: Optional[int] = Field(None, description="Time spent waiting for a worker")
+    processing_ms: Optional[int] = Field(None, description="Time spent scanning")
+    result: Optional[PricingResult] = Field(None, description="Scan result, once succeeded")
+    error: Optional[ErrorDetail] = Field(None, description="Error, once failed")
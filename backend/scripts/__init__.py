@@ -0,0 +1 @@
+"""Command-line maintenance scripts."""
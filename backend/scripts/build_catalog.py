@@ -0,0 +1,81 @@
+"""
+Build the offline card catalog used by PokemonTCGClient.
+
+Either pages through the Pokemon TCG API (only identity fields are
+requested) or loads local JSON dumps, and writes the compact catalog file
+read at startup.
+
+Usage (from backend/):
+    python -m scripts.build_catalog                        # from the API
+    python -m scripts.build_catalog --from-json cards.json # from dump(s)
+    python -m scripts.build_catalog --output data/card_catalog.bin
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Dict, Iterator, List
+
+import httpx
+
+from clients.card_catalog import CardCatalog, write_catalog
+from config import settings
+
+PAGE_SIZE = 250
+SELECT_FIELDS = "id,name,number,rarity,set"
+
+
+def fetch_from_api(page_size: int = PAGE_SIZE) -> Iterator[Dict]:
+    """Yield every card from the Pokemon TCG API, page by page."""
+    headers = {"X-Api-Key": settings.pokemon_tcg_api_key} if settings.pokemon_tcg_api_key else {}
+    with httpx.Client(base_url=settings.pokemon_tcg_api_url, headers=headers, timeout=60) as client:
+        page = 1
+        while True:
+            response = client.get(
+                "/cards",
+                params={"page": page, "pageSize": page_size, "select": SELECT_FIELDS, "orderBy": "id"}
+            )
+            response.raise_for_status()
+            body = response.json()
+            cards = body.get("data", [])
+            yield from cards
+
+            total = body.get("totalCount", 0)
+            print(f"[build_catalog] page {page}: {page * page_size if cards else total}/{total}", file=sys.stderr)
+            if not cards or page * page_size >= total:
+                return
+            page += 1
+
+
+def load_from_json(paths: List[str]) -> Iterator[Dict]:
+    """Yield cards from JSON dumps (a list of cards or an API {"data": [...]} page)."""
+    for path in paths:
+        with open(path, encoding="utf-8") as source:
+            body = json.load(source)
+        yield from body.get("data", []) if isinstance(body, dict) else body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--from-json", nargs="+", metavar="PATH", help="Load cards from JSON dump files")
+    parser.add_argument("--output", default=settings.card_catalog_path, help="Catalog file to write")
+    args = parser.parse_args()
+
+    if not args.output:
+        parser.error("no --output given and CARD_CATALOG_PATH is not set")
+
+    started = time.perf_counter()
+    cards = load_from_json(args.from_json) if args.from_json else fetch_from_api()
+    count = write_catalog(cards, args.output)
+
+    catalog = CardCatalog(args.output)
+    stats = catalog.stats()
+    catalog.close()
+    print(
+        f"[build_catalog] wrote {count} cards ({stats['strings']} distinct strings, "
+        f"{stats['file_bytes']} bytes) to {args.output} in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,70 @@
 """Card data parsing and validation logic."""
+import os
 import re
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
+from config import settings
+from utils.log import get_logger
+from utils.term_matcher import TermMatcher
 
-def parse_card_name(text: str) -> Optional[str]:
+if TYPE_CHECKING:
+    from services.name_index import CardNameIndex
+
+logger = get_logger("CardParser")
+
+# Card number as printed (e.g., "4/102", "25/100")
+CARD_NUMBER_PATTERN = re.compile(r"(\d+)/(\d+)")
+
+# Lines containing these are never the card name
+NAME_SKIP_WORDS = ("hp", "©", "pokemon", "length")
+
+# HP banner ("HP 120", "120 HP"), which OCR may join to the name's line
+HP_BANNER_PATTERN = re.compile(r"\b(?:HP\s*\d+|\d+\s*HP)\b", re.IGNORECASE)
+
+# Capitalized words, allowing "Mr. Mime", "Farfetch'd", "Ho-Oh", plus a
+# trailing printed suffix such as "Pikachu V" or "Charizard ex"
+CARD_NAME_PATTERN = re.compile(
+    r"^[A-Z][a-z]*(?:['.\-][A-Za-z]*)*"
+    r"(?:\s+[A-Z][a-z]*(?:['.\-][A-Za-z]*)*)*"
+    r"(?:\s+(?:V|VMAX|VSTAR|GX|EX|ex|BREAK))?$"
+)
+
+
+def parse_card_name(
+    text: str,
+    name_index: Optional["CardNameIndex"] = None,
+    min_score: float = 0.7
+) -> Optional[str]:
     """
     Extract Pokemon card name from OCR text.
 
+    With a name index, the first lines are fuzzy-matched against known card
+    names in order and the first match is returned, so OCR noise like
+    "Charizarcl" still yields "Charizard" while a known name further down
+    (in "Evolves from Charmeleon") does not win over it. An HP banner on
+    the name's line is ignored; lines that are skipped without an index
+    are skipped here too. Without an index (or when nothing matches), the
+    first line that looks like a card name is returned as read.
+
     Args:
         text: Full OCR text
+        name_index: Index of known card names for fuzzy matching
+        min_score: Minimum similarity (0..1) for a fuzzy match
 
     Returns:
         Card name if found, None otherwise
     """
     lines = text.split("\n")
 
+    if name_index is not None and len(name_index):
+        for line in lines[:10]:
+            line = HP_BANNER_PATTERN.sub(" ", line).strip()
+            if any(skip in line.lower() for skip in NAME_SKIP_WORDS):
+                continue
+            match = name_index.match_line(line, min_score)
+            if match is not None:
+                return match.name
+
     # Pokemon card names are usually in the first few lines
     # and are typically capitalized words
     for line in lines[:10]:  # Check first 10 lines
@@ -25,16 +75,70 @@ def parse_card_name(text: str) -> Optional[str]:
             continue
 
         # Skip lines that are obviously not card names
-        if any(skip in line.lower() for skip in ["hp", "©", "pokemon", "length"]):
+        if any(skip in line.lower() for skip in NAME_SKIP_WORDS):
             continue
 
         # Check if line looks like a card name (mostly alphabetic)
-        if re.match(r"^[A-Z][a-z]+(\s+[A-Z][a-z]+)*$", line):
+        if CARD_NAME_PATTERN.match(line):
             return line
 
     return None
 
 
+def load_card_terms(path: Optional[str] = None) -> TermMatcher:
+    """
+    Build the set/rarity matcher from the card terms file.
+
+    Args:
+        path: Terms file (defaults to settings.card_terms_path)
+
+    Returns:
+        TermMatcher with "sets" and "rarities" terms in file order
+    """
+    path = path if path is not None else settings.card_terms_path
+    terms: List[Tuple[str, str]] = []
+    if not os.path.exists(path):
+        logger.warning("terms_file_missing", path=path, effect="sets and rarities will not be detected")
+        return TermMatcher(terms)
+
+    section = None
+    with open(path, encoding="utf-8") as source:
+        for line in source:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                section = line[1:-1]
+            elif section:
+                terms.append((section, line))
+    return TermMatcher(terms)
+
+
+_term_matcher: Optional[TermMatcher] = None
+
+
+def get_term_matcher() -> TermMatcher:
+    """Return the shared set/rarity matcher, loading it on first use."""
+    global _term_matcher
+    if _term_matcher is None:
+        _term_matcher = load_card_terms()
+    return _term_matcher
+
+
+def extract_card_number(text: str) -> Optional[str]:
+    """
+    Extract the printed card number from OCR text.
+
+    Args:
+        text: Full OCR text
+
+    Returns:
+        Card number (e.g., "4/102") if found, None otherwise
+    """
+    match = CARD_NUMBER_PATTERN.search(text)
+    return match.group(0) if match else None
+
+
 def extract_set_info(text: str) -> Tuple[Optional[str], Optional[str]]:
     """
     Extract set name and card number from OCR text.
@@ -45,36 +149,8 @@ def extract_set_info(text: str) -> Tuple[Optional[str], Optional[str]]:
     Returns:
         Tuple of (set_name, card_number)
     """
-    set_name = None
-    card_number = None
-
-    lines = text.split("\n")
-
-    # Look for card number pattern (e.g., "4/102", "25/100")
-    number_pattern = r"(\d+)/(\d+)"
-    for line in lines:
-        match = re.search(number_pattern, line)
-        if match:
-            card_number = match.group(0)
-            break
-
-    # Common Pokemon TCG set names to look for
-    common_sets = [
-        "Base Set", "Jungle", "Fossil", "Team Rocket",
-        "Gym Heroes", "Gym Challenge", "Neo Genesis",
-        "Sword & Shield", "Vivid Voltage", "Evolving Skies",
-        "Brilliant Stars", "Astral Radiance", "Lost Origin",
-        "Silver Tempest", "Crown Zenith", "Paldea Evolved",
-        "Obsidian Flames", "151", "Paradox Rift"
-    ]
-
-    text_lower = text.lower()
-    for set_name_candidate in common_sets:
-        if set_name_candidate.lower() in text_lower:
-            set_name = set_name_candidate
-            break
-
-    return set_name, card_number
+    terms = get_term_matcher().best(text)
+    return terms.get("sets"), extract_card_number(text)
 
 
 def extract_rarity(text: str) -> Optional[str]:
@@ -87,37 +163,34 @@ def extract_rarity(text: str) -> Optional[str]:
     Returns:
         Rarity string if found, None otherwise
     """
-    rarities = [
-        "Common", "Uncommon", "Rare", "Holo Rare",
-        "Ultra Rare", "Secret Rare", "Rainbow Rare",
-        "Full Art", "V", "VMAX", "VSTAR", "ex", "GX"
-    ]
+    return get_term_matcher().best(text).get("rarities")
 
-    text_lower = text.lower()
-    for rarity in rarities:
-        if rarity.lower() in text_lower:
-            return rarity
 
-    return None
-
-
-def parse_full_card_info(text: str) -> dict:
+def parse_full_card_info(
+    text: str,
+    name_index: Optional["CardNameIndex"] = None,
+    min_score: float = 0.7
+) -> dict:
     """
     Parse all card information from OCR text.
 
+    Set and rarity come from a single scan of the text with the shared
+    term matcher; when several terms of one kind appear, the one listed
+    first in the terms file wins.
+
     Args:
         text: Full OCR text
+        name_index: Index of known card names for fuzzy name matching
+        min_score: Minimum similarity (0..1) for a fuzzy name match
 
     Returns:
         Dict with card info (name, set, number, rarity)
     """
-    name = parse_card_name(text)
-    set_name, card_number = extract_set_info(text)
-    rarity = extract_rarity(text)
+    terms = get_term_matcher().best(text)
 
     return {
-        "name": name,
-        "set": set_name,
-        "number": card_number,
-        "rarity": rarity
+        "name": parse_card_name(text, name_index, min_score),
+        "set": terms.get("sets"),
+        "number": extract_card_number(text),
+        "rarity": terms.get("rarities")
     }
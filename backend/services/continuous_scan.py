@@ -0,0 +1,266 @@
+"""Continuous scanning of a live camera feed over a WebSocket."""
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+from config import settings
+from models.schemas import CardInfo, PricingResult, ScanMetadata
+from utils.deadline import Deadline
+from utils.error_handlers import OCRFailedException
+from utils.image_hash import dhash, hamming_distance
+from utils.log import get_logger
+
+logger = get_logger("ContinuousScan")
+
+# Frame outcomes counted per session and across all sessions
+FRAME_OUTCOMES = ("processed", "skipped_unstable", "skipped_duplicate", "dropped_stale", "invalid")
+
+# Publishes one event to the client: (event name, payload model or exception)
+Publish = Callable[[str, object], Awaitable[None]]
+
+
+class ContinuousScanMetrics:
+    """Frame counters across all continuous-scan sessions of this worker."""
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.sessions_total = 0
+        self.sessions_active = 0
+        self.frames_received = 0
+        self.frames = {outcome: 0 for outcome in FRAME_OUTCOMES}
+        self.results_pushed = 0
+
+    def stats(self) -> dict:
+        """Return session and frame counters, with the share of frames sent to OCR."""
+        return {
+            "sessions_total": self.sessions_total,
+            "sessions_active": self.sessions_active,
+            "frames_received": self.frames_received,
+            **{f"frames_{outcome}": count for outcome, count in self.frames.items()},
+            "processed_ratio": (
+                round(self.frames["processed"] / self.frames_received, 4) if self.frames_received else 0.0
+            ),
+            "results_pushed": self.results_pushed,
+        }
+
+
+class ContinuousScanSession:
+    """
+    Recognize cards in a stream of camera frames from one client.
+
+    Each frame is reduced to a dHash on arrival. A frame is only worth
+    scanning once the picture is stable (the last `stable_frames` frames
+    within `stable_distance` bits of each other, so the camera is not
+    looking at a card being moved) and differs by more than
+    `duplicate_distance` bits from the last frame scanned.
+
+    Scanning is done by a single worker that always takes the newest
+    eligible frame: a frame still waiting when a newer one qualifies is
+    dropped, so a slow OCR call never builds a backlog. A result is
+    published only when the identified card changes.
+
+    A picture whose scan failed stays the last scanned frame: its later
+    frames are retried only once a backoff has passed (doubling with each
+    consecutive failure, and at least the error's retry_after_s), or
+    scanned at once after a scene change. An error is published once
+    until a different error occurs or a scan succeeds.
+    """
+
+    def __init__(
+        self,
+        publish: Publish,
+        stable_frames: int,
+        stable_distance: int,
+        duplicate_distance: int,
+        max_frame_bytes: int,
+        retry_backoff_s: float = 2.0,
+        retry_backoff_max_s: float = 30.0,
+        metrics: Optional[ContinuousScanMetrics] = None,
+    ):
+        """
+        Args:
+            publish: Coroutine sending an event to the client
+            stable_frames: Consecutive similar frames required before scanning
+            stable_distance: Largest dHash distance between frames counted as still
+            duplicate_distance: Largest dHash distance to the last scanned frame
+                treated as the same picture
+            max_frame_bytes: Larger frames are rejected
+            retry_backoff_s: Wait before rescanning a picture whose scan failed
+            retry_backoff_max_s: Longest wait after consecutive failures
+            metrics: Worker-wide counters to update alongside the session's own
+        """
+        self.publish = publish
+        self.stable_frames = max(stable_frames, 1)
+        self.stable_distance = stable_distance
+        self.duplicate_distance = duplicate_distance
+        self.max_frame_bytes = max_frame_bytes
+        self.retry_backoff_s = retry_backoff_s
+        self.retry_backoff_max_s = retry_backoff_max_s
+        self.metrics = metrics
+
+        self._previous_hash: Optional[int] = None
+        self._stable_count = 0
+        self._scanned_hash: Optional[int] = None
+        # Set while the last scanned picture failed: when it may be retried
+        self._retry_at: Optional[float] = None
+        self._failures = 0
+        self._last_error: Optional[Tuple[str, str]] = None
+        self._pending: Optional[Tuple[bytes, int]] = None
+        self._ready = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self.current_card: Optional[Tuple[str, str, str]] = None
+
+        self.frames_received = 0
+        self.frames = {outcome: 0 for outcome in FRAME_OUTCOMES}
+        self.results_pushed = 0
+        self.errors_pushed = 0
+
+    def start(self) -> None:
+        """Start the scanning worker."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+            if self.metrics is not None:
+                self.metrics.sessions_total += 1
+                self.metrics.sessions_active += 1
+
+    async def close(self) -> None:
+        """Stop the worker, abandoning any scan in progress."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except (asyncio.CancelledError, Exception):
+            pass
+        self._worker = None
+        if self.metrics is not None:
+            self.metrics.sessions_active -= 1
+        logger.info(
+            "session_closed",
+            received=self.frames_received,
+            **self.frames,
+            pushed=self.results_pushed,
+            errors_pushed=self.errors_pushed,
+        )
+
+    def _count(self, outcome: str) -> None:
+        self.frames[outcome] += 1
+        if self.metrics is not None:
+            self.metrics.frames[outcome] += 1
+
+    async def feed(self, frame: bytes) -> str:
+        """
+        Accept one frame from the client.
+
+        Args:
+            frame: Encoded image (JPEG/PNG)
+
+        Returns:
+            What happened to the frame: "queued", or the reason it was skipped
+        """
+        self.frames_received += 1
+        if self.metrics is not None:
+            self.metrics.frames_received += 1
+
+        phash = await asyncio.to_thread(dhash, frame) if len(frame) <= self.max_frame_bytes else None
+        if phash is None:
+            self._count("invalid")
+            return "invalid"
+
+        # Still picture: consecutive frames barely differ
+        still = self._previous_hash is not None and hamming_distance(phash, self._previous_hash) <= self.stable_distance
+        self._stable_count = self._stable_count + 1 if still else 1
+        self._previous_hash = phash
+        if self._stable_count < self.stable_frames:
+            self._count("skipped_unstable")
+            return "skipped_unstable"
+
+        if self._scanned_hash is not None and hamming_distance(phash, self._scanned_hash) <= self.duplicate_distance:
+            if self._retry_at is None or time.monotonic() < self._retry_at:
+                self._count("skipped_duplicate")
+                return "skipped_duplicate"
+
+        if self._pending is not None:
+            self._count("dropped_stale")
+        self._pending = (frame, phash)
+        self._ready.set()
+        return "queued"
+
+    async def _run(self) -> None:
+        """Scan the newest queued frame, one at a time."""
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            frame, phash = self._pending
+            self._pending = None
+            # Later frames of this same picture are duplicates from now on
+            self._scanned_hash = phash
+            self._count("processed")
+            try:
+                await self._scan(frame)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._failed(e)
+            else:
+                self._retry_at = None
+                self._failures = 0
+                self._last_error = None
+
+    async def _failed(self, error: Exception) -> None:
+        """Back off before retrying this picture; publish the error unless just published."""
+        self._failures += 1
+        backoff_s = min(self.retry_backoff_s * 2 ** (self._failures - 1), self.retry_backoff_max_s)
+        retry_after_s = (getattr(error, "details", None) or {}).get("retry_after_s") or 0
+        backoff_s = max(backoff_s, retry_after_s)
+        self._retry_at = time.monotonic() + backoff_s
+        logger.warning(
+            "frame_failed",
+            error_type=type(error).__name__,
+            error=str(error),
+            failures=self._failures,
+            retry_in_s=round(backoff_s, 2),
+        )
+
+        error_key = (type(error).__name__, getattr(error, "message", str(error)))
+        if error_key != self._last_error:
+            self._last_error = error_key
+            self.errors_pushed += 1
+            await self.publish("error", error)
+
+    async def _scan(self, frame: bytes) -> None:
+        """OCR a frame and publish the priced card if it is a different card."""
+        from services.image_preprocessor import image_preprocessor
+        from services.ocr_service import ocr_service
+        from services.price_service import price_service
+
+        start_time = time.time()
+        deadline = Deadline(settings.scan_deadline_ms / 1000)
+        image_bytes = await image_preprocessor.preprocess(frame)
+        try:
+            card_info: CardInfo = await ocr_service.extract_card_info(image_bytes, deadline=deadline)
+        except OCRFailedException:
+            # Nothing readable in view (empty tray, hand in the way)
+            if self.current_card is not None:
+                self.current_card = None
+                await self.publish("cleared", None)
+            return
+
+        key = price_service.cache_key(card_info)
+        if key == self.current_card:
+            return
+
+        pricing_data = await price_service.get_pricing(card_info, deadline=deadline)
+        self.current_card = key
+        self.results_pushed += 1
+        if self.metrics is not None:
+            self.metrics.results_pushed += 1
+        await self.publish("card", PricingResult(
+            card=card_info,
+            pricing=pricing_data,
+            metadata=ScanMetadata.for_scan(start_time)
+        ))
+
+
+# Global continuous-scan metrics
+continuous_scan_metrics = ContinuousScanMetrics()
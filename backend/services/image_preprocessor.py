@@ -0,0 +1,228 @@
+"""Image preprocessing before OCR: orient, crop, downscale and re-encode."""
+import asyncio
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageFilter, ImageOps, UnidentifiedImageError
+
+from config import settings
+from utils.error_handlers import InvalidImageException
+from utils.log import get_logger
+from utils.metrics import stage
+
+logger = get_logger("ImagePreprocessor")
+
+STAGES = ("decode", "orient", "crop", "resize", "encode")
+
+
+def _find_card_box(image: Image.Image) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Estimate the bounding box of the card in a photo.
+
+    Works on a small grayscale thumbnail: strong edges are thresholded and
+    their bounding box is scaled back up. Returns None when the box is not
+    plausibly a card (too small, or essentially the whole frame).
+    """
+    thumb = image.convert("L")
+    thumb.thumbnail((256, 256))
+    edges = thumb.filter(ImageFilter.FIND_EDGES).point(lambda v: 255 if v > 40 else 0)
+    box = edges.getbbox()
+    if box is None:
+        return None
+
+    scale_x = image.width / thumb.width
+    scale_y = image.height / thumb.height
+    left, top, right, bottom = box
+    area_ratio = ((right - left) * (bottom - top)) / float(thumb.width * thumb.height)
+    if area_ratio < 0.2 or area_ratio > 0.95:
+        return None
+
+    # Keep a small margin so border text is not clipped
+    margin = 2
+    return (
+        max(int((left - margin) * scale_x), 0),
+        max(int((top - margin) * scale_y), 0),
+        min(int((right + margin) * scale_x), image.width),
+        min(int((bottom + margin) * scale_y), image.height),
+    )
+
+
+def preprocess_image(
+    image_bytes: bytes,
+    max_edge: int,
+    quality: int,
+    crop: bool = False
+) -> Tuple[bytes, Dict[str, float]]:
+    """
+    Prepare an uploaded photo for text detection.
+
+    Runs in a worker process. Applies EXIF orientation, optionally crops to
+    the detected card, downscales so the longest edge is at most `max_edge`
+    and re-encodes as JPEG. When none of those changed the picture and the
+    re-encode would not be smaller than the upload, the original bytes are
+    returned unchanged.
+
+    Args:
+        image_bytes: Encoded upload
+        max_edge: Maximum width/height in pixels of the output
+        quality: JPEG quality for the re-encode
+        crop: Whether to crop to the detected card rectangle
+
+    Returns:
+        Tuple of (image bytes, per-stage timings in milliseconds)
+    """
+    timings: Dict[str, float] = {}
+    mark = time.perf_counter()
+
+    def lap(stage: str) -> None:
+        nonlocal mark
+        now = time.perf_counter()
+        timings[stage] = (now - mark) * 1000
+        mark = now
+
+    image = Image.open(io.BytesIO(image_bytes))
+    original_size = image.size
+    # Let the JPEG decoder downscale by a power of two while decoding, keeping
+    # the longest edge at or above max_edge
+    longest = max(image.size)
+    if longest > max_edge:
+        image.draft("RGB", (image.width * max_edge // longest, image.height * max_edge // longest))
+    image.load()
+    lap("decode")
+
+    # EXIF orientation tag; transposing copies the image, so skip when upright
+    oriented = image.getexif().get(0x0112, 1) != 1
+    if oriented:
+        image = ImageOps.exif_transpose(image)
+    lap("orient")
+
+    if crop:
+        box = _find_card_box(image)
+        if box is not None:
+            image = image.crop(box)
+    lap("crop")
+
+    if max(image.size) > max_edge:
+        image.thumbnail((max_edge, max_edge), Image.LANCZOS, reducing_gap=2.0)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    lap("resize")
+
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=quality)
+    lap("encode")
+
+    processed = output.getvalue()
+    # Orienting, cropping and downscaling must reach OCR even at a larger size
+    transformed = oriented or image.size != original_size
+    if not transformed and len(processed) >= len(image_bytes):
+        return image_bytes, timings
+    return processed, timings
+
+
+class ImagePreprocessor:
+    """Runs preprocess_image in a process pool and tracks its savings."""
+
+    def __init__(self):
+        """Read preprocessing settings; the pool is created on first use."""
+        self.enabled = settings.preprocess_enabled
+        self.max_edge = settings.preprocess_max_edge
+        self.quality = settings.preprocess_jpeg_quality
+        self.crop = settings.preprocess_crop_card
+        self.workers = settings.preprocess_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        self.images = 0
+        self.failures = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.stage_ms_total = {stage: 0.0 for stage in STAGES}
+
+    def start(self) -> None:
+        """Create the worker process pool."""
+        if self.enabled and self._pool is None:
+            # Spawn rather than fork: request workers run threads (OCR pool)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def shutdown(self) -> None:
+        """Stop the worker process pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def preprocess(self, image_bytes: bytes) -> bytes:
+        """
+        Preprocess an upload in the process pool.
+
+        Args:
+            image_bytes: Encoded upload
+
+        Returns:
+            Image bytes to send to OCR
+
+        Raises:
+            InvalidImageException: If the image cannot be decoded
+        """
+        if not self.enabled:
+            return image_bytes
+
+        self.start()
+        loop = asyncio.get_running_loop()
+        try:
+            with stage("preprocess"):
+                processed, timings = await loop.run_in_executor(
+                    self._pool,
+                    preprocess_image,
+                    image_bytes,
+                    self.max_edge,
+                    self.quality,
+                    self.crop
+                )
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as e:
+            self.failures += 1
+            raise InvalidImageException(
+                "Could not read image. Please upload a valid JPEG or PNG image.",
+                details={"error": str(e)}
+            )
+        except Exception as e:
+            # Pool problems must not fail the scan; send the original upload
+            self.failures += 1
+            logger.warning("preprocessing_unavailable_sending_original", error=str(e))
+            if isinstance(e, BrokenProcessPool):
+                self.shutdown()
+            return image_bytes
+
+        self.images += 1
+        self.bytes_in += len(image_bytes)
+        self.bytes_out += len(processed)
+        for name, ms in timings.items():
+            self.stage_ms_total[name] += ms
+        return processed
+
+    def stats(self) -> dict:
+        """Return byte savings and average per-stage timings."""
+        images = self.images
+        return {
+            "enabled": self.enabled,
+            "images": images,
+            "failures": self.failures,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out,
+            "savings_ratio": round(1 - self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0,
+            "avg_stage_ms": {
+                stage: round(total / images, 3) if images else 0.0
+                for stage, total in self.stage_ms_total.items()
+            },
+        }
+
+
+# Global image preprocessor instance
+image_preprocessor = ImagePreprocessor()
@@ -0,0 +1,274 @@
+"""Fuzzy card-name matching over a vocabulary of known card names."""
+import os
+import re
+import time
+import unicodedata
+from collections import Counter
+from heapq import nlargest
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from config import settings
+from utils.log import get_logger
+
+logger = get_logger("NameIndex")
+
+# Printed name suffixes that are not part of the Pokemon's own name
+NAME_SUFFIXES = ("V", "VMAX", "VSTAR", "GX", "EX", "ex", "BREAK", "LV.X", "Prime", "Star")
+# Misprinted-case suffixes ("Vmax", "gx") mapped to their printed form
+_SUFFIX_CASES = {suffix.upper(): suffix for suffix in NAME_SUFFIXES if suffix != "ex"}
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+_HP_TOKEN = re.compile(r"\b(?:HP\s*\d+|\d+\s*HP)\b", re.IGNORECASE)
+_GENDER_SIGNS = {"♀": " f", "♂": " m"}
+
+
+class NameMatch(NamedTuple):
+    """A vocabulary name and its similarity to the query (0..1)."""
+    name: str
+    score: float
+
+
+def normalize_name(text: str) -> str:
+    """
+    Reduce a card name to lowercase ASCII words for matching.
+
+    "Farfetch'd" -> "farfetchd", "Mr. Mime" -> "mr mime", "Flabébé" -> "flabebe".
+    """
+    for sign, replacement in _GENDER_SIGNS.items():
+        text = text.replace(sign, replacement)
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return " ".join(_NON_WORD.sub("", text.lower()).split())
+
+
+def _trigrams(normalized: str) -> List[str]:
+    padded = f"  {normalized} "
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    Levenshtein distance between two strings.
+
+    Uses Myers' bit-parallel algorithm: one pass over `b` with a few integer
+    operations per character, instead of filling the full DP table.
+    """
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(a):
+        peq[char] = peq.get(char, 0) | (1 << i)
+
+    mask = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    pv, mv, score = mask, 0, len(a)
+    for char in b:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+class CardNameIndex:
+    """
+    Trigram inverted index over card names with edit-distance re-ranking.
+
+    Each name is indexed under the character trigrams of its normalized
+    form. A query counts shared trigrams per name through the posting
+    lists, keeps the best `shortlist` names by Dice coefficient, and
+    scores those by normalized Levenshtein similarity. Exact (normalized)
+    matches are answered from a dict without touching the postings.
+    """
+
+    def __init__(self, shortlist: int = 24):
+        """
+        Args:
+            shortlist: Trigram candidates re-ranked by edit distance per query
+        """
+        self.shortlist = shortlist
+        self._names: List[str] = []
+        self._normalized: List[str] = []
+        self._trigram_counts: List[int] = []
+        self._by_normalized: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+
+        self.build_ms = 0.0
+        self.queries = 0
+        self.exact_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def build(self, names: Iterable[str]) -> None:
+        """
+        Replace the vocabulary and rebuild the index.
+
+        Args:
+            names: Card names; duplicates (after normalization) are dropped
+        """
+        started = time.perf_counter()
+        self._names = []
+        self._normalized = []
+        self._trigram_counts = []
+        self._by_normalized = {}
+        self._postings = {}
+
+        for name in names:
+            normalized = normalize_name(name)
+            if not normalized or normalized in self._by_normalized:
+                continue
+            index = len(self._names)
+            self._names.append(name)
+            self._normalized.append(normalized)
+            self._by_normalized[normalized] = index
+            grams = _trigrams(normalized)
+            self._trigram_counts.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(index)
+
+        self.build_ms = (time.perf_counter() - started) * 1000
+
+    def load(self, names_path: Optional[str] = None, extra_names: Iterable[str] = ()) -> None:
+        """
+        Build the index from the bundled name list plus extra names.
+
+        Args:
+            names_path: Name list file (defaults to settings.card_names_path)
+            extra_names: Additional names, e.g. from the offline card catalog
+        """
+        path = names_path if names_path is not None else settings.card_names_path
+        names: List[str] = []
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as source:
+                for line in source:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        names.append(line)
+        else:
+            logger.warning("name_list_missing", path=path)
+
+        names.extend(extra_names)
+        self.build(names)
+        logger.info("indexed", names=len(self), build_ms=round(self.build_ms))
+
+    def search(self, query: str, limit: int = 5, min_score: float = 0.0) -> List[NameMatch]:
+        """
+        Find the vocabulary names most similar to `query`.
+
+        Args:
+            query: Name as read by OCR (e.g. "Charizarcl")
+            limit: Maximum matches returned
+            min_score: Minimum similarity (0..1) for a match to be returned
+
+        Returns:
+            Matches ordered by descending score
+        """
+        self.queries += 1
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+
+        exact = self._by_normalized.get(normalized)
+        if exact is not None:
+            self.exact_hits += 1
+            if limit == 1:
+                return [NameMatch(self._names[exact], 1.0)]
+
+        grams = _trigrams(normalized)
+        postings = [self._postings[gram] for gram in grams if gram in self._postings]
+        # Trigrams shared by a large part of the vocabulary (" v ", "ex ")
+        # barely discriminate but dominate the counting; skip them when the
+        # query has rarer ones
+        common = max(64, len(self._names) // 50)
+        rare = [posting for posting in postings if len(posting) <= common]
+        shared = Counter(chain.from_iterable(rare or postings))
+        if not shared:
+            return []
+
+        # Cut by raw shared count first (C-level sort), then rank the head
+        # by Dice coefficient, which penalizes long names sharing a prefix
+        query_grams = len(grams)
+        counts = self._trigram_counts
+        head = sorted(shared.items(), key=itemgetter(1), reverse=True)[:self.shortlist * 4]
+        shortlist = nlargest(
+            self.shortlist,
+            head,
+            key=lambda item: item[1] / (query_grams + counts[item[0]])
+        )
+
+        query_length = len(normalized)
+        matches = []
+        for index, _ in shortlist:
+            candidate = self._normalized[index]
+            longest = max(query_length, len(candidate))
+            # The length difference alone bounds the best possible score
+            if 1 - abs(query_length - len(candidate)) / longest < min_score:
+                continue
+            score = 1 - edit_distance(normalized, candidate) / longest
+            if score >= min_score:
+                matches.append(NameMatch(self._names[index], round(score, 4)))
+        matches.sort(key=lambda match: match.score, reverse=True)
+        return matches[:limit]
+
+    def match_line(self, line: str, min_score: float) -> Optional[NameMatch]:
+        """
+        Match one OCR line to a card name, keeping printed suffixes.
+
+        A trailing suffix such as "V" or "ex" is also matched separately,
+        so "Pikachu V" still resolves when only "Pikachu" is known.
+
+        Args:
+            line: One line of OCR text
+            min_score: Minimum similarity for a match
+
+        Returns:
+            Best match, or None if nothing scores at least `min_score`
+        """
+        line = " ".join(_HP_TOKEN.sub(" ", line).split())
+        if len(line) < 3:
+            return None
+
+        best = next(iter(self.search(line, limit=1, min_score=min_score)), None)
+
+        base, _, suffix = line.rpartition(" ")
+        suffix = _SUFFIX_CASES.get(suffix.upper()) if suffix not in NAME_SUFFIXES else suffix
+        if not base or suffix is None:
+            return best
+
+        # "EX" and "ex" are different card eras but normalize alike; keep
+        # the suffix as printed
+        if best is not None and best.name.upper().endswith(" " + suffix.upper()):
+            return NameMatch(f"{best.name[:-len(suffix)]}{suffix}", best.score)
+
+        base_match = next(iter(self.search(base, limit=1, min_score=min_score)), None)
+        if base_match is not None and (best is None or base_match.score > best.score):
+            return NameMatch(f"{base_match.name} {suffix}", base_match.score)
+        return best
+
+    def stats(self) -> dict:
+        """Return vocabulary size, build time and query counters."""
+        return {
+            "names": len(self._names),
+            "trigrams": len(self._postings),
+            "build_ms": round(self.build_ms, 1),
+            "queries": self.queries,
+            "exact_hits": self.exact_hits,
+        }
+
+
+# Global card name index (built at startup)
+card_name_index = CardNameIndex()
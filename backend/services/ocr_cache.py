@@ -0,0 +1,101 @@
+"""Cache of OCR results keyed by exact and perceptual image hashes."""
+from collections import OrderedDict
+from typing import Optional
+
+from models.schemas import CardInfo
+from utils.image_hash import HammingIndex
+
+
+class _CachedResult:
+    """A cached OCR result and the perceptual hash it is indexed under."""
+    __slots__ = ("card_info", "phash")
+
+    def __init__(self, card_info: CardInfo, phash: Optional[int]):
+        self.card_info = card_info
+        self.phash = phash
+
+
+class OCRResultCache:
+    """
+    Bounded LRU cache mapping scanned images to extracted CardInfo.
+
+    Entries are keyed by the exact content digest. Their perceptual hash is
+    also indexed, so a re-scan of the same card (another angle, another
+    phone) within `max_distance` bits reuses the cached result instead of
+    calling Vision again.
+    """
+
+    def __init__(self, max_entries: int, max_distance: int):
+        """
+        Args:
+            max_entries: Maximum cached images before LRU eviction
+            max_distance: Largest Hamming distance treated as the same card
+        """
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self._entries: "OrderedDict[bytes, _CachedResult]" = OrderedDict()
+        self._index = HammingIndex(max_distance)
+
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_exact(self, digest: bytes) -> Optional[CardInfo]:
+        """Return the cached result for byte-identical content, if any."""
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        self._entries.move_to_end(digest)
+        self.exact_hits += 1
+        return entry.card_info
+
+    def get_similar(self, phash: Optional[int]) -> Optional[CardInfo]:
+        """
+        Return the cached result for the closest near-duplicate image.
+
+        Counts a miss when nothing is found, so call this after get_exact.
+        """
+        if phash is not None:
+            match = self._index.nearest(phash)
+            if match is not None:
+                digest = match[0]
+                self._entries.move_to_end(digest)
+                self.near_hits += 1
+                return self._entries[digest].card_info
+
+        self.misses += 1
+        return None
+
+    def put(self, digest: bytes, phash: Optional[int], card_info: CardInfo) -> None:
+        """Cache an OCR result, evicting the least recently used entry if full."""
+        existing = self._entries.pop(digest, None)
+        if existing is not None and existing.phash is not None:
+            self._index.remove(digest, existing.phash)
+
+        self._entries[digest] = _CachedResult(card_info, phash)
+        if phash is not None:
+            self._index.add(digest, phash)
+
+        while len(self._entries) > self.max_entries:
+            old_digest, old = self._entries.popitem(last=False)
+            if old.phash is not None:
+                self._index.remove(old_digest, old.phash)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """Return hit ratios and size counters."""
+        lookups = self.exact_hits + self.near_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "max_distance": self.max_distance,
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.exact_hits + self.near_hits) / lookups, 4) if lookups else 0.0,
+        }
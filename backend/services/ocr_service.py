@@ -1,65 +1,281 @@
 """OCR service for extracting card information from images."""
-from typing import Optional
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple, Union
 
 from clients.google_vision import GoogleVisionClient
+from config import settings
 from models.schemas import CardInfo
 from services.card_parser import parse_full_card_info
-from utils.error_handlers import OCRFailedException
+from services.name_index import card_name_index
+from services.ocr_cache import OCRResultCache
+from utils.circuit_breaker import CircuitBreaker, LatencyTracker
+from utils.deadline import Deadline, stage_timeout
+from utils.error_handlers import OCRFailedException, OCRUnavailableException
+from utils.image_hash import content_digest, dhash
+from utils.metrics import stage
 
 
 class OCRService:
     """Service for orchestrating OCR and card info extraction."""
 
-    def __init__(self):
-        """Initialize OCR service with Google Vision client."""
+    def __init__(self, max_concurrency: Optional[int] = None):
+        """
+        Initialize OCR service with Google Vision client.
+
+        Args:
+            max_concurrency: Maximum concurrent Vision calls per worker
+                (defaults to settings.ocr_max_concurrency)
+        """
         self.vision_client = GoogleVisionClient()
 
-    async def extract_card_info(self, image_bytes: bytes) -> CardInfo:
+        # The Vision call is a blocking gRPC request, so it runs in a
+        # dedicated thread pool sized to the concurrency cap. Requests beyond
+        # the cap queue in the pool without occupying a thread.
+        self.max_concurrency = max_concurrency or settings.ocr_max_concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.timeouts = 0
+
+        # Fail fast while Vision is erroring or timing out
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.breaker_failure_threshold,
+            reset_timeout_s=settings.breaker_reset_timeout_s,
+        )
+        self.latency = LatencyTracker()
+
+        # Noisy OCR names are snapped to known card names
+        self.name_index = card_name_index
+
+        # Re-scans of the same card skip Vision via exact/perceptual hashes
+        self.result_cache: Optional[OCRResultCache] = None
+        if settings.ocr_cache_enabled:
+            self.result_cache = OCRResultCache(
+                max_entries=settings.ocr_cache_max_entries,
+                max_distance=settings.ocr_cache_max_distance
+            )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the OCR thread pool, creating it on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="ocr"
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Stop the OCR thread pool, dropping queued work."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def concurrency_stats(self) -> dict:
+        """Return OCR concurrency counters."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "pending": self.pending,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+        }
+
+    def health(self) -> dict:
+        """Return Vision circuit breaker state and call latency."""
+        return {**self.breaker.stats(), **self.latency.stats()}
+
+    async def _run_vision(self, fn, *args, timeout_s: float, cap_s: Optional[float] = None):
+        """
+        Run a blocking Vision call off the event loop.
+
+        The whole call, including time spent queued for a free thread, is
+        bounded by `timeout_s`. The same deadline is passed to the gRPC call
+        so abandoned calls do not hold a thread for long. Errors and
+        timeouts count against the circuit breaker, except timeouts cut
+        short below the stage's own `cap_s` by the scan deadline.
+
+        Raises:
+            OCRUnavailableException: If the circuit is open or the call does not finish in time
+        """
+        if timeout_s <= 0:
+            self.timeouts += 1
+            raise OCRUnavailableException(
+                "Text recognition ran out of time. Please try again.",
+                details={"timeout_ms": 0}
+            )
+        if not self.breaker.allow():
+            raise OCRUnavailableException(
+                "Text recognition is temporarily unavailable. Please try again shortly.",
+                details={"retry_after_s": round(max(self.breaker.retry_after_s(), 1.0), 1)}
+            )
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self.pending += 1
+        try:
+            with stage("vision"):
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(self._get_executor(), fn, *args, timeout_s),
+                    timeout_s
+                )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            if cap_s is None or timeout_s >= cap_s:
+                self.breaker.record_failure()
+            raise OCRUnavailableException(
+                "Text recognition is taking too long. Please try again.",
+                details={"timeout_ms": int(timeout_s * 1000)}
+            )
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+        self.breaker.record_success()
+        self.latency.record(time.perf_counter() - started)
+        return result
+
+    async def _get_full_text(self, image_bytes: bytes, deadline: Optional[Deadline] = None) -> Optional[str]:
+        """Run text detection for one image within settings.ocr_timeout_ms and the scan deadline."""
+        cap_s = settings.ocr_timeout_ms / 1000
+        return await self._run_vision(
+            self.vision_client.get_full_text,
+            image_bytes,
+            timeout_s=stage_timeout(deadline, cap_s),
+            cap_s=cap_s
+        )
+
+    async def _lookup_cached(self, image_bytes: bytes) -> Tuple[Optional[CardInfo], bytes, Optional[int]]:
+        """
+        Look an image up in the result cache.
+
+        Returns:
+            Tuple of (cached CardInfo or None, content digest, perceptual hash)
+        """
+        digest = content_digest(image_bytes)
+        cached = self.result_cache.get_exact(digest)
+        if cached is not None:
+            return cached, digest, None
+
+        # Decoding for the perceptual hash is CPU work; keep it off the loop
+        loop = asyncio.get_running_loop()
+        phash = await loop.run_in_executor(None, dhash, image_bytes)
+        return self.result_cache.get_similar(phash), digest, phash
+
+    async def extract_card_info(self, image_bytes: bytes, deadline: Optional[Deadline] = None) -> CardInfo:
         """
         Extract Pokemon card information from image.
 
         Args:
             image_bytes: Image data as bytes
+            deadline: Scan deadline; the Vision call gets the time remaining
+                (at most settings.ocr_timeout_ms)
 
         Returns:
             CardInfo object with extracted data
 
         Raises:
             OCRFailedException: If OCR fails or no card info found
+            OCRUnavailableException: If OCR times out or Vision is failing
         """
-        try:
-            # Get full text from image
-            full_text = self.vision_client.get_full_text(image_bytes)
-
-            if not full_text or len(full_text.strip()) < 10:
-                raise OCRFailedException(
-                    "Could not detect sufficient text in image. "
-                    "Please ensure the card is clearly visible and well-lit.",
-                    details={"detected_text_length": len(full_text) if full_text else 0}
-                )
+        if self.result_cache is None:
+            return await self._extract(image_bytes, deadline)
+
+        with stage("ocr_cache_lookup"):
+            cached, digest, phash = await self._lookup_cached(image_bytes)
+        if cached is not None:
+            return cached
+
+        card_info = await self._extract(image_bytes, deadline)
+        self.result_cache.put(digest, phash, card_info)
+        return card_info
+
+    async def extract_card_info_batch(
+        self,
+        images: List[bytes],
+        deadline: Optional[Deadline] = None
+    ) -> List[Union[CardInfo, Exception]]:
+        """
+        Extract card information from many images with batched Vision calls.
 
-            # Parse card information from text
-            card_data = parse_full_card_info(full_text)
-
-            # Validate we got at least a card name
-            if not card_data.get("name"):
-                raise OCRFailedException(
-                    "Could not identify card name from image. "
-                    "Please ensure the card name is clearly visible.",
-                    details={
-                        "detected_text": full_text[:200],  # First 200 chars
-                        "parsed_data": card_data
-                    }
+        Cached images are answered from the result cache. The rest are sent
+        to Vision in batch requests (chunked to the API's per-request
+        limits), and the chunks run concurrently in the OCR thread pool.
+
+        Args:
+            images: Image data for each card
+            deadline: Batch deadline; each Vision request gets the time
+                remaining (at most settings.ocr_timeout_ms per image)
+
+        Returns:
+            One entry per image, in order: the CardInfo, or the
+            OCRFailedException/OCRUnavailableException for that image
+        """
+        results: List[Union[CardInfo, Exception, None]] = [None] * len(images)
+        keys: List[Tuple[bytes, Optional[int]]] = [(b"", None)] * len(images)
+        pending: List[int] = []
+
+        for index, image_bytes in enumerate(images):
+            if self.result_cache is not None:
+                cached, digest, phash = await self._lookup_cached(image_bytes)
+                if cached is not None:
+                    results[index] = cached
+                    continue
+                keys[index] = (digest, phash)
+            pending.append(index)
+
+        chunks = self.vision_client.plan_batches([images[i] for i in pending])
+        # Each chunk gets the single-image timeout per image it contains, or
+        # what is left of the batch deadline if that is less
+        chunk_texts = await asyncio.gather(
+            *[
+                self._run_vision(
+                    self.vision_client.batch_get_full_text,
+                    [images[pending[i]] for i in chunk],
+                    timeout_s=stage_timeout(deadline, settings.ocr_timeout_ms / 1000 * len(chunk)),
+                    cap_s=settings.ocr_timeout_ms / 1000 * len(chunk)
                 )
+                for chunk in chunks
+            ],
+            return_exceptions=True
+        )
 
-            return CardInfo(
-                name=card_data["name"],
-                set=card_data.get("set"),
-                number=card_data.get("number"),
-                rarity=card_data.get("rarity")
-            )
+        for chunk, texts in zip(chunks, chunk_texts):
+            for offset, position in enumerate(chunk):
+                index = pending[position]
+                text = texts if isinstance(texts, Exception) else texts[offset]
+                try:
+                    if isinstance(text, Exception):
+                        raise text
+                    card_info = self._card_info_from_text(text)
+                except (OCRFailedException, OCRUnavailableException) as e:
+                    results[index] = e
+                    continue
+                except Exception as e:
+                    results[index] = OCRFailedException(
+                        f"OCR processing failed: {str(e)}",
+                        details={"error": str(e)}
+                    )
+                    continue
 
-        except OCRFailedException:
+                results[index] = card_info
+                if self.result_cache is not None:
+                    self.result_cache.put(keys[index][0], keys[index][1], card_info)
+
+        return results
+
+    async def _extract(self, image_bytes: bytes, deadline: Optional[Deadline] = None) -> CardInfo:
+        """Run OCR on an image and parse the card information from its text."""
+        try:
+            # Get full text from image (off the event loop)
+            full_text = await self._get_full_text(image_bytes, deadline)
+            with stage("parse"):
+                return self._card_info_from_text(full_text)
+
+        except (OCRFailedException, OCRUnavailableException):
             raise
         except Exception as e:
             raise OCRFailedException(
@@ -67,6 +283,45 @@ class OCRService:
                 details={"error": str(e)}
             )
 
+    def _card_info_from_text(self, full_text: Optional[str]) -> CardInfo:
+        """
+        Parse card information from detected text.
+
+        Raises:
+            OCRFailedException: If there is too little text or no card name
+        """
+        if not full_text or len(full_text.strip()) < 10:
+            raise OCRFailedException(
+                "Could not detect sufficient text in image. "
+                "Please ensure the card is clearly visible and well-lit.",
+                details={"detected_text_length": len(full_text) if full_text else 0}
+            )
+
+        # Parse card information from text
+        card_data = parse_full_card_info(
+            full_text,
+            name_index=self.name_index,
+            min_score=settings.name_match_min_score
+        )
+
+        # Validate we got at least a card name
+        if not card_data.get("name"):
+            raise OCRFailedException(
+                "Could not identify card name from image. "
+                "Please ensure the card name is clearly visible.",
+                details={
+                    "detected_text": full_text[:200],  # First 200 chars
+                    "parsed_data": card_data
+                }
+            )
+
+        return CardInfo(
+            name=card_data["name"],
+            set=card_data.get("set"),
+            number=card_data.get("number"),
+            rarity=card_data.get("rarity")
+        )
+
 
 # Global OCR service instance
 ocr_service = OCRService()
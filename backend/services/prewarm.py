@@ -0,0 +1,242 @@
+"""Background pre-warming of card lookups for frequently scanned cards."""
+import asyncio
+import heapq
+import math
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from models.schemas import CardInfo
+from utils.cache import TTLCache
+from utils.log import get_logger
+
+logger = get_logger("Prewarm")
+
+# Largest forward-decay exponent before scores are rebased (exp(60) ~ 1e26)
+_MAX_EXPONENT = 60.0
+
+
+class _Tracked:
+    """A card's popularity score and the details needed to look it up again."""
+    __slots__ = ("card_info", "score")
+
+    def __init__(self, card_info: CardInfo):
+        self.card_info = card_info
+        self.score = 0.0
+
+
+class PrewarmScheduler:
+    """
+    Refreshes the most popular card lookups before their cache entries expire.
+
+    Popularity is an exponentially decaying scan count with a configurable
+    half-life, kept with forward decay: each scan adds
+    exp((now - epoch) / tau) instead of every score being decayed on every
+    tick, so recording a scan is O(1) and scores stay comparable. Scores are
+    rebased when the weight grows large.
+
+    Every `interval_s` the top-K cards are checked against the lookup cache;
+    those expiring within `lead_s` (or already expired or evicted) are
+    refreshed, soonest-expiring first, within an upstream request budget
+    (a token bucket of `budget_per_minute` requests). Cards left over when
+    the budget runs out are retried on the next tick.
+    """
+
+    def __init__(
+        self,
+        cache: TTLCache,
+        refresh: Callable[[Hashable, CardInfo], Awaitable[object]],
+        top_k: int = 200,
+        interval_s: float = 30.0,
+        lead_s: float = 300.0,
+        budget_per_minute: int = 30,
+        half_life_s: float = 3600.0,
+        max_tracked: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            cache: Lookup cache whose entries are kept warm
+            refresh: Coroutine function that re-fetches a key and stores it in `cache`
+            top_k: Most popular cards considered for refresh
+            interval_s: Time between scheduling ticks
+            lead_s: Refresh entries expiring within this many seconds
+            budget_per_minute: Upstream refreshes allowed per minute (also the burst size)
+            half_life_s: Time for a card's popularity to halve without scans
+            max_tracked: Cards tracked before the least popular are forgotten
+            clock: Monotonic time source in seconds (same clock as `cache`)
+        """
+        self.cache = cache
+        self.refresh = refresh
+        self.top_k = top_k
+        self.interval_s = interval_s
+        self.lead_s = lead_s
+        self.budget_per_minute = budget_per_minute
+        self.tau_s = half_life_s / math.log(2)
+        self.max_tracked = max_tracked
+        self.clock = clock
+
+        self._tracked: Dict[Hashable, _Tracked] = {}
+        self._epoch = clock()
+        self._tokens = float(budget_per_minute)
+        self._refilled_at = self._epoch
+        self._task: Optional[asyncio.Task] = None
+
+        self.scans = 0
+        self.warm_scans = 0
+        self.ticks = 0
+        self.refreshes = 0
+        self.failed_refreshes = 0
+        self.budget_deferred = 0
+        self.late_refreshes = 0
+        self.cold_refreshes = 0
+        self.refresh_lag_s_total = 0.0
+        self.max_refresh_lag_s = 0.0
+
+    def start(self) -> None:
+        """Start the scheduling loop (call from a running event loop)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self) -> None:
+        """Stop the scheduling loop, abandoning refreshes in flight."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def record_scan(self, key: Hashable, card_info: CardInfo, warm: bool) -> None:
+        """
+        Count a scan towards a card's popularity.
+
+        Args:
+            key: Lookup cache key of the card
+            card_info: Card details used to refresh the key later
+            warm: Whether the scan was served from a fresh cache entry
+        """
+        self.scans += 1
+        if warm:
+            self.warm_scans += 1
+
+        now = self.clock()
+        exponent = (now - self._epoch) / self.tau_s
+        if exponent > _MAX_EXPONENT:
+            self._rebase(now)
+            exponent = 0.0
+
+        tracked = self._tracked.get(key)
+        if tracked is None:
+            tracked = self._tracked[key] = _Tracked(card_info)
+            if len(self._tracked) > self.max_tracked:
+                self._prune()
+        tracked.card_info = card_info
+        tracked.score += math.exp(exponent)
+
+    def popularity(self, key: Hashable) -> float:
+        """Current decayed scan count of a key (0 if untracked)."""
+        tracked = self._tracked.get(key)
+        if tracked is None:
+            return 0.0
+        return tracked.score * math.exp(-(self.clock() - self._epoch) / self.tau_s)
+
+    def _rebase(self, now: float) -> None:
+        """Move the decay epoch to `now`, scaling scores down to match."""
+        factor = math.exp(-(now - self._epoch) / self.tau_s)
+        for tracked in self._tracked.values():
+            tracked.score *= factor
+        self._epoch = now
+
+    def _prune(self) -> None:
+        """Forget the least popular quarter of tracked cards."""
+        keep = heapq.nlargest(
+            self.max_tracked * 3 // 4, self._tracked.items(), key=lambda item: item[1].score
+        )
+        self._tracked = dict(keep)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._tokens = min(float(self.budget_per_minute), self._tokens + elapsed * self.budget_per_minute / 60.0)
+
+    def due(self) -> List[Tuple[float, Hashable, CardInfo]]:
+        """
+        Return the top-K cards whose entries need refreshing, most urgent first.
+
+        Returns:
+            (seconds until stale, key, card info); evicted entries sort first
+        """
+        hot = heapq.nlargest(self.top_k, self._tracked.items(), key=lambda item: item[1].score)
+        due = []
+        for key, tracked in hot:
+            remaining = self.cache.expires_in(key)
+            if remaining is None:
+                remaining = -math.inf
+            if remaining < self.lead_s:
+                due.append((remaining, key, tracked.card_info))
+        due.sort(key=lambda item: item[0])
+        return due
+
+    async def tick(self) -> int:
+        """
+        Refresh due cards within the remaining request budget.
+
+        Returns:
+            Number of refreshes started
+        """
+        self.ticks += 1
+        self._refill(self.clock())
+        due = self.due()
+        allowed = min(len(due), int(self._tokens))
+        self._tokens -= allowed
+        self.budget_deferred += len(due) - allowed
+        if allowed:
+            await asyncio.gather(*(self._refresh_one(*item) for item in due[:allowed]))
+        return allowed
+
+    async def _refresh_one(self, remaining: float, key: Hashable, card_info: CardInfo) -> None:
+        # Lag: how long the entry had already been stale when refreshed
+        if remaining == -math.inf:
+            self.cold_refreshes += 1
+        else:
+            lag = max(0.0, -remaining)
+            if lag > 0:
+                self.late_refreshes += 1
+            self.refresh_lag_s_total += lag
+            self.max_refresh_lag_s = max(self.max_refresh_lag_s, lag)
+        self.refreshes += 1
+        try:
+            await self.refresh(key, card_info)
+        except Exception as e:
+            self.failed_refreshes += 1
+            logger.warning("refresh_failed", key=key, error=str(e))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_s)
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error("tick_failed", error=str(e))
+
+    def stats(self) -> dict:
+        """Return popularity, refresh and warm-share counters."""
+        timed = self.refreshes - self.cold_refreshes
+        return {
+            "tracked_cards": len(self._tracked),
+            "top_k": self.top_k,
+            "scans": self.scans,
+            "warm_scans": self.warm_scans,
+            "warm_ratio": round(self.warm_scans / self.scans, 4) if self.scans else 0.0,
+            "ticks": self.ticks,
+            "refreshes": self.refreshes,
+            "failed_refreshes": self.failed_refreshes,
+            "budget_per_minute": self.budget_per_minute,
+            "budget_deferred": self.budget_deferred,
+            "late_refreshes": self.late_refreshes,
+            "cold_refreshes": self.cold_refreshes,
+            "avg_refresh_lag_s": round(self.refresh_lag_s_total / timed, 3) if timed else 0.0,
+            "max_refresh_lag_s": round(self.max_refresh_lag_s, 3),
+        }
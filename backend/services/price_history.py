@@ -0,0 +1,449 @@
+"""Persistent price history with incrementally maintained rolling statistics."""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import settings
+from models.schemas import PriceSource, RollingPriceStatistics
+from utils.log import get_logger
+
+logger = get_logger("PriceHistory")
+
+# Rolling windows served with every price lookup, in days
+WINDOWS = (7, 30, 90)
+
+DAY_S = 86400
+
+# Cards per window refresh query (below SQLite's bound-parameter limit)
+REFRESH_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    card_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    price_usd REAL NOT NULL,
+    observed_at INTEGER NOT NULL,
+    samples INTEGER NOT NULL DEFAULT 1,
+    compacted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS observations_card_time ON observations (card_id, observed_at);
+CREATE INDEX IF NOT EXISTS observations_time ON observations (observed_at);
+CREATE TABLE IF NOT EXISTS daily_prices (
+    card_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    price_sum REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    PRIMARY KEY (card_id, source, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS window_stats (
+    card_id TEXT NOT NULL,
+    days INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    average REAL NOT NULL,
+    median REAL NOT NULL,
+    p10 REAL NOT NULL,
+    p25 REAL NOT NULL,
+    p75 REAL NOT NULL,
+    p90 REAL NOT NULL,
+    updated_at INTEGER NOT NULL,
+    PRIMARY KEY (card_id, days)
+) WITHOUT ROWID;
+"""
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Linear-interpolated percentile of sorted values."""
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def window_statistics(daily: List[Tuple[int, float]], now: int) -> Dict[int, RollingPriceStatistics]:
+    """
+    Compute every rolling window from one card's (day start, price) points.
+
+    Args:
+        daily: One point per source per day, covering at least the longest window
+        now: Current time (epoch seconds)
+
+    Returns:
+        Window length in days -> statistics, for windows with data
+    """
+    result = {}
+    for days in WINDOWS:
+        cutoff = now - days * DAY_S
+        prices = sorted(price for day, price in daily if day >= cutoff)
+        if not prices:
+            continue
+        result[days] = RollingPriceStatistics(
+            days=days,
+            count=len(prices),
+            average=round(sum(prices) / len(prices), 2),
+            median=round(_percentile(prices, 0.5), 2),
+            p10=round(_percentile(prices, 0.1), 2),
+            p25=round(_percentile(prices, 0.25), 2),
+            p75=round(_percentile(prices, 0.75), 2),
+            p90=round(_percentile(prices, 0.9), 2),
+        )
+    return result
+
+
+class PriceHistoryStore:
+    """
+    Append-only price history in SQLite (WAL mode) with rolling statistics.
+
+    Observed prices are queued by the request path and written in batches by
+    a single writer thread. Each batch is added to per-card, per-source daily
+    aggregates (`daily_prices`, a running sum and sample count per day), and
+    the 7/30/90 day windows of the cards it touched are recomputed from those
+    aggregates, at most one row per source and day, however often the card
+    is scanned. Windows are stored in `window_stats`; an in-memory copy of
+    that table serves requests, so reads never touch the database.
+
+    Statistics weigh each source once per day: a card scanned a hundred times
+    today contributes one point per source, not a hundred. Maintenance runs
+    on the writer thread: raw observations older than `compact_after_days`
+    are collapsed into one row per card, source and day, rows older than
+    `retention_days` are deleted, daily aggregates older than the longest
+    window are dropped, and windows not updated for a day are recomputed as
+    days age out of them.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval_s: float = 1.0,
+        batch_size: int = 500,
+        queue_size: int = 10000,
+        retention_days: int = 365,
+        compact_after_days: int = 2,
+        maintenance_interval_s: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            path: SQLite database file
+            flush_interval_s: Longest time an observation waits in the queue
+            batch_size: Most observations written per transaction
+            queue_size: Queued observations before new ones are dropped
+            retention_days: Age after which history is deleted
+            compact_after_days: Age after which raw observations are collapsed per day
+            maintenance_interval_s: Time between compaction/retention runs
+            clock: Wall-clock time source (epoch seconds)
+        """
+        self.path = path
+        self.flush_interval_s = flush_interval_s
+        self.batch_size = batch_size
+        self.retention_days = max(retention_days, max(WINDOWS))
+        self.compact_after_days = compact_after_days
+        self.maintenance_interval_s = maintenance_interval_s
+        self.clock = clock
+
+        self._queue: "queue.Queue[Optional[Tuple[str, str, float, int]]]" = queue.Queue(maxsize=queue_size)
+        self._windows: Dict[str, Dict[int, RollingPriceStatistics]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.write_ms_total = 0.0
+        self.compacted_rows = 0
+        self.expired_rows = 0
+        self.last_maintenance_at: Optional[float] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def start(self) -> None:
+        """Open the database, load current windows and start the writer thread."""
+        if self._thread is not None:
+            return
+
+        connection = self._connect()
+        try:
+            connection.executescript(SCHEMA)
+            if connection.execute("SELECT 1 FROM daily_prices LIMIT 1").fetchone() is None:
+                self._rebuild_daily(connection)
+            rows = connection.execute(
+                "SELECT card_id, days, count, average, median, p10, p25, p75, p90 FROM window_stats"
+            ).fetchall()
+        finally:
+            connection.close()
+
+        for card_id, days, count, average, median, p10, p25, p75, p90 in rows:
+            self._windows.setdefault(card_id, {})[days] = RollingPriceStatistics(
+                days=days, count=count, average=average, median=median, p10=p10, p25=p25, p75=p75, p90=p90
+            )
+
+        self._thread = threading.Thread(target=self._run, name="price-history", daemon=True)
+        self._thread.start()
+        logger.info("opened", path=self.path, cards=len(self._windows))
+
+    def shutdown(self) -> None:
+        """Write everything still queued and stop the writer thread."""
+        if self._thread is None:
+            return
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=10)
+        self._thread = None
+
+    def record(self, card_id: str, sources: Iterable[PriceSource]) -> None:
+        """
+        Queue observed prices for writing; never blocks.
+
+        Args:
+            card_id: Pokemon TCG API card ID
+            sources: Prices observed for the card
+        """
+        if self._thread is None:
+            return
+        observed_at = int(self.clock())
+        for source in sources:
+            try:
+                self._queue.put_nowait((card_id, source.name, source.price_usd, observed_at))
+                self.recorded += 1
+            except queue.Full:
+                self.dropped += 1
+
+    def windows(self, card_id: str) -> Dict[str, RollingPriceStatistics]:
+        """
+        Return the precomputed rolling windows for a card.
+
+        Args:
+            card_id: Pokemon TCG API card ID
+
+        Returns:
+            Dict keyed "7d", "30d", "90d" (only windows with data)
+        """
+        return {f"{days}d": stats for days, stats in self._windows.get(card_id, {}).items()}
+
+    def _run(self) -> None:
+        connection = self._connect()
+        next_maintenance = time.monotonic()
+        stopping = False
+        try:
+            while not stopping:
+                batch, stopping = self._next_batch()
+                try:
+                    if batch:
+                        self._write(connection, batch)
+                    if time.monotonic() >= next_maintenance or stopping:
+                        next_maintenance = time.monotonic() + self.maintenance_interval_s
+                        self._maintain(connection)
+                except Exception as e:
+                    # History is best-effort; drop the batch and keep writing
+                    # (a bad row or statistics error must not end the thread)
+                    self.failed_batches += 1
+                    logger.error("write_failed", dropped=len(batch), error=str(e), exc_info=True)
+        finally:
+            connection.close()
+
+    def _next_batch(self) -> Tuple[List[Tuple[str, str, float, int]], bool]:
+        """Collect up to batch_size observations, waiting at most flush_interval_s."""
+        batch: List[Tuple[str, str, float, int]] = []
+        deadline = time.monotonic() + self.flush_interval_s
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=max(timeout, 0)) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write(self, connection: sqlite3.Connection, batch: List[Tuple[str, str, float, int]]) -> None:
+        started = time.perf_counter()
+        connection.execute("BEGIN")
+        try:
+            connection.executemany(
+                "INSERT INTO observations (card_id, source, price_usd, observed_at) VALUES (?, ?, ?, ?)",
+                batch
+            )
+            self._add_daily(connection, batch)
+            refreshed = self._refresh_windows(connection, {card_id for card_id, _, _, _ in batch})
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        self._publish(refreshed)
+
+        self.written += len(batch)
+        self.batches += 1
+        self.write_ms_total += (time.perf_counter() - started) * 1000
+
+    def _add_daily(self, connection: sqlite3.Connection, batch: List[Tuple[str, str, float, int]]) -> None:
+        """Add a batch of observations to the daily aggregates (inside a transaction)."""
+        totals: Dict[Tuple[str, str, int], List[float]] = {}
+        for card_id, source, price, observed_at in batch:
+            total = totals.setdefault((card_id, source, observed_at // DAY_S * DAY_S), [0.0, 0])
+            total[0] += price
+            total[1] += 1
+        connection.executemany(
+            """
+            INSERT INTO daily_prices (card_id, source, day, price_sum, samples) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (card_id, source, day) DO UPDATE SET
+                price_sum = price_sum + excluded.price_sum,
+                samples = samples + excluded.samples
+            """,
+            [(card_id, source, day, price_sum, samples) for (card_id, source, day), (price_sum, samples) in totals.items()]
+        )
+
+    def _rebuild_daily(self, connection: sqlite3.Connection) -> None:
+        """Fill the daily aggregates from raw observations (databases created before they existed)."""
+        since = int(self.clock()) - max(WINDOWS) * DAY_S
+        connection.execute(
+            f"""
+            INSERT OR REPLACE INTO daily_prices (card_id, source, day, price_sum, samples)
+            SELECT card_id, source, (observed_at / {DAY_S}) * {DAY_S}, SUM(price_usd * samples), SUM(samples)
+            FROM observations
+            WHERE observed_at >= ?
+            GROUP BY card_id, source, observed_at / {DAY_S}
+            """,
+            (since // DAY_S * DAY_S,)
+        )
+
+    def _refresh_windows(
+        self,
+        connection: sqlite3.Connection,
+        card_ids: Iterable[str]
+    ) -> Dict[str, Dict[int, RollingPriceStatistics]]:
+        """Recompute and store the windows of the given cards (inside a transaction)."""
+        now = int(self.clock())
+        since = now - max(WINDOWS) * DAY_S
+        card_ids = list(card_ids)
+        refreshed: Dict[str, Dict[int, RollingPriceStatistics]] = {}
+
+        for offset in range(0, len(card_ids), REFRESH_CHUNK):
+            chunk = card_ids[offset:offset + REFRESH_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            daily: Dict[str, List[Tuple[int, float]]] = {card_id: [] for card_id in chunk}
+            for card_id, day, price in connection.execute(
+                f"""
+                SELECT card_id, day, price_sum / samples
+                FROM daily_prices
+                WHERE card_id IN ({placeholders}) AND day >= ?
+                """,
+                (*chunk, since)
+            ):
+                daily[card_id].append((day, price))
+
+            connection.execute(f"DELETE FROM window_stats WHERE card_id IN ({placeholders})", chunk)
+            rows = []
+            for card_id, points in daily.items():
+                windows = window_statistics(points, now)
+                refreshed[card_id] = windows
+                rows.extend(
+                    (card_id, days, w.count, w.average, w.median, w.p10, w.p25, w.p75, w.p90, now)
+                    for days, w in windows.items()
+                )
+            connection.executemany(
+                """
+                INSERT INTO window_stats
+                    (card_id, days, count, average, median, p10, p25, p75, p90, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+        return refreshed
+
+    def _publish(self, refreshed: Dict[str, Dict[int, RollingPriceStatistics]]) -> None:
+        """Make committed windows visible to readers, one whole card at a time."""
+        for card_id, windows in refreshed.items():
+            if windows:
+                self._windows[card_id] = windows
+            else:
+                self._windows.pop(card_id, None)
+
+    def _maintain(self, connection: sqlite3.Connection) -> None:
+        """Compact old raw observations, apply retention and refresh aged windows."""
+        now = int(self.clock())
+        compact_before = (now - self.compact_after_days * DAY_S) // DAY_S * DAY_S
+        expire_before = now - self.retention_days * DAY_S
+
+        connection.execute("BEGIN")
+        try:
+            expired = connection.execute(
+                "DELETE FROM observations WHERE observed_at < ?", (expire_before,)
+            ).rowcount
+
+            # One row per card, source and day, weighted by the samples it replaces
+            connection.execute(
+                """
+                INSERT INTO observations (card_id, source, price_usd, observed_at, samples, compacted)
+                SELECT card_id, source, SUM(price_usd * samples) / SUM(samples),
+                       (observed_at / ?) * ?, SUM(samples), 1
+                FROM observations
+                WHERE compacted = 0 AND observed_at < ?
+                GROUP BY card_id, source, observed_at / ?
+                """,
+                (DAY_S, DAY_S, compact_before, DAY_S)
+            )
+            compacted = connection.execute(
+                "DELETE FROM observations WHERE compacted = 0 AND observed_at < ?", (compact_before,)
+            ).rowcount
+            connection.execute(
+                "DELETE FROM daily_prices WHERE day < ?", ((now - max(WINDOWS) * DAY_S) // DAY_S * DAY_S,)
+            )
+
+            # Days age out of the windows even without new observations
+            aged = [
+                row[0] for row in connection.execute(
+                    "SELECT DISTINCT card_id FROM window_stats WHERE updated_at < ?", (now - DAY_S,)
+                )
+            ]
+            refreshed = self._refresh_windows(connection, aged)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        self._publish(refreshed)
+
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.expired_rows += expired
+        self.compacted_rows += compacted
+        self.last_maintenance_at = self.clock()
+
+    def stats(self) -> dict:
+        """Return writer thread state, queue, write and maintenance counters."""
+        return {
+            "path": self.path,
+            "writer_alive": self._thread is not None and self._thread.is_alive(),
+            "cards": len(self._windows),
+            "queued": self._queue.qsize(),
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "written": self.written,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "avg_batch_write_ms": round(self.write_ms_total / self.batches, 3) if self.batches else 0.0,
+            "compacted_rows": self.compacted_rows,
+            "expired_rows": self.expired_rows,
+            "last_maintenance_at": self.last_maintenance_at,
+        }
+
+
+# Global price history store (started in the app lifespan)
+price_history = PriceHistoryStore(
+    path=settings.price_history_path,
+    flush_interval_s=settings.price_history_flush_ms / 1000,
+    batch_size=settings.price_history_batch_size,
+    queue_size=settings.price_history_queue_size,
+    retention_days=settings.price_history_retention_days,
+    compact_after_days=settings.price_history_compact_after_days,
+)
@@ -0,0 +1,289 @@
+"""Price providers queried concurrently for each priced card."""
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from clients.http_pool import PooledHTTPClient
+from models.schemas import CardInfo, PriceSource
+from utils.circuit_breaker import LatencyTracker
+from utils.log import get_logger
+
+logger = get_logger("PriceProviders")
+
+# Display names of the Pokemon TCG API's TCGPlayer price variants
+TCGPLAYER_VARIANTS = {
+    "holofoil": "Holofoil",
+    "normal": "Normal",
+    "1stEditionHolofoil": "1st Ed Holofoil",
+    "1stEditionNormal": "1st Ed Normal",
+    "reverseHolofoil": "Reverse Holofoil",
+    "unlimitedHolofoil": "Unlimited Holofoil",
+}
+
+
+class PriceProvider(ABC):
+    """
+    One source of card prices.
+
+    Providers receive the card as read by OCR and the Pokemon TCG API card
+    document it resolved to, and return zero or more PriceSource entries.
+    Each provider has its own timeout; `iter_prices` enforces it and
+    keeps the per-provider counters below.
+    """
+
+    def __init__(self, name: str, timeout_s: float):
+        """
+        Args:
+            name: Provider name reported in stats and missing-source lists
+            timeout_s: Longest time a single fetch may take
+        """
+        self.name = name
+        self.timeout_s = timeout_s
+        self.calls = 0
+        self.empty = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.deadline_misses = 0
+        self.latency = LatencyTracker()
+
+    @abstractmethod
+    async def fetch(self, card_info: CardInfo, card_data: Dict) -> List[PriceSource]:
+        """
+        Fetch this provider's prices for a card.
+
+        Args:
+            card_info: Card information from OCR
+            card_data: Pokemon TCG API card document
+
+        Returns:
+            Price sources (empty if the provider has no price for the card)
+        """
+
+    async def aclose(self) -> None:
+        """Release any resources held by the provider."""
+
+    def stats(self) -> dict:
+        """Return call, timeout and error counters and latency."""
+        return {
+            "timeout_ms": round(self.timeout_s * 1000),
+            "calls": self.calls,
+            "empty": self.empty,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "deadline_misses": self.deadline_misses,
+            **self.latency.stats(),
+        }
+
+
+class TCGAPIProvider(PriceProvider):
+    """TCGPlayer and CardMarket prices embedded in the Pokemon TCG API card document."""
+
+    def __init__(self, tcg_client, timeout_s: float):
+        """
+        Args:
+            tcg_client: PokemonTCGClient used to read prices out of the document
+            timeout_s: Longest time a single fetch may take
+        """
+        super().__init__("pokemon_tcg_api", timeout_s)
+        self.tcg_client = tcg_client
+
+    async def fetch(self, card_info: CardInfo, card_data: Dict) -> List[PriceSource]:
+        market_prices = self.tcg_client.extract_market_prices(card_data)
+        tcgplayer_url = (card_data.get("tcgplayer") or {}).get("url")
+        now = datetime.utcnow()
+        sources = []
+
+        # Known variants first, in display order, then any the API adds later
+        variants = [v for v in TCGPLAYER_VARIANTS if v in market_prices]
+        variants += [v for v in market_prices if v not in TCGPLAYER_VARIANTS and v != "cardmarket"]
+        for variant in variants:
+            if market_prices[variant] > 0:
+                sources.append(PriceSource(
+                    name=f"TCGPlayer ({TCGPLAYER_VARIANTS.get(variant, variant)})",
+                    price_usd=market_prices[variant],
+                    condition="Near Mint",
+                    url=tcgplayer_url,
+                    last_updated=now
+                ))
+
+        if market_prices.get("cardmarket", 0) > 0:
+            sources.append(PriceSource(
+                name="CardMarket",
+                price_usd=market_prices["cardmarket"],
+                condition="Near Mint",
+                url=(card_data.get("cardmarket") or {}).get("url"),
+                last_updated=now
+            ))
+
+        return sources
+
+
+class MarketplaceProvider(PriceProvider):
+    """
+    Prices from an additional marketplace's HTTP price API.
+
+    Calls `GET {base_url}/prices` with the card's TCG API ID, name, set and
+    number, and expects `{"prices": [{"price_usd", "condition", "url",
+    "variant"}]}` back. Listings without a positive price are ignored.
+    """
+
+    def __init__(self, name: str, base_url: str, http: PooledHTTPClient, timeout_s: float):
+        """
+        Args:
+            name: Marketplace name, used as the price source name
+            base_url: Root URL of the marketplace's price API
+            http: Shared connection pool for marketplace requests
+            timeout_s: Longest time a single fetch may take
+        """
+        super().__init__(name, timeout_s)
+        self.base_url = base_url.rstrip("/")
+        self.http = http
+
+    async def fetch(self, card_info: CardInfo, card_data: Dict) -> List[PriceSource]:
+        params = {"card_id": card_data.get("id", ""), "name": card_info.name}
+        if card_info.set:
+            params["set"] = card_info.set
+        if card_info.number:
+            params["number"] = card_info.number
+
+        client = await self.http.get_client()
+        response = await client.get(f"{self.base_url}/prices", params=params, timeout=self.timeout_s)
+        if response.status_code == 404:
+            return []
+        response.raise_for_status()
+
+        now = datetime.utcnow()
+        sources = []
+        for listing in response.json().get("prices") or []:
+            price = listing.get("price_usd") or 0.0
+            if price <= 0:
+                continue
+            variant = listing.get("variant")
+            sources.append(PriceSource(
+                name=f"{self.name} ({variant})" if variant else self.name,
+                price_usd=price,
+                condition=listing.get("condition") or "Near Mint",
+                url=listing.get("url"),
+                last_updated=now
+            ))
+        return sources
+
+
+def parse_marketplaces(value: str) -> List[Tuple[str, str]]:
+    """
+    Parse the `price_marketplaces` setting.
+
+    Args:
+        value: Comma-separated `name=base_url` pairs
+
+    Returns:
+        List of (name, base_url); malformed entries are skipped
+    """
+    marketplaces = []
+    for entry in value.split(","):
+        name, _, base_url = entry.partition("=")
+        if name.strip() and base_url.strip():
+            marketplaces.append((name.strip(), base_url.strip()))
+    return marketplaces
+
+
+async def _fetch_one(provider: PriceProvider, card_info: CardInfo, card_data: Dict) -> List[PriceSource]:
+    """Run one provider under its own timeout, counting the outcome."""
+    provider.calls += 1
+    started = time.perf_counter()
+    try:
+        sources = await asyncio.wait_for(provider.fetch(card_info, card_data), timeout=provider.timeout_s)
+    except asyncio.TimeoutError:
+        provider.timeouts += 1
+        raise
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        provider.errors += 1
+        raise
+    provider.latency.record(time.perf_counter() - started)
+    if not sources:
+        provider.empty += 1
+    return sources
+
+
+async def iter_prices(
+    providers: Sequence[PriceProvider],
+    card_info: CardInfo,
+    card_data: Dict,
+    timeout_s: Optional[float] = None
+) -> AsyncIterator[Tuple[PriceProvider, Optional[List[PriceSource]]]]:
+    """
+    Query all providers concurrently and yield each one's prices as they arrive.
+
+    Each provider is bounded by its own timeout. When `timeout_s` (what is
+    left of the scan deadline) runs out first, providers still running are
+    cancelled. Closing the iterator early cancels them too.
+
+    Args:
+        providers: Price providers to query
+        card_info: Card information from OCR
+        card_data: Pokemon TCG API card document
+        timeout_s: Overall time allowed (None waits for every provider's own timeout)
+
+    Yields:
+        (provider, sources) in completion order; sources is None for a
+        provider that timed out, failed or missed the deadline
+    """
+    tasks = {asyncio.create_task(_fetch_one(provider, card_info, card_data)): provider for provider in providers}
+    loop = asyncio.get_running_loop()
+    expires_at = None if timeout_s is None else loop.time() + timeout_s
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = None if expires_at is None else max(expires_at - loop.time(), 0.0)
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in sorted(done, key=lambda t: providers.index(tasks[t])):
+                provider = tasks[task]
+                error = task.exception()
+                if error is None:
+                    yield provider, task.result()
+                    continue
+                if not isinstance(error, asyncio.TimeoutError):
+                    logger.warning("provider_failed", provider=provider.name, error_type=type(error).__name__, error=str(error))
+                yield provider, None
+
+        for task in sorted(pending, key=lambda t: providers.index(tasks[t])):
+            tasks[task].deadline_misses += 1
+            task.cancel()
+            yield tasks[task], None
+    finally:
+        unfinished = [task for task in tasks if not task.done()]
+        for task in unfinished:
+            task.cancel()
+        if unfinished:
+            await asyncio.wait(unfinished)
+
+
+def ordered_sources(
+    providers: Sequence[PriceProvider],
+    results: Dict[str, Optional[List[PriceSource]]]
+) -> Tuple[List[PriceSource], List[str]]:
+    """
+    Flatten per-provider results into provider order.
+
+    Args:
+        providers: Providers in configured order
+        results: Provider name -> sources (None for a provider that gave none)
+
+    Returns:
+        (sources, names of providers without a result)
+    """
+    sources: List[PriceSource] = []
+    missing: List[str] = []
+    for provider in providers:
+        provided = results.get(provider.name)
+        if provided is None:
+            missing.append(provider.name)
+        else:
+            sources.extend(provided)
+    return sources, missing
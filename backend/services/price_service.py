@@ -1,11 +1,33 @@
 """Pricing service for aggregating card prices from multiple sources."""
-from typing import List
+import asyncio
+import functools
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 import statistics
 
+from clients.http_pool import PooledHTTPClient
 from clients.pokemon_tcg import PokemonTCGClient
+from clients.rate_limiter import BACKGROUND, INTERACTIVE
+from config import settings
 from models.schemas import CardInfo, PricingData, PriceSource, PricingStatistics
+from services.prewarm import PrewarmScheduler
+from services.price_providers import (
+    MarketplaceProvider,
+    PriceProvider,
+    TCGAPIProvider,
+    iter_prices,
+    ordered_sources,
+    parse_marketplaces,
+)
+from services.price_history import PriceHistoryStore, price_history
+from utils.deadline import Deadline, stage_timeout
+from utils.cache import TTLCache
 from utils.error_handlers import CardNotFoundException, PricingUnavailableException
+from utils.log import get_logger
+from utils.metrics import record_stage, stage
+
+logger = get_logger("PriceService")
 
 
 class PriceService:
@@ -15,112 +37,265 @@ class PriceService:
         """Initialize price service with Pokemon TCG API client."""
         self.tcg_client = PokemonTCGClient()
 
-    async def get_pricing(self, card_info: CardInfo) -> PricingData:
+        # Card lookups keyed by normalized (name, set, number). `None` values
+        # are negative-cache entries for cards the API does not know.
+        self.card_cache = TTLCache(
+            max_entries=settings.price_cache_max_entries,
+            stale_ttl_s=settings.price_cache_stale_ttl_s,
+        )
+        self._refreshing: Dict[Tuple[str, str, str], asyncio.Task] = {}
+        self.background_refreshes = 0
+        self.stub_fallbacks = 0
+
+        # Price providers, queried concurrently for every priced card: the
+        # TCG API document's own prices plus any configured marketplaces
+        pricing_timeout_s = settings.pricing_timeout_ms / 1000
+        self.providers: List[PriceProvider] = [TCGAPIProvider(self.tcg_client, timeout_s=pricing_timeout_s)]
+        self.marketplace_http: Optional[PooledHTTPClient] = None
+        marketplaces = parse_marketplaces(settings.price_marketplaces)
+        if marketplaces:
+            self.marketplace_http = PooledHTTPClient(
+                timeout_s=settings.price_marketplace_timeout_ms / 1000,
+                max_connections=settings.tcg_max_connections,
+                max_keepalive_connections=settings.tcg_max_keepalive_connections,
+                keepalive_expiry_s=settings.tcg_keepalive_expiry_s,
+            )
+            for name, base_url in marketplaces:
+                self.providers.append(MarketplaceProvider(
+                    name,
+                    base_url,
+                    self.marketplace_http,
+                    timeout_s=settings.price_marketplace_timeout_ms / 1000,
+                ))
+
+        # Every observed price is recorded; rolling windows come back with it
+        self.history: Optional[PriceHistoryStore] = price_history if settings.price_history_enabled else None
+
+        # Popular cards are refreshed before their cache entries expire
+        self.prewarm: Optional[PrewarmScheduler] = None
+        if settings.prewarm_enabled:
+            self.prewarm = PrewarmScheduler(
+                cache=self.card_cache,
+                refresh=functools.partial(self._fetch_card, priority=BACKGROUND),
+                top_k=settings.prewarm_top_k,
+                interval_s=settings.prewarm_interval_s,
+                lead_s=settings.prewarm_lead_s,
+                budget_per_minute=settings.prewarm_budget_per_minute,
+                half_life_s=settings.prewarm_half_life_s,
+                max_tracked=settings.prewarm_max_tracked,
+            )
+
+    @staticmethod
+    def cache_key(card_info: CardInfo) -> Tuple[str, str, str]:
+        """
+        Build the normalized (name, set, number) cache key for a card.
+
+        Args:
+            card_info: Card information from OCR
+
+        Returns:
+            Tuple of lowercased, whitespace-collapsed name, set and number
+        """
+        name = " ".join(card_info.name.lower().split())
+        set_name = " ".join((card_info.set or "").lower().split())
+        number = "".join((card_info.number or "").split()).lower()
+        return name, set_name, number
+
+    async def get_pricing(self, card_info: CardInfo, deadline: Optional[Deadline] = None) -> PricingData:
         """
         Get pricing data for a Pokemon card.
 
         Args:
             card_info: Card information from OCR
+            deadline: Scan deadline; upstream requests get the time remaining
 
         Returns:
             PricingData with aggregated prices
 
         Raises:
             CardNotFoundException: If card not found in database
-            PricingUnavailableException: If pricing API is down
+            PricingUnavailableException: If pricing API is down or the deadline passes
+            PricingRateLimitedException: If the lookup is shed by the TCG API rate limiter
         """
-        try:
-            # Search for card in Pokemon TCG API
-            card_data = await self.tcg_client.search_card(
-                name=card_info.name,
-                set_name=card_info.set,
-                number=card_info.number
-            )
+        pricing_data = None
+        async for item in self.stream_pricing(card_info, deadline):
+            pricing_data = item
+        return pricing_data
 
-            if not card_data:
-                raise CardNotFoundException(
-                    f"Could not find pricing for '{card_info.name}'. "
-                    "This card may not be in our database yet.",
-                    details={
-                        "card_name": card_info.name,
-                        "set": card_info.set,
-                        "number": card_info.number
-                    }
-                )
+    async def stream_pricing(
+        self,
+        card_info: CardInfo,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Union[PriceSource, PricingData]]:
+        """
+        Price a card, yielding each source as its provider answers.
 
-            # Extract prices from card data
-            market_prices = self.tcg_client.extract_market_prices(card_data)
+        Args:
+            card_info: Card information from OCR
+            deadline: Scan deadline; upstream requests get the time remaining
 
-            if not market_prices:
+        Yields:
+            Each PriceSource as it arrives, then the PricingData with all
+            sources (in provider order) and statistics
+
+        Raises:
+            CardNotFoundException: If card not found in database
+            PricingUnavailableException: If pricing API is down or the deadline passes
+            PricingRateLimitedException: If the lookup is shed by the TCG API rate limiter
+        """
+        try:
+            # Look up card (cached, falling back to the Pokemon TCG API)
+            with stage("card_lookup"):
+                card_data = await self._lookup_card(card_info, deadline)
+        except (CardNotFoundException, PricingUnavailableException):
+            raise
+        except Exception as e:
+            if not settings.price_stub_fallback:
                 raise PricingUnavailableException(
-                    f"Found card '{card_info.name}' but pricing data is unavailable.",
-                    details={
-                        "card_id": card_data.get("id"),
-                        "card_name": card_info.name
-                    }
+                    "Pricing service is temporarily unavailable. Please try again shortly.",
+                    details={"upstream": "pokemon_tcg_api", "error": str(e)}
                 )
+            # If API fails, return stub data for testing
+            self.stub_fallbacks += 1
+            logger.warning("lookup_failed_using_stub", error=str(e))
+            stub = self._get_stub_pricing(card_info)
+            for source in stub.sources:
+                yield source
+            yield stub
+            return
 
-            # Build price sources
-            sources = self._build_price_sources(market_prices, card_data)
+        if not card_data:
+            raise CardNotFoundException(
+                f"Could not find pricing for '{card_info.name}'. "
+                "This card may not be in our database yet.",
+                details={
+                    "card_name": card_info.name,
+                    "set": card_info.set,
+                    "number": card_info.number
+                }
+            )
 
-            # Calculate statistics
-            statistics_data = self._calculate_statistics(sources)
+        # Query every provider; whatever arrives before the deadline is used
+        results: Dict[str, Optional[List[PriceSource]]] = {}
+        providers_started = time.perf_counter()
+        async for provider, provided in iter_prices(
+            self.providers,
+            card_info,
+            card_data,
+            timeout_s=stage_timeout(deadline, settings.pricing_timeout_ms / 1000)
+        ):
+            results[provider.name] = provided
+            for source in provided or ():
+                yield source
+        record_stage("price_providers", time.perf_counter() - providers_started)
+        sources, missing = ordered_sources(self.providers, results)
 
-            return PricingData(
-                sources=sources,
-                statistics=statistics_data
+        if not sources:
+            raise PricingUnavailableException(
+                f"Found card '{card_info.name}' but pricing data is unavailable.",
+                details={
+                    "card_id": card_data.get("id"),
+                    "card_name": card_info.name,
+                    "missing_sources": missing
+                }
             )
 
-        except (CardNotFoundException, PricingUnavailableException):
-            raise
-        except Exception as e:
-            # If API fails, return stub data for testing
-            print(f"[PriceService] API failed ({str(e)}), using STUB mode")
-            return self._get_stub_pricing(card_info)
+        # Calculate statistics
+        statistics_data = self._calculate_statistics(sources)
 
-    def _build_price_sources(self, market_prices: dict, card_data: dict) -> List[PriceSource]:
-        """Build list of PriceSource objects from market prices."""
-        sources = []
+        card_id = card_data.get("id")
+        if self.history is not None and card_id:
+            self.history.record(card_id, sources)
+            statistics_data.windows = self.history.windows(card_id)
 
-        # TCGPlayer prices
-        if "holofoil" in market_prices and market_prices["holofoil"] > 0:
-            sources.append(PriceSource(
-                name="TCGPlayer (Holofoil)",
-                price_usd=market_prices["holofoil"],
-                condition="Near Mint",
-                url=card_data.get("tcgplayer", {}).get("url"),
-                last_updated=datetime.utcnow()
-            ))
+        yield PricingData(
+            sources=sources,
+            statistics=statistics_data,
+            missing_sources=missing
+        )
 
-        if "normal" in market_prices and market_prices["normal"] > 0:
-            sources.append(PriceSource(
-                name="TCGPlayer (Normal)",
-                price_usd=market_prices["normal"],
-                condition="Near Mint",
-                url=card_data.get("tcgplayer", {}).get("url"),
-                last_updated=datetime.utcnow()
-            ))
+    async def _lookup_card(self, card_info: CardInfo, deadline: Optional[Deadline] = None) -> Optional[Dict]:
+        """
+        Resolve card data through the lookup cache.
 
-        if "1stEditionHolofoil" in market_prices and market_prices["1stEditionHolofoil"] > 0:
-            sources.append(PriceSource(
-                name="TCGPlayer (1st Ed Holofoil)",
-                price_usd=market_prices["1stEditionHolofoil"],
-                condition="Near Mint",
-                url=card_data.get("tcgplayer", {}).get("url"),
-                last_updated=datetime.utcnow()
-            ))
+        Fresh entries are returned directly. Stale entries are returned
+        immediately while a single background refresh runs for that key.
+        Misses go to the Pokemon TCG API and are cached, including
+        "not found" results with a shorter TTL.
+        """
+        key = self.cache_key(card_info)
+        cached = self.card_cache.get(key)
 
-        # CardMarket prices
-        if "cardmarket" in market_prices and market_prices["cardmarket"] > 0:
-            sources.append(PriceSource(
-                name="CardMarket",
-                price_usd=market_prices["cardmarket"],
-                condition="Near Mint",
-                url=card_data.get("cardmarket", {}).get("url"),
-                last_updated=datetime.utcnow()
-            ))
+        if cached.found:
+            if cached.stale:
+                self._schedule_refresh(key, card_info)
+            card_data = cached.value
+        else:
+            card_data = await self._fetch_card(key, card_info, deadline=deadline)
+
+        if self.prewarm is not None and card_data:
+            self.prewarm.record_scan(key, card_info, warm=cached.found and not cached.stale)
+        return card_data
+
+    async def _fetch_card(
+        self,
+        key: Tuple[str, str, str],
+        card_info: CardInfo,
+        priority: int = INTERACTIVE,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[Dict]:
+        """Fetch card data from the Pokemon TCG API and store it in the cache."""
+        card_data = await self.tcg_client.search_card(
+            name=card_info.name,
+            set_name=card_info.set,
+            number=card_info.number,
+            priority=priority,
+            deadline=deadline
+        )
+
+        ttl_s = settings.price_cache_ttl_s if card_data else settings.price_cache_negative_ttl_s
+        self.card_cache.set(key, card_data, ttl_s)
+        return card_data
+
+    def _schedule_refresh(self, key: Tuple[str, str, str], card_info: CardInfo) -> None:
+        """Start a background refresh for a stale key unless one is already running."""
+        if key in self._refreshing:
+            return
+
+        task = asyncio.create_task(self._refresh(key, card_info))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: Tuple[str, str, str], card_info: CardInfo) -> None:
+        """Refresh a stale cache entry, keeping the stale value if upstream fails."""
+        self.background_refreshes += 1
+        try:
+            await self._fetch_card(key, card_info, priority=BACKGROUND)
+        except Exception as e:
+            logger.warning("background_refresh_failed", key=key, error=str(e))
+
+    def cache_stats(self) -> dict:
+        """Return card lookup cache counters."""
+        return {
+            **self.card_cache.stats(),
+            "background_refreshes": self.background_refreshes,
+            "stub_fallbacks": self.stub_fallbacks,
+            "refreshes_in_flight": len(self._refreshing),
+        }
+
+    async def start(self) -> None:
+        """Open the marketplace connection pool (called from the app lifespan)."""
+        if self.marketplace_http is not None:
+            await self.marketplace_http.start()
+
+    async def aclose(self) -> None:
+        """Close the marketplace connection pool."""
+        if self.marketplace_http is not None:
+            await self.marketplace_http.aclose()
 
-        return sources
+    def provider_stats(self) -> dict:
+        """Return per-provider call, timeout and deadline-miss counters."""
+        return {provider.name: provider.stats() for provider in self.providers}
 
     def _calculate_statistics(self, sources: List[PriceSource]) -> PricingStatistics:
         """Calculate pricing statistics from sources."""
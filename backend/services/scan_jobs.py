@@ -0,0 +1,285 @@
+"""Asynchronous scan jobs: a bounded queue in front of a fixed worker pool."""
+import asyncio
+import itertools
+import math
+import time
+import uuid
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+from config import settings
+from models.schemas import PricingResult, ScanMetadata
+from utils.cache import TTLCache
+from utils.circuit_breaker import LatencyTracker
+from utils.deadline import Deadline
+from utils.error_handlers import JobNotFoundException, ScanQueueFullException
+from utils.metrics import record_stage, start_trace, stage_breakdown
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Scans one image; raises the same exceptions as POST /scan
+ScanFunction = Callable[[bytes], Awaitable[PricingResult]]
+
+
+class ScanJob:
+    """One submitted scan and, once finished, its outcome."""
+    __slots__ = (
+        "job_id", "sequence", "image_bytes", "size", "state",
+        "created_at", "started_at", "finished_at", "result", "error",
+    )
+
+    def __init__(self, job_id: str, sequence: int, image_bytes: bytes, created_at: float):
+        self.job_id = job_id
+        self.sequence = sequence
+        self.image_bytes: Optional[bytes] = image_bytes
+        self.size = len(image_bytes)
+        self.state = QUEUED
+        self.created_at = created_at
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[PricingResult] = None
+        self.error: Optional[Exception] = None
+
+    @property
+    def queue_wait_s(self) -> Optional[float]:
+        """Seconds between submission and a worker starting the scan."""
+        return None if self.started_at is None else self.started_at - self.created_at
+
+    @property
+    def processing_s(self) -> Optional[float]:
+        """Seconds the worker spent on the scan."""
+        return None if self.finished_at is None else self.finished_at - self.started_at
+
+
+class ScanJobQueue:
+    """
+    FIFO queue of scan jobs served by a fixed number of workers.
+
+    Submitting never waits: when `max_queue` jobs (or `max_queued_bytes` of
+    images) are already waiting, the job is rejected with
+    ScanQueueFullException, carrying the queue depth and a Retry-After
+    estimate, instead of piling up. Finished jobs are kept for
+    `result_ttl_s` so clients can collect them; queue wait and processing
+    time are tracked separately.
+    """
+
+    def __init__(
+        self,
+        scan: ScanFunction,
+        workers: int,
+        max_queue: int,
+        max_queued_bytes: int,
+        result_ttl_s: float,
+        max_results: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            scan: Coroutine function scanning one image
+            workers: Jobs processed concurrently
+            max_queue: Jobs allowed to wait for a worker
+            max_queued_bytes: Image bytes allowed to wait for a worker
+            result_ttl_s: Seconds a finished job's result is kept
+            max_results: Finished jobs kept at most (oldest evicted first)
+            clock: Monotonic time source in seconds
+        """
+        self.scan = scan
+        self.workers = max(workers, 1)
+        self.max_queue = max_queue
+        self.max_queued_bytes = max_queued_bytes
+        self.result_ttl_s = result_ttl_s
+        self.clock = clock
+
+        self._pending: Deque[ScanJob] = deque()
+        self._queued_bytes = 0
+        self._active: Dict[str, ScanJob] = {}
+        self._finished = TTLCache(max_entries=max_results, clock=clock)
+        self._sequence = itertools.count(1)
+        self._dequeued = 0
+        self._wakeup: Optional[asyncio.Condition] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.submitted = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.queue_wait = LatencyTracker()
+        self.processing = LatencyTracker()
+
+    def start(self) -> None:
+        """Start the workers. Safe to call more than once."""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Condition()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def shutdown(self) -> None:
+        """Stop the workers; queued and running jobs are abandoned."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting for a worker."""
+        return len(self._pending)
+
+    def retry_after_s(self) -> float:
+        """Rough time for the current queue to drain, for Retry-After hints."""
+        per_job_s = self.processing.ewma_s or 1.0
+        return max(math.ceil(self.depth * per_job_s / self.workers), 1)
+
+    def check_capacity(self, size: int = 0) -> None:
+        """
+        Reject now if a job of `size` image bytes would not fit in the queue.
+
+        Raises:
+            ScanQueueFullException: With the queue depth and a Retry-After estimate
+        """
+        if self.depth >= self.max_queue or self._queued_bytes + size > self.max_queued_bytes:
+            self.rejected += 1
+            raise ScanQueueFullException(
+                "Too many scans are waiting. Please try again shortly.",
+                details={
+                    "queue_depth": self.depth,
+                    "max_queue": self.max_queue,
+                    "retry_after_s": self.retry_after_s(),
+                }
+            )
+
+    async def submit(self, image_bytes: bytes) -> ScanJob:
+        """
+        Queue an image for scanning.
+
+        Args:
+            image_bytes: Validated image upload
+
+        Returns:
+            The queued job
+
+        Raises:
+            ScanQueueFullException: If the queue has no room for the job
+        """
+        self.start()
+        self.check_capacity(len(image_bytes))
+
+        job = ScanJob(uuid.uuid4().hex, next(self._sequence), image_bytes, self.clock())
+        self._pending.append(job)
+        self._queued_bytes += job.size
+        self._active[job.job_id] = job
+        self.submitted += 1
+        async with self._wakeup:
+            self._wakeup.notify()
+        return job
+
+    def get(self, job_id: str) -> ScanJob:
+        """
+        Look up a queued, running or finished job.
+
+        Raises:
+            JobNotFoundException: If the job is unknown or its result expired
+        """
+        job = self._active.get(job_id)
+        if job is not None:
+            return job
+        cached = self._finished.get(job_id)
+        if cached.found:
+            return cached.value
+        raise JobNotFoundException(
+            f"Scan job '{job_id}' was not found. Results are kept for {self.result_ttl_s:g} seconds.",
+            details={"job_id": job_id}
+        )
+
+    def position(self, job: ScanJob) -> Optional[int]:
+        """1-based place of a queued job in the queue (None once it has started)."""
+        return job.sequence - self._dequeued if job.state == QUEUED else None
+
+    async def _worker(self) -> None:
+        while True:
+            async with self._wakeup:
+                await self._wakeup.wait_for(lambda: self._pending)
+                job = self._pending.popleft()
+            self._dequeued += 1
+            self._queued_bytes -= job.size
+            await self._run(job)
+
+    async def _run(self, job: ScanJob) -> None:
+        job.state = RUNNING
+        job.started_at = self.clock()
+        self.queue_wait.record(job.queue_wait_s)
+        # Each job's stages form their own trace, starting with its queue wait
+        start_trace()
+        record_stage("queue_wait", job.queue_wait_s)
+        image_bytes, job.image_bytes = job.image_bytes, None
+        try:
+            job.result = await self.scan(image_bytes)
+            job.state = SUCCEEDED
+            self.succeeded += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.error = e
+            job.state = FAILED
+            self.failed += 1
+        job.finished_at = self.clock()
+        self.processing.record(job.processing_s)
+        self._active.pop(job.job_id, None)
+        self._finished.set(job.job_id, job, self.result_ttl_s)
+
+    def stats(self) -> dict:
+        """Return queue depth, job counters and queue wait / processing latency."""
+        return {
+            "workers": self.workers,
+            "running": len(self._active) - self.depth,
+            "queued": self.depth,
+            "max_queue": self.max_queue,
+            "queued_bytes": self._queued_bytes,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "results_kept": len(self._finished),
+            "queue_wait": self.queue_wait.stats(),
+            "processing": self.processing.stats(),
+        }
+
+
+async def scan_image(image_bytes: bytes) -> PricingResult:
+    """
+    Preprocess, OCR and price one image, as POST /scan does.
+
+    The scan deadline starts when a worker picks the job up, not at
+    submission, so time spent queued does not eat into the scan's budget.
+    """
+    from services.image_preprocessor import image_preprocessor
+    from services.ocr_service import ocr_service
+    from services.price_service import price_service
+
+    start_time = time.time()
+    deadline = Deadline(settings.scan_deadline_ms / 1000)
+    image_bytes = await image_preprocessor.preprocess(image_bytes)
+    card_info = await ocr_service.extract_card_info(image_bytes, deadline=deadline)
+    pricing_data = await price_service.get_pricing(card_info, deadline=deadline)
+    return PricingResult(
+        card=card_info,
+        pricing=pricing_data,
+        metadata=ScanMetadata.for_scan(
+            start_time,
+            stage_breakdown() if settings.metrics_stage_breakdown else None
+        )
+    )
+
+
+# Global scan job queue instance
+scan_jobs = ScanJobQueue(
+    scan_image,
+    workers=settings.scan_jobs_workers,
+    max_queue=settings.scan_jobs_max_queue,
+    max_queued_bytes=settings.scan_jobs_max_queued_bytes,
+    result_ttl_s=settings.scan_jobs_result_ttl_s,
+    max_results=settings.scan_jobs_max_results,
+)
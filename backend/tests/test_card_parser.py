@@ -0,0 +1,46 @@
+"""Tests for card name parsing."""
+import pytest
+
+from services.card_parser import parse_card_name
+from services.name_index import CardNameIndex
+
+NAMES = ["Charizard", "Charmeleon", "Pikachu", "Pikachu V", "Mr. Mime", "Blastoise"]
+
+
+@pytest.fixture(scope="module")
+def index() -> CardNameIndex:
+    name_index = CardNameIndex()
+    name_index.build(NAMES)
+    return name_index
+
+
+def test_fuzzy_match_corrects_ocr_noise(index):
+    assert parse_card_name("Charizarcl\nHP 120\nStage 2", index) == "Charizard"
+
+
+def test_first_matching_line_wins_over_a_better_score_further_down(index):
+    text = "Charizarcl\n120 HP\nSTAGE 2\nCharmeleon\nPut Charizard on the Stage 1 card"
+
+    assert parse_card_name(text, index) == "Charizard"
+
+
+def test_hp_banner_line_is_skipped(index):
+    assert parse_card_name("HP 60\nPikachu", index) == "Pikachu"
+
+
+def test_name_next_to_its_hp_banner_is_matched(index):
+    assert parse_card_name("Charizard HP120\nEvolves from Charmeleon", index) == "Charizard"
+
+
+def test_lines_skipped_by_the_pattern_parser_are_skipped_with_an_index(index):
+    text = "©1999 Pokemon Blastoise\nMr. Mirne\nHP 70"
+
+    assert parse_card_name(text, index) == "Mr. Mime"
+
+
+def test_without_an_index_the_first_name_like_line_is_returned():
+    assert parse_card_name("120 HP\nCharizard\nSTAGE 2") == "Charizard"
+
+
+def test_unknown_text_falls_back_to_the_pattern_parser(index):
+    assert parse_card_name("Zzyzx Qwerty\nHP 50", index) == "Zzyzx Qwerty"
@@ -0,0 +1,117 @@
+"""Tests for continuous scanning of a camera feed."""
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+
+from services.continuous_scan import ContinuousScanSession
+from utils.error_handlers import OCRUnavailableException, PricingRateLimitedException
+
+
+def frame(shade: int) -> bytes:
+    """A still picture: left half `shade`, right half its inverse."""
+    image = Image.new("L", (64, 64), shade)
+    image.paste(255 - shade, (32, 0, 64, 64))
+    output = io.BytesIO()
+    image.save(output, "PNG")
+    return output.getvalue()
+
+
+class FailingSession:
+    """A session whose scans fail with the queued errors, recording published events."""
+
+    def __init__(self, errors, retry_backoff_s: float = 0.05):
+        self.events = []
+        self.errors = list(errors)
+        self.scans = 0
+        self.session = ContinuousScanSession(
+            self.publish,
+            stable_frames=1,
+            stable_distance=6,
+            duplicate_distance=4,
+            max_frame_bytes=1024 * 1024,
+            retry_backoff_s=retry_backoff_s,
+            retry_backoff_max_s=1.0,
+        )
+        self.session._scan = self.scan
+
+    async def publish(self, event, payload):
+        self.events.append((event, payload))
+
+    async def scan(self, frame_bytes):
+        self.scans += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+    async def feed(self, frame_bytes: bytes) -> str:
+        outcome = await self.session.feed(frame_bytes)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return outcome
+
+
+@pytest.fixture
+def unavailable():
+    return OCRUnavailableException("OCR service is temporarily unavailable.")
+
+
+@pytest.mark.asyncio
+async def test_failed_picture_is_not_rescanned_on_every_frame(unavailable):
+    scanner = FailingSession([unavailable] * 10, retry_backoff_s=10.0)
+    scanner.session.start()
+    try:
+        outcomes = [await scanner.feed(frame(40)) for _ in range(20)]
+    finally:
+        await scanner.session.close()
+
+    assert outcomes[0] == "queued"
+    assert set(outcomes[1:]) == {"skipped_duplicate"}
+    assert scanner.scans == 1
+    assert [event for event, _ in scanner.events] == ["error"]
+
+
+@pytest.mark.asyncio
+async def test_failed_picture_is_retried_after_the_backoff_and_the_same_error_is_not_republished(unavailable):
+    scanner = FailingSession([unavailable, unavailable])
+    scanner.session.start()
+    try:
+        await scanner.feed(frame(40))
+        await asyncio.sleep(0.06)
+        assert await scanner.feed(frame(40)) == "queued"
+        # The second failure doubled the backoff
+        await asyncio.sleep(0.06)
+        assert await scanner.feed(frame(40)) == "skipped_duplicate"
+    finally:
+        await scanner.session.close()
+
+    assert scanner.scans == 2
+    assert len(scanner.events) == 1
+
+
+@pytest.mark.asyncio
+async def test_scene_change_is_scanned_at_once_and_a_different_error_is_published(unavailable):
+    rate_limited = PricingRateLimitedException("Pricing is rate limited.", details={"retry_after_s": 5})
+    scanner = FailingSession([unavailable, rate_limited], retry_backoff_s=10.0)
+    scanner.session.start()
+    try:
+        await scanner.feed(frame(40))
+        assert await scanner.feed(frame(220)) == "queued"
+    finally:
+        await scanner.session.close()
+
+    assert scanner.scans == 2
+    assert [payload for _, payload in scanner.events] == [unavailable, rate_limited]
+
+
+@pytest.mark.asyncio
+async def test_retry_waits_at_least_the_errors_retry_after():
+    rate_limited = PricingRateLimitedException("Pricing is rate limited.", details={"retry_after_s": 5})
+    scanner = FailingSession([rate_limited])
+    scanner.session.start()
+    try:
+        await scanner.feed(frame(40))
+        await asyncio.sleep(0.06)
+        assert await scanner.feed(frame(40)) == "skipped_duplicate"
+    finally:
+        await scanner.session.close()
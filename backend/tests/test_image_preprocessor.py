@@ -0,0 +1,48 @@
+"""Tests for image preprocessing before OCR."""
+import io
+
+from PIL import Image
+
+from services.image_preprocessor import preprocess_image
+
+# EXIF orientation "rotate 90 CW to display"
+ROTATE_90 = 6
+
+
+def encode(size, quality: int, orientation: int = 1) -> bytes:
+    image = Image.new("RGB", size, "white")
+    for x in range(0, size[0], 8):
+        image.paste((x % 256, 0, 0), (x, 0, x + 4, size[1] // 2))
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=quality, exif=exif)
+    return output.getvalue()
+
+
+def test_unchanged_upload_is_kept_when_the_re_encode_is_not_smaller():
+    upload = encode((200, 100), quality=10)
+
+    processed, _ = preprocess_image(upload, max_edge=1600, quality=95)
+
+    assert processed == upload
+
+
+def test_oriented_image_is_kept_even_when_larger_than_the_upload():
+    upload = encode((200, 100), quality=10, orientation=ROTATE_90)
+
+    processed, _ = preprocess_image(upload, max_edge=1600, quality=95)
+
+    assert len(processed) >= len(upload)
+    image = Image.open(io.BytesIO(processed))
+    assert image.size == (100, 200)
+    assert image.getexif().get(0x0112, 1) == 1
+
+
+def test_downscaled_image_fits_the_max_edge():
+    upload = encode((1000, 500), quality=90)
+
+    processed, timings = preprocess_image(upload, max_edge=400, quality=85)
+
+    assert max(Image.open(io.BytesIO(processed)).size) <= 400
+    assert set(timings) == {"decode", "orient", "crop", "resize", "encode"}
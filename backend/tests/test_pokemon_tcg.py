@@ -0,0 +1,105 @@
+"""Tests for the Pokemon TCG API client."""
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.stub_servers import StubTCGState, create_tcg_stub_app, serve_in_thread
+from clients.pokemon_tcg import PokemonTCGClient
+from clients.rate_limiter import BACKGROUND, INTERACTIVE, OutboundScheduler
+from utils.error_handlers import PricingRateLimitedException
+
+
+class BlockingUpstream:
+    """Stands in for PokemonTCGClient._get: records priorities, answers once released."""
+
+    def __init__(self):
+        self.priorities = []
+        self.release = asyncio.Event()
+
+    async def get(self, path, params=None, priority=INTERACTIVE, deadline=None):
+        self.priorities.append(priority)
+        await self.release.wait()
+        card = {"id": "base1-4", "name": "Charizard", "set": {"name": "Base"}, "number": "4"}
+        body = {"data": card} if params is None else {"data": [card]}
+        return httpx.Response(200, json=body, request=httpx.Request("GET", f"http://tcg{path}"))
+
+
+async def settle() -> None:
+    """Let started lookups run until they wait on the upstream."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    client = PokemonTCGClient()
+    upstream = BlockingUpstream()
+    monkeypatch.setattr(client, "_get", upstream.get)
+    upstream.client = client
+    return upstream
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("lookup", [
+    lambda client, priority: client.get_card_by_id("base1-4", priority),
+    lambda client, priority: client.search_card("Charizard", "Base", "4/102", priority),
+])
+async def test_scan_does_not_join_a_background_flight(upstream, lookup):
+    refresh = asyncio.create_task(lookup(upstream.client, BACKGROUND))
+    await settle()
+    scan = asyncio.create_task(lookup(upstream.client, INTERACTIVE))
+    await settle()
+
+    assert upstream.priorities == [BACKGROUND, INTERACTIVE]
+    upstream.release.set()
+    assert (await scan)["id"] == (await refresh)["id"] == "base1-4"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_scans_share_one_request(upstream):
+    scans = [asyncio.create_task(upstream.client.get_card_by_id("base1-4")) for _ in range(3)]
+    await settle()
+    upstream.release.set()
+
+    await asyncio.gather(*scans)
+    assert upstream.priorities == [INTERACTIVE]
+    assert upstream.client.search_flight.stats()["coalesced"] == 2
+
+
+@pytest.fixture(scope="module")
+def quota_stub():
+    """Stub TCG API allowing one request per second (429 with Retry-After beyond it)."""
+    state = StubTCGState(quota_per_s=1.0, quota_burst=1)
+    with serve_in_thread(create_tcg_stub_app(state)) as base_url:
+        yield state, base_url
+
+
+@pytest.mark.asyncio
+async def test_quota_429_pauses_and_sheds_background_before_interactive(quota_stub):
+    state, base_url = quota_stub
+    state.reset()
+    client = PokemonTCGClient()
+    client.base_url = base_url
+    # Configured above the stub's quota, so only its 429s hold requests back
+    client.scheduler = OutboundScheduler(
+        rate_per_s=100,
+        burst=10,
+        max_wait_s={INTERACTIVE: 3.0, BACKGROUND: 0.5},
+    )
+    try:
+        assert await client.get_card_by_id("base1-1") is not None
+        refresh = asyncio.create_task(client.get_card_by_id("base1-2", BACKGROUND))
+        scan = asyncio.create_task(client.get_card_by_id("base1-3", INTERACTIVE))
+        results = await asyncio.gather(refresh, scan, return_exceptions=True)
+    finally:
+        await client.aclose()
+
+    assert isinstance(results[0], PricingRateLimitedException)
+    assert results[1] is not None and not isinstance(results[1], BaseException)
+    stats = client.rate_limit_stats()
+    assert state.throttled >= 1
+    assert stats["throttled_responses"] >= 1
+    assert stats["paused_s_total"] >= 1.0
+    assert stats["background"]["shed"] == 1
+    assert stats["interactive"]["shed"] == 0
@@ -0,0 +1,118 @@
+"""Tests for concurrent price providers and partial results."""
+import asyncio
+from typing import Dict, List, Optional
+
+import pytest
+
+from models.schemas import CardInfo, PriceSource
+from services.price_providers import PriceProvider, iter_prices, ordered_sources
+
+CARD = CardInfo(name="Charizard", set="Base Set", number="4/102")
+
+
+class FakeProvider(PriceProvider):
+    """Provider that answers one fixed price, or fails, after an injected latency."""
+
+    def __init__(self, name: str, latency_s: float, timeout_s: float = 5.0, error: Optional[Exception] = None):
+        super().__init__(name, timeout_s)
+        self.latency_s = latency_s
+        self.error = error
+        self.cancelled = False
+
+    async def fetch(self, card_info: CardInfo, card_data: Dict) -> List[PriceSource]:
+        try:
+            await asyncio.sleep(self.latency_s)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return [PriceSource(name=self.name, price_usd=100.0)]
+
+
+async def gather(providers: List[PriceProvider], timeout_s: Optional[float] = None):
+    results = {}
+    arrivals = []
+    async for provider, sources in iter_prices(providers, CARD, {}, timeout_s):
+        results[provider.name] = sources
+        arrivals.append(provider.name)
+    sources, missing = ordered_sources(providers, results)
+    return [source.name for source in sources], missing, arrivals
+
+
+@pytest.mark.asyncio
+async def test_prices_arrive_in_completion_order_and_are_returned_in_provider_order():
+    providers = [FakeProvider("slow", 0.06), FakeProvider("fast", 0.01), FakeProvider("medium", 0.03)]
+
+    sources, missing, arrivals = await gather(providers)
+
+    assert arrivals == ["fast", "medium", "slow"]
+    assert sources == ["slow", "fast", "medium"]
+    assert missing == []
+
+
+@pytest.mark.asyncio
+async def test_deadline_returns_the_prices_collected_so_far():
+    providers = [FakeProvider("fast", 0.01), FakeProvider("slow", 5.0), FakeProvider("slower", 10.0)]
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    sources, missing, _ = await gather(providers, timeout_s=0.1)
+
+    assert loop.time() - started < 1.0
+    assert sources == ["fast"]
+    assert missing == ["slow", "slower"]
+    assert [provider.deadline_misses for provider in providers] == [0, 1, 1]
+    assert providers[1].cancelled and providers[2].cancelled
+
+
+@pytest.mark.asyncio
+async def test_provider_timeout_does_not_hold_back_the_others():
+    hanging = FakeProvider("hanging", 5.0, timeout_s=0.05)
+    providers = [FakeProvider("fast", 0.01), hanging]
+
+    sources, missing, _ = await gather(providers)
+
+    assert sources == ["fast"]
+    assert missing == ["hanging"]
+    assert hanging.timeouts == 1
+    assert hanging.deadline_misses == 0
+
+
+@pytest.mark.asyncio
+async def test_failing_provider_is_reported_missing():
+    failing = FakeProvider("failing", 0.0, error=RuntimeError("marketplace down"))
+    providers = [failing, FakeProvider("fast", 0.01)]
+
+    sources, missing, _ = await gather(providers)
+
+    assert sources == ["fast"]
+    assert missing == ["failing"]
+    assert failing.errors == 1
+
+
+@pytest.mark.asyncio
+async def test_closing_the_iterator_early_cancels_running_providers():
+    slow = FakeProvider("slow", 5.0)
+    prices = iter_prices([FakeProvider("fast", 0.01), slow], CARD, {})
+
+    provider, sources = await prices.__anext__()
+    await prices.aclose()
+
+    assert provider.name == "fast"
+    assert [source.name for source in sources] == ["fast"]
+    assert slow.cancelled
+
+
+def test_ordered_sources_flattens_in_provider_order():
+    providers = [FakeProvider(name, 0.0) for name in ("a", "b", "c")]
+    results = {
+        "c": [PriceSource(name="c", price_usd=3.0)],
+        "a": [PriceSource(name="a1", price_usd=1.0), PriceSource(name="a2", price_usd=1.5)],
+        "b": None,
+    }
+
+    sources, missing = ordered_sources(providers, results)
+
+    assert [source.name for source in sources] == ["a1", "a2", "c"]
+    assert missing == ["b"]
@@ -0,0 +1,156 @@
+"""Tests for outbound request scheduling and load shedding."""
+import asyncio
+
+import pytest
+
+from clients.rate_limiter import BACKGROUND, DEFAULT_RETRY_AFTER_S, INTERACTIVE, OutboundScheduler, parse_retry_after
+from utils.error_handlers import PricingRateLimitedException
+
+# Slow enough that no token is refilled while a test runs
+NO_REFILL = 0.001
+
+
+def test_burst_is_sent_without_waiting():
+    scheduler = OutboundScheduler(rate_per_s=NO_REFILL, burst=3)
+
+    assert [scheduler.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_background_requests_leave_the_reserve_to_interactive_ones():
+    scheduler = OutboundScheduler(rate_per_s=NO_REFILL, burst=3, background_reserve=1)
+
+    assert scheduler.try_acquire(BACKGROUND)
+    assert scheduler.try_acquire(BACKGROUND)
+    assert not scheduler.try_acquire(BACKGROUND)
+    assert scheduler.try_acquire(INTERACTIVE)
+
+
+@pytest.mark.asyncio
+async def test_queued_interactive_requests_are_served_before_background_ones():
+    scheduler = OutboundScheduler(rate_per_s=50, burst=1)
+    assert scheduler.try_acquire()
+    served = []
+
+    async def request(priority: int) -> None:
+        await scheduler.acquire(priority)
+        served.append(priority)
+
+    background = asyncio.create_task(request(BACKGROUND))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(request(INTERACTIVE))
+    await asyncio.gather(background, interactive)
+
+    assert served == [INTERACTIVE, BACKGROUND]
+
+
+@pytest.mark.asyncio
+async def test_request_is_shed_after_its_max_wait():
+    scheduler = OutboundScheduler(rate_per_s=NO_REFILL, burst=1)
+    assert scheduler.try_acquire()
+
+    with pytest.raises(PricingRateLimitedException) as raised:
+        await scheduler.acquire(INTERACTIVE, max_wait_s=0.01)
+
+    assert raised.value.details["priority"] == "interactive"
+    assert raised.value.details["retry_after_s"] > 0
+    assert scheduler.stats()["interactive"] == {"queued": 0, "granted": 1, "shed": 1, "avg_wait_ms": 0.0}
+
+
+@pytest.mark.asyncio
+async def test_full_queue_evicts_background_to_admit_interactive():
+    scheduler = OutboundScheduler(rate_per_s=NO_REFILL, burst=1, max_queue=1)
+    assert scheduler.try_acquire()
+    background = asyncio.create_task(scheduler.acquire(BACKGROUND))
+    await asyncio.sleep(0)
+
+    interactive = asyncio.create_task(scheduler.acquire(INTERACTIVE, max_wait_s=0.05))
+    with pytest.raises(PricingRateLimitedException):
+        await background
+    assert scheduler.stats()["interactive"]["queued"] == 1
+
+    with pytest.raises(PricingRateLimitedException):
+        await interactive
+    assert scheduler.shed == {INTERACTIVE: 1, BACKGROUND: 1}
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_background_at_once():
+    scheduler = OutboundScheduler(rate_per_s=NO_REFILL, burst=1, max_queue=1)
+    assert scheduler.try_acquire()
+    interactive = asyncio.create_task(scheduler.acquire(INTERACTIVE, max_wait_s=0.05))
+    await asyncio.sleep(0)
+
+    with pytest.raises(PricingRateLimitedException) as raised:
+        await scheduler.acquire(BACKGROUND)
+
+    assert raised.value.details["priority"] == "background"
+    assert scheduler.stats()["interactive"]["queued"] == 1
+    await asyncio.gather(interactive, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_pause_longer_than_the_max_wait_sheds_queued_and_new_requests():
+    scheduler = OutboundScheduler(rate_per_s=NO_REFILL, burst=1, max_wait_s={INTERACTIVE: 1.0, BACKGROUND: 10.0})
+    assert scheduler.try_acquire()
+    interactive = asyncio.create_task(scheduler.acquire(INTERACTIVE))
+    await asyncio.sleep(0)
+
+    scheduler.pause(5.0)
+
+    with pytest.raises(PricingRateLimitedException) as raised:
+        await interactive
+    assert raised.value.details["retry_after_s"] >= 5.0
+    with pytest.raises(PricingRateLimitedException):
+        await scheduler.acquire(INTERACTIVE)
+    stats = scheduler.stats()
+    assert stats["throttled_responses"] == 1
+    assert stats["interactive"]["shed"] == 2
+    assert stats["interactive"]["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pause_sheds_queued_requests_by_their_own_max_wait():
+    scheduler = OutboundScheduler(rate_per_s=NO_REFILL, burst=1, max_wait_s={INTERACTIVE: 10.0})
+    assert scheduler.try_acquire()
+    near_deadline = asyncio.create_task(scheduler.acquire(INTERACTIVE, max_wait_s=0.3))
+    patient = asyncio.create_task(scheduler.acquire(INTERACTIVE))
+    await asyncio.sleep(0)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    scheduler.pause(5.0)
+
+    with pytest.raises(PricingRateLimitedException):
+        await near_deadline
+    assert loop.time() - started < 0.1
+    assert not patient.done()
+    assert scheduler.stats()["interactive"]["queued"] == 1
+    patient.cancel()
+    await asyncio.gather(patient, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_short_pause_delays_requests_until_it_passes():
+    scheduler = OutboundScheduler(rate_per_s=1000, burst=1)
+    scheduler.pause(0.05)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    await scheduler.acquire(INTERACTIVE)
+
+    assert loop.time() - started >= 0.04
+    assert scheduler.shed == {INTERACTIVE: 0, BACKGROUND: 0}
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("3", 3.0),
+        ("-1", 0.0),
+        (None, DEFAULT_RETRY_AFTER_S),
+        ("soon", DEFAULT_RETRY_AFTER_S),
+        ("Wed, 21 Oct 2015 07:28:10 GMT", 10.0),
+    ],
+)
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value, now=1445412480.0) == expected
@@ -0,0 +1,97 @@
+"""Tests for SingleFlight request coalescing."""
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+class Upstream:
+    """Fake upstream call that blocks until released and counts executions."""
+
+    def __init__(self, result="ok", error=None):
+        self.result = result
+        self.error = error
+        self.executions = 0
+        self.release = asyncio.Event()
+
+    async def call(self):
+        self.executions += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def start(flight: SingleFlight, key, upstream: Upstream, callers: int):
+    tasks = [asyncio.create_task(flight.do(key, upstream.call)) for _ in range(callers)]
+    await asyncio.sleep(0)
+    return tasks
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    upstream = Upstream(result={"card": "Charizard"})
+
+    tasks = await start(flight, "charizard", upstream, callers=10)
+    upstream.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert upstream.executions == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"calls": 10, "upstream_executions": 1, "coalesced": 9, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+    first, second = Upstream("a"), Upstream("b")
+
+    tasks = await start(flight, "a", first, callers=2) + await start(flight, "b", second, callers=2)
+    first.release.set()
+    second.release.set()
+
+    assert await asyncio.gather(*tasks) == ["a", "a", "b", "b"]
+    assert (first.executions, second.executions) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_exception_reaches_every_waiting_caller():
+    flight = SingleFlight()
+    upstream = Upstream(error=ValueError("upstream failed"))
+
+    tasks = await start(flight, "key", upstream, callers=3)
+    upstream.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert upstream.executions == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_key_is_forgotten_once_the_call_finishes():
+    flight = SingleFlight()
+    upstream = Upstream()
+    upstream.release.set()
+
+    await flight.do("key", upstream.call)
+    await flight.do("key", upstream.call)
+
+    assert upstream.executions == 2
+    assert flight.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+    upstream = Upstream()
+
+    cancelled, waiting = await start(flight, "key", upstream, callers=2)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    upstream.release.set()
+
+    assert await waiting == "ok"
+    assert cancelled.cancelled()
+    assert upstream.executions == 1
@@ -0,0 +1,86 @@
+"""Tests for set and rarity term matching."""
+import pytest
+
+from services import card_parser
+from utils.term_matcher import TermMatcher
+
+TERMS = [
+    ("sets", "Base Set 2"),
+    ("sets", "Base Set"),
+    ("sets", "Jungle"),
+    ("sets", "Team Rocket"),
+    ("rarities", "Holo Rare"),
+    ("rarities", "Rare"),
+    ("rarities", "Common"),
+]
+
+
+@pytest.fixture
+def matcher() -> TermMatcher:
+    return TermMatcher(TERMS)
+
+
+def test_longest_term_at_a_position_wins(matcher):
+    assert [match.term for match in matcher.scan("Charizard Base Set 2 4/130")] == ["Base Set 2"]
+
+
+def test_terms_match_whole_words_only(matcher):
+    assert matcher.scan("Rarely seen in the jungles") == []
+
+
+def test_matching_ignores_case_and_accents():
+    matcher = TermMatcher([("sets", "Pokemon Rumble")])
+
+    assert matcher.best("POKÉMON RUMBLE 12/16") == {"sets": "Pokemon Rumble"}
+
+
+def test_scan_reports_matches_in_order_of_appearance(matcher):
+    matches = matcher.scan("Jungle Rare ... Base Set Common")
+
+    assert [(match.kind, match.term) for match in matches] == [
+        ("sets", "Jungle"), ("rarities", "Rare"), ("sets", "Base Set"), ("rarities", "Common"),
+    ]
+    assert matches[0].start == 0
+
+
+def test_best_prefers_the_term_listed_first(matcher):
+    assert matcher.best("Common ... Team Rocket ... Holo Rare ... Jungle") == {
+        "sets": "Jungle",
+        "rarities": "Holo Rare",
+    }
+
+
+def test_duplicate_terms_keep_their_first_priority():
+    matcher = TermMatcher([("sets", "Jungle"), ("sets", "Fossil"), ("sets", "jungle")])
+
+    assert len(matcher) == 2
+    assert matcher.best("Fossil Jungle") == {"sets": "Jungle"}
+
+
+def test_empty_matcher_finds_nothing():
+    assert TermMatcher([]).scan("Base Set") == []
+
+
+def test_load_card_terms_reads_sections_in_file_order(tmp_path):
+    path = tmp_path / "terms.txt"
+    path.write_text("# comment\n[sets]\nBase Set 2\nBase Set\n\n[rarities]\nHolo Rare\nRare\n", encoding="utf-8")
+
+    matcher = card_parser.load_card_terms(str(path))
+
+    assert matcher.best("Base Set 2 Rare Holo Rare") == {"sets": "Base Set 2", "rarities": "Holo Rare"}
+
+
+def test_missing_terms_file_gives_an_empty_matcher(tmp_path):
+    assert len(card_parser.load_card_terms(str(tmp_path / "missing.txt"))) == 0
+
+
+def test_parse_full_card_info_uses_the_term_matcher(monkeypatch, matcher):
+    monkeypatch.setattr(card_parser, "_term_matcher", matcher)
+    text = "Charizard\nHP 120\nFire Spin\nBase Set 4/102 Holo Rare"
+
+    assert card_parser.parse_full_card_info(text) == {
+        "name": "Charizard",
+        "set": "Base Set",
+        "number": "4/102",
+        "rarity": "Holo Rare",
+    }
@@ -0,0 +1,133 @@
+"""Tests for the upload memory budget."""
+import asyncio
+
+import pytest
+
+from utils.error_handlers import InvalidImageException, ServerBusyException
+from utils.uploads import ByteBudget
+
+
+async def hold(budget: ByteBudget, size: int, release: asyncio.Event) -> None:
+    async with budget.reserve(size):
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_reservation_larger_than_the_budget_is_rejected():
+    budget = ByteBudget(capacity=100, wait_timeout_s=1.0)
+
+    with pytest.raises(InvalidImageException) as raised:
+        async with budget.reserve(101):
+            pass
+
+    assert raised.value.details == {"size_bytes": 101, "capacity_bytes": 100}
+    assert budget.stats()["oversized"] == 1
+    assert budget.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_reservation_is_released_after_the_block():
+    budget = ByteBudget(capacity=100, wait_timeout_s=1.0)
+
+    async with budget.reserve(100):
+        assert budget.in_use == 100
+    assert budget.in_use == 0
+    assert budget.peak_in_use == 100
+
+
+@pytest.mark.asyncio
+async def test_reservation_waits_until_bytes_are_released():
+    budget = ByteBudget(capacity=100, wait_timeout_s=1.0)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(budget, 80, release))
+    await asyncio.sleep(0)
+
+    waiter_release = asyncio.Event()
+    waiter = asyncio.create_task(hold(budget, 40, waiter_release))
+    await asyncio.sleep(0)
+    assert budget.stats()["waiting"] == 1
+    assert budget.in_use == 80
+
+    release.set()
+    await holder
+    assert budget.in_use == 40
+    assert budget.stats()["waiting"] == 0
+
+    waiter_release.set()
+    await waiter
+    assert budget.in_use == 0
+    assert budget.peak_in_use == 80
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_reservation_does_not_leak():
+    budget = ByteBudget(capacity=100, wait_timeout_s=1.0)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(budget, 100, release))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(hold(budget, 50, asyncio.Event()))
+    await asyncio.sleep(0)
+    assert budget.stats()["waiting"] == 1
+
+    queued.cancel()
+    await asyncio.gather(queued, return_exceptions=True)
+    release.set()
+    await holder
+
+    assert budget.in_use == 0
+    assert budget.stats()["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_reservation_granted_to_a_cancelled_caller_is_returned():
+    budget = ByteBudget(capacity=100, wait_timeout_s=1.0)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(budget, 100, release))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(hold(budget, 50, asyncio.Event()))
+    await asyncio.sleep(0)
+
+    # The holder's release grants the queued bytes before the caller is cancelled
+    release.set()
+    await holder
+    assert budget.in_use == 50
+    queued.cancel()
+    await asyncio.gather(queued, return_exceptions=True)
+
+    assert queued.cancelled()
+    assert budget.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_reservation_that_waits_too_long_is_rejected():
+    budget = ByteBudget(capacity=100, wait_timeout_s=0.01)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(budget, 100, release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ServerBusyException) as raised:
+        async with budget.reserve(1):
+            pass
+
+    assert raised.value.details == {"retry_after_s": 1}
+    assert budget.stats()["rejected"] == 1
+    release.set()
+    await holder
+    assert budget.in_use == 0
+    assert budget.stats()["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_peak_never_exceeds_capacity_under_contention():
+    budget = ByteBudget(capacity=1000, wait_timeout_s=5.0)
+
+    async def scan(size: int) -> None:
+        async with budget.reserve(size):
+            assert budget.in_use <= budget.capacity
+            await asyncio.sleep(0.001)
+
+    await asyncio.gather(*(scan(100 + (index * 37) % 400) for index in range(200)))
+
+    assert budget.peak_in_use <= budget.capacity
+    assert budget.in_use == 0
+    assert budget.stats()["reservations"] == 200
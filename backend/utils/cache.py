@@ -0,0 +1,135 @@
+"""In-memory caching helpers."""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+
+class CacheLookup(NamedTuple):
+    """Result of a TTLCache lookup."""
+    found: bool
+    value: Any = None
+    stale: bool = False
+
+
+MISS = CacheLookup(found=False)
+
+
+class _Entry:
+    """A cached value with its freshness deadline."""
+    __slots__ = ("value", "expires_at")
+
+    def __init__(self, value: Any, expires_at: float):
+        self.value = value
+        self.expires_at = expires_at
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry TTL and a stale-while-revalidate window.
+
+    An entry is fresh until its TTL passes. For `stale_ttl_s` seconds after
+    that it is still returned, flagged as stale, so the caller can serve it
+    while refreshing in the background. Past that window it is a miss.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        stale_ttl_s: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of entries before LRU eviction
+            stale_ttl_s: How long an expired entry may still be served as stale
+            clock: Monotonic time source in seconds (overridable for benchmarks)
+        """
+        self.max_entries = max_entries
+        self.stale_ttl_s = stale_ttl_s
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> CacheLookup:
+        """
+        Look up a key, refreshing its LRU position on a hit.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            CacheLookup with found/stale flags and the cached value
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISS
+
+        now = self.clock()
+        if now >= entry.expires_at + self.stale_ttl_s:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return MISS
+
+        self._entries.move_to_end(key)
+        if now >= entry.expires_at:
+            self.stale_hits += 1
+            return CacheLookup(found=True, value=entry.value, stale=True)
+
+        self.hits += 1
+        return CacheLookup(found=True, value=entry.value)
+
+    def set(self, key: Hashable, value: Any, ttl_s: float) -> None:
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache (None is a valid, negative-cached value)
+            ttl_s: Seconds until the entry becomes stale
+        """
+        self._entries[key] = _Entry(value, self.clock() + ttl_s)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def expires_in(self, key: Hashable) -> Optional[float]:
+        """Seconds until a key becomes stale (negative if already stale), or None if absent."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry.expires_at - self.clock()
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove a key if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters and the current size."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+        }
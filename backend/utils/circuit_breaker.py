@@ -0,0 +1,156 @@
+"""Circuit breaking and latency tracking for upstream services."""
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Fail fast while an upstream service is unhealthy.
+
+    Closed: calls go through, and `failure_threshold` consecutive failures
+    open the circuit. Open: calls are refused for `reset_timeout_s`.
+    Half-open: one trial call is let through; its success closes the
+    circuit, its failure opens it again. A trial that never reports back
+    (its caller was cancelled) is replaced after another `reset_timeout_s`.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout_s: float = 15.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout_s: Time the circuit stays open before a trial call
+            clock: Monotonic time source in seconds
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.clock = clock
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_started_at: Optional[float] = None
+        self.consecutive_failures = 0
+        self.failures = 0
+        self.successes = 0
+        self.rejected = 0
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the timeout passes."""
+        if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout_s:
+            self._state = HALF_OPEN
+            self._trial_started_at = None
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        Ask to make a call.
+
+        Returns:
+            True if the call may proceed; the caller must then report its
+            outcome with record_success() or record_failure()
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN:
+            now = self.clock()
+            if self._trial_started_at is None or now - self._trial_started_at >= self.reset_timeout_s:
+                self._trial_started_at = now
+                return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Report a successful call."""
+        self.successes += 1
+        self.consecutive_failures = 0
+        if self._state != CLOSED:
+            self._state = CLOSED
+            self._trial_started_at = None
+
+    def record_failure(self) -> None:
+        """Report a failed call (error, timeout or 5xx)."""
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self._state == HALF_OPEN or (self._state == CLOSED and self.consecutive_failures >= self.failure_threshold):
+            self._state = OPEN
+            self._opened_at = self.clock()
+            self._trial_started_at = None
+            self.trips += 1
+
+    def retry_after_s(self) -> float:
+        """Seconds until the open circuit lets a trial call through."""
+        if self.state != OPEN:
+            return 0.0
+        return max(self.reset_timeout_s - (self.clock() - self._opened_at), 0.0)
+
+    def stats(self) -> dict:
+        """Return the state and call counters."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failures": self.failures,
+            "successes": self.successes,
+            "rejected": self.rejected,
+            "trips": self.trips,
+            "retry_after_s": round(self.retry_after_s(), 2),
+        }
+
+
+class LatencyTracker:
+    """
+    Exponentially weighted moving average and recent p95 of call latencies.
+
+    The p95 is taken over the last `window` samples and recomputed lazily,
+    at most once per `window // 8` new samples.
+    """
+
+    def __init__(self, alpha: float = 0.2, window: int = 256):
+        """
+        Args:
+            alpha: EWMA weight of each new sample
+            window: Recent samples kept for the p95
+        """
+        self.alpha = alpha
+        self.ewma_s: Optional[float] = None
+        self.count = 0
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._p95_s: Optional[float] = None
+        self._stale = 0
+
+    def record(self, seconds: float) -> None:
+        """Add one latency sample."""
+        self.count += 1
+        self.ewma_s = seconds if self.ewma_s is None else self.ewma_s + self.alpha * (seconds - self.ewma_s)
+        self._samples.append(seconds)
+        self._stale += 1
+
+    def p95_s(self, min_samples: int = 20) -> Optional[float]:
+        """Recent 95th percentile latency, or None with fewer than `min_samples` samples."""
+        if len(self._samples) < min_samples:
+            return None
+        if self._p95_s is None or self._stale >= max(self._samples.maxlen // 8, 1):
+            ordered = sorted(self._samples)
+            self._p95_s = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+            self._stale = 0
+        return self._p95_s
+
+    def stats(self) -> dict:
+        """Return the EWMA and p95 in milliseconds."""
+        p95 = self.p95_s(min_samples=1)
+        return {
+            "samples": self.count,
+            "latency_ewma_ms": round(self.ewma_s * 1000, 1) if self.ewma_s is not None else None,
+            "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
@@ -0,0 +1,51 @@
+"""Per-request time budgets shared across processing stages."""
+import time
+from typing import Callable, Optional
+
+
+class Deadline:
+    """
+    A fixed point in time by which a request must finish.
+
+    Created once per request and passed down to every stage, so each stage
+    gets whatever budget remains rather than its own full timeout.
+    """
+
+    def __init__(self, budget_s: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            budget_s: Total time allowed from now
+            clock: Monotonic time source in seconds
+        """
+        self.budget_s = budget_s
+        self.clock = clock
+        self.started_at = clock()
+        self.expires_at = self.started_at + budget_s
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (0 once it has passed)."""
+        return max(self.expires_at - self.clock(), 0.0)
+
+    def elapsed(self) -> float:
+        """Seconds since the deadline was created."""
+        return self.clock() - self.started_at
+
+    @property
+    def expired(self) -> bool:
+        return self.clock() >= self.expires_at
+
+
+def stage_timeout(deadline: Optional[Deadline], cap_s: float) -> float:
+    """
+    Timeout for one stage: its own cap, or less if the deadline is closer.
+
+    Args:
+        deadline: Request deadline (None for no overall budget)
+        cap_s: The stage's own timeout
+
+    Returns:
+        Seconds the stage may take (0 if the deadline has passed)
+    """
+    if deadline is None:
+        return cap_s
+    return min(cap_s, deadline.remaining())
@@ -14,6 +14,11 @@ class OCRFailedException(BaseCardScannerException):
     pass
 
 
+class OCRUnavailableException(BaseCardScannerException):
+    """Raised when the OCR backend is overloaded or does not answer in time."""
+    pass
+
+
 class CardNotFoundException(BaseCardScannerException):
     """Raised when card cannot be found in pricing database."""
     pass
@@ -24,6 +29,31 @@ class PricingUnavailableException(BaseCardScannerException):
     pass
 
 
+class PricingRateLimitedException(PricingUnavailableException):
+    """Raised when pricing requests are held back by the upstream rate limit."""
+    pass
+
+
 class InvalidImageException(BaseCardScannerException):
     """Raised when uploaded image is invalid."""
     pass
+
+
+class TooManyImagesException(BaseCardScannerException):
+    """Raised when a batch scan has more images than one batch may hold."""
+    pass
+
+
+class ServerBusyException(BaseCardScannerException):
+    """Raised when the server is at capacity and sheds new work."""
+    pass
+
+
+class ScanQueueFullException(ServerBusyException):
+    """Raised when the scan job queue is full and a new job is rejected."""
+    pass
+
+
+class JobNotFoundException(BaseCardScannerException):
+    """Raised when a scan job is unknown or its result has expired."""
+    pass
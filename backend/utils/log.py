@@ -0,0 +1,240 @@
+"""Structured logging, formatted and written off the request path by a background thread."""
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Optional, TextIO
+
+from config import settings
+
+# Parent of every application logger; records do not reach the root logger
+ROOT_LOGGER = "card_scanner"
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, component, event and its fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "component": record.name.rpartition(".")[2],
+            "event": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """`[Component] event key=value ...` lines, for reading logs in a terminal."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", None) or {}
+        line = f"[{record.name.rpartition('.')[2]}] {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Queue records as they are, leaving formatting to the listener thread.
+
+    The stdlib QueueHandler formats each record on the calling thread; log
+    calls here only pass fresh dicts of fields, so the record can be handed
+    over unformatted. When the queue is full the record is dropped and
+    counted rather than blocking the request.
+    """
+
+    def __init__(self, pipeline: "LogPipeline"):
+        super().__init__(pipeline.queue)
+        self.pipeline = pipeline
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.pipeline.ensure_started()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.pipeline.dropped += 1
+
+
+class LogPipeline:
+    """
+    Queue between application loggers and the output stream.
+
+    Log calls on the event loop only build a record and put it on a bounded
+    queue; a listener thread formats records (JSON or text) and writes
+    them, so a slow stdout (a pipe to a log collector) never stalls a
+    request. The thread starts with the first record and is flushed at
+    exit.
+    """
+
+    def __init__(self, level: str = "INFO", fmt: str = "json", queue_size: int = 10000, stream: Optional[TextIO] = None):
+        """
+        Args:
+            level: Minimum level logged (DEBUG, INFO, WARNING, ERROR)
+            fmt: "json" for one JSON object per line, or "text"
+            queue_size: Records buffered before new ones are dropped
+            stream: Output stream (defaults to stdout)
+        """
+        self.queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(TextFormatter() if fmt == "text" else JSONFormatter())
+        self._listener = QueueListener(self.queue, output)
+        self._started = False
+        self._lock = threading.Lock()
+
+        self.logger = logging.getLogger(ROOT_LOGGER)
+        self.logger.setLevel(level.upper())
+        self.logger.propagate = False
+        self.handler = _DeferredQueueHandler(self)
+        self.logger.addHandler(self.handler)
+
+    def ensure_started(self) -> None:
+        """Start the writer thread if it is not running."""
+        if self._started:
+            return
+        with self._lock:
+            if not self._started:
+                self._listener.start()
+                self._started = True
+
+    def shutdown(self) -> None:
+        """Write out queued records and stop the writer thread."""
+        with self._lock:
+            if self._started:
+                self._listener.stop()
+                self._started = False
+
+    def close(self) -> None:
+        """Shut down and detach from the application loggers."""
+        self.shutdown()
+        self.logger.removeHandler(self.handler)
+
+    def stats(self) -> dict:
+        """Return the level, queued records and records dropped on a full queue."""
+        return {
+            "level": logging.getLevelName(self.logger.level),
+            "queued": self.queue.qsize(),
+            "max_queue": self.queue.maxsize,
+            "dropped": self.dropped,
+        }
+
+
+class StructuredLogger:
+    """
+    Logger taking an event name and key/value fields instead of a message.
+
+    Nothing is built for records below the configured level. Fields that
+    are expensive or verbose (request headers, OCR text) are passed as a
+    `debug` callable, called only when DEBUG is enabled.
+    """
+
+    def __init__(self, component: str):
+        """
+        Args:
+            component: Short component name (e.g. "PriceService")
+        """
+        self._logger = logging.getLogger(f"{ROOT_LOGGER}.{component}")
+
+    def is_enabled(self, level: int) -> bool:
+        """Whether records at `level` are logged."""
+        return self._logger.isEnabledFor(level)
+
+    def _log(self, level: int, event: str, fields: dict, debug: Optional[Callable[[], dict]], exc_info) -> None:
+        if not self._logger.isEnabledFor(level):
+            return
+        if debug is not None and self._logger.isEnabledFor(logging.DEBUG):
+            fields.update(debug())
+        self._logger.log(level, event, extra={"fields": fields}, exc_info=exc_info)
+
+    def debug(self, event: str, debug: Optional[Callable[[], dict]] = None, **fields) -> None:
+        """Log an event at DEBUG."""
+        self._log(logging.DEBUG, event, fields, debug, None)
+
+    def info(self, event: str, debug: Optional[Callable[[], dict]] = None, **fields) -> None:
+        """Log an event at INFO."""
+        self._log(logging.INFO, event, fields, debug, None)
+
+    def warning(self, event: str, debug: Optional[Callable[[], dict]] = None, exc_info=None, **fields) -> None:
+        """Log an event at WARNING."""
+        self._log(logging.WARNING, event, fields, debug, exc_info)
+
+    def error(self, event: str, debug: Optional[Callable[[], dict]] = None, exc_info=None, **fields) -> None:
+        """Log an event at ERROR."""
+        self._log(logging.ERROR, event, fields, debug, exc_info)
+
+
+def get_logger(component: str) -> StructuredLogger:
+    """Return the structured logger for a component."""
+    return StructuredLogger(component)
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """
+    Parse the `log_route_sample_rates` setting.
+
+    Args:
+        value: Comma-separated `route=rate` pairs (e.g. "/api/v1/health=0")
+
+    Returns:
+        Dict of route template to rate (0-1); malformed entries are skipped
+    """
+    rates = {}
+    for entry in value.split(","):
+        route, _, rate = entry.rpartition("=")
+        try:
+            rates[route.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    rates.pop("", None)
+    return rates
+
+
+class RouteSampler:
+    """Decide which requests get an access log record, by route."""
+
+    def __init__(self, default_rate: float, route_rates: Dict[str, float], rng: Callable[[], float] = random.random):
+        """
+        Args:
+            default_rate: Share of requests logged on routes without their own rate
+            route_rates: Share of requests logged per route template
+            rng: Uniform [0, 1) source
+        """
+        self.default_rate = default_rate
+        self.route_rates = route_rates
+        self.rng = rng
+
+    def sample(self, route: str) -> bool:
+        """Whether to log this request."""
+        rate = self.route_rates.get(route, self.default_rate)
+        return rate >= 1.0 or (rate > 0.0 and self.rng() < rate)
+
+
+# Global log pipeline instance
+log_pipeline = LogPipeline(
+    level=settings.log_level,
+    fmt=settings.log_format,
+    queue_size=settings.log_queue_size,
+)
+atexit.register(log_pipeline.shutdown)
+
+# Global access log sampler instance
+access_log_sampler = RouteSampler(
+    default_rate=settings.log_sample_rate,
+    route_rates=parse_sample_rates(settings.log_route_sample_rates),
+)
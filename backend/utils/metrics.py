@@ -0,0 +1,386 @@
+"""In-process metrics (counters, gauges, histograms) with Prometheus text exposition."""
+import bisect
+import math
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from cache hits to slow Vision calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# One exposition sample: (label values in label-name order, value)
+Sample = Tuple[Tuple[str, ...], float]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    """A named metric family; each combination of label values is one series."""
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        """
+        Args:
+            name: Metric name (Prometheus naming, e.g. "scan_stage_seconds")
+            help_text: One-line description shown in the exposition
+            labelnames: Label names; values are passed to labels() in this order
+        """
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """Return the series for these label values, creating it on first use."""
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            series = self._series[values] = self._new_series()
+        return series
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Return the exposition lines for every series."""
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count (requests, errors, cache hits)."""
+    kind = "counter"
+
+    def _new_series(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled series."""
+        self.labels().inc(amount)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_labels_text(self.labelnames, values)} {_format_value(series.value)}"
+            for values, series in self._series.items()
+        ]
+
+
+class Gauge(Counter):
+    """Value that goes up and down (requests in flight, queue depth)."""
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrement the unlabelled series."""
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        """Set the unlabelled series."""
+        self.labels().set(value)
+
+
+class _HistogramSeries:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in fixed buckets.
+
+    Observing is a bisect and three increments; cumulative bucket counts
+    are only computed when rendered.
+    """
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        """
+        Args:
+            name: Metric name
+            help_text: One-line description shown in the exposition
+            labelnames: Label names
+            buckets: Upper bounds of the buckets (+Inf is implied)
+        """
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self) -> _HistogramSeries:
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Observe a value in the unlabelled series."""
+        self.labels().observe(value)
+
+    def render(self) -> List[str]:
+        lines = []
+        bucket_names = self.labelnames + ("le",)
+        for values, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series.counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_labels_text(bucket_names, values + (_format_value(bound),))} {cumulative}"
+                )
+            labels = _labels_text(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series.sum)}")
+            lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+
+class MetricFamily:
+    """Samples read from existing stats() at scrape time, rendered like a registered metric."""
+
+    def __init__(self, name: str, kind: str, help_text: str, labelnames: Sequence[str], samples: Iterable[Sample]):
+        """
+        Args:
+            name: Metric name
+            kind: "counter" or "gauge"
+            help_text: One-line description
+            labelnames: Label names
+            samples: (label values, value) pairs
+        """
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.samples = list(samples)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_labels_text(self.labelnames, values)} {_format_value(value)}"
+            for values, value in self.samples
+        ]
+
+
+class MetricsRegistry:
+    """Named metrics of this worker, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Return the counter `name`, creating it if needed."""
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Return the gauge `name`, creating it if needed."""
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Return the histogram `name`, creating it if needed."""
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self, extra: Iterable[MetricFamily] = ()) -> str:
+        """
+        Render every metric in the Prometheus text exposition format (0.0.4).
+
+        Args:
+            extra: Families collected at scrape time from other components
+
+        Returns:
+            Exposition text
+        """
+        lines = []
+        for metric in [*self._metrics.values(), *extra]:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class StageTrace:
+    """
+    Time spent in each processing stage of one request.
+
+    Created by the request middleware and found by the stages through a
+    context variable, so the breakdown needs no extra arguments. Repeated
+    stages (e.g. one per image of a batch) add up.
+    """
+    __slots__ = ("started_at", "stages_ms", "open_stage", "open_since")
+
+    def __init__(self):
+        """Start with no stages recorded."""
+        self.started_at = time.perf_counter()
+        self.stages_ms: Dict[str, float] = {}
+        self.open_stage: Optional[str] = None
+        self.open_since = 0.0
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add time spent in a stage."""
+        self.stages_ms[name] = self.stages_ms.get(name, 0.0) + seconds * 1000
+
+    def breakdown(self) -> Dict[str, float]:
+        """Milliseconds per stage so far, rounded to 0.1 ms."""
+        return {name: round(ms, 1) for name, ms in self.stages_ms.items()}
+
+
+_current_trace: ContextVar[Optional[StageTrace]] = ContextVar("stage_trace", default=None)
+
+
+def start_trace() -> StageTrace:
+    """Begin recording stages for the current request (and the tasks it starts)."""
+    trace = StageTrace()
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[StageTrace]:
+    """The current request's stage trace, if one was started."""
+    return _current_trace.get()
+
+
+def stage_breakdown() -> Optional[Dict[str, float]]:
+    """Milliseconds per stage of the current request, or None outside a trace."""
+    trace = _current_trace.get()
+    return trace.breakdown() if trace is not None else None
+
+
+class _StageTimer:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "_StageTimer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        record_stage(self.name, time.perf_counter() - self.started)
+
+
+def stage(name: str) -> _StageTimer:
+    """
+    Time a block as one processing stage.
+
+    Usage:
+        with stage("vision"):
+            text = await ...
+
+    The duration is observed in the scan_stage_seconds histogram and added
+    to the current request's StageTrace, whether or not the block raises.
+    """
+    return _StageTimer(name)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Record time spent in a stage that was timed elsewhere."""
+    scan_stage_seconds.labels(name).observe(seconds)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+def record_stage_since_start(name: str) -> None:
+    """
+    Record the time from the start of the current request as a stage.
+
+    Handlers call this first to time what happens before they run: the
+    upload being received and parsed into form fields.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        record_stage(name, time.perf_counter() - trace.started_at)
+
+
+def open_stage(name: str) -> None:
+    """
+    Start a stage that ends when the response starts (e.g. serialization).
+
+    The request middleware closes it with close_open_stage(), since the
+    handler returns before its response is encoded.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.open_stage = name
+        trace.open_since = time.perf_counter()
+
+
+def close_open_stage(trace: StageTrace) -> None:
+    """Record the stage opened with open_stage(), if any."""
+    if trace.open_stage is not None:
+        scan_stage_seconds.labels(trace.open_stage).observe(time.perf_counter() - trace.open_since)
+        trace.open_stage = None
+
+
+# Global metrics registry instance
+metrics_registry = MetricsRegistry()
+
+scan_stage_seconds = metrics_registry.histogram(
+    "scan_stage_seconds",
+    "Time spent in each scan processing stage",
+    ("stage",),
+)
+http_requests_total = metrics_registry.counter(
+    "http_requests_total",
+    "HTTP requests handled, by method, route template and status code",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to its response starting",
+    ("method", "route"),
+)
+http_requests_in_flight = metrics_registry.gauge(
+    "http_requests_in_flight",
+    "HTTP requests being handled",
+)
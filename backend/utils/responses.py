@@ -0,0 +1,30 @@
+"""Response classes for scan results."""
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+def encode_model(model: BaseModel) -> bytes:
+    """Encode a model as compact UTF-8 JSON, exactly as ModelResponse does."""
+    return orjson.dumps(model.model_dump(mode="json"))
+
+
+class ModelResponse(Response):
+    """
+    JSON response encoded directly from a pydantic model with orjson.
+
+    Returning a model from a handler with `response_model` makes FastAPI
+    validate it again and encode it with the generic JSON encoder. A
+    handler that has just built the model can return it in this response
+    instead; keep `response_model` on the route for the OpenAPI schema.
+
+    The body is byte-identical to FastAPI's: the model's JSON-mode dump,
+    compact, with non-ASCII text as UTF-8. The one difference is floats
+    below 1e-4 or from 1e16, which orjson writes in a shorter exponent
+    form (`1e-5` for `1e-05`, `1e16` for `1e+16`); scan responses carry
+    none.
+    """
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return encode_model(content)
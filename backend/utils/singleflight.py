@@ -0,0 +1,67 @@
+"""Request coalescing for concurrent identical async calls."""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one in-flight call.
+
+    The first caller for a key starts the call. Every caller that arrives
+    while it is running awaits the same task and receives its result or its
+    exception. Once the call finishes the key is forgotten, so later calls
+    start fresh (caching is left to the caller).
+    """
+
+    def __init__(self):
+        """Initialize with no in-flight calls."""
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn` once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the call (e.g. the upstream query)
+            fn: Zero-argument coroutine function performing the call
+
+        Returns:
+            The shared result of `fn`
+
+        Raises:
+            Whatever `fn` raised, re-raised to every waiting caller
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.coalesced += 1
+
+        # Shield so one caller being cancelled does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Drop a finished call and mark its exception as retrieved."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        """Return call, execution and coalescing counters."""
+        return {
+            "calls": self.calls,
+            "upstream_executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,118 @@
+"""Single-pass multi-term matching over text."""
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Accented letters OCR returns for card text ("Pokémon")
+_ACCENTS = {"e": "éèê", "a": "áà", "i": "í", "o": "ó", "u": "ú"}
+_FOLD = str.maketrans({accented: plain for plain, group in _ACCENTS.items() for accented in group})
+
+
+def fold(text: str) -> str:
+    """Lowercase text and strip the accents the term lists do not use."""
+    return text.lower().translate(_FOLD)
+
+
+def _char_pattern(char: str) -> str:
+    # Accents are matched in the pattern, so scanned text is only lowercased
+    accents = _ACCENTS.get(char)
+    return f"[{char}{accents}]" if accents else re.escape(char)
+
+
+class TermMatch(NamedTuple):
+    """A term found in text."""
+    kind: str
+    term: str
+    priority: int
+    start: int
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Render a character trie as a regex; longer continuations come first."""
+    end = "" in node
+    branches = [_char_pattern(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if end:
+        return "(?:" + body + ")?"
+    return body
+
+
+class TermMatcher:
+    """
+    Finds every occurrence of a set of terms in one scan of the text.
+
+    Terms are folded into a character trie, and the trie is compiled into a
+    single regular expression. A regex built that way behaves like an
+    Aho-Corasick automaton walk: at each position at most one trie branch
+    is followed, so the cost grows with the text length rather than with
+    the number of terms, and the scan runs in the C regex engine. Matches
+    are whole words and the longest term at a position wins ("Base Set 2"
+    over "Base Set").
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, str]]):
+        """
+        Args:
+            terms: (kind, term) pairs; a term's priority within its kind is
+                its position in this sequence
+        """
+        self._terms: Dict[str, Tuple[str, str, int]] = {}
+        priorities: Dict[str, int] = {}
+        trie: Dict[str, dict] = {}
+
+        for kind, term in terms:
+            key = fold(term)
+            if not key or key in self._terms:
+                continue
+            priority = priorities.get(kind, 0)
+            priorities[kind] = priority + 1
+            self._terms[key] = (kind, term, priority)
+
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        self.pattern: Optional[re.Pattern] = None
+        if self._terms:
+            self.pattern = re.compile(r"(?<![a-z0-9])" + _trie_pattern(trie) + r"(?![a-z0-9])")
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def scan(self, text: str) -> List[TermMatch]:
+        """
+        Find all terms in `text`.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Matches in order of appearance
+        """
+        if self.pattern is None:
+            return []
+        terms = self._terms
+        matches = []
+        for found in self.pattern.finditer(text.lower()):
+            kind, term, priority = terms[fold(found.group())]
+            matches.append(TermMatch(kind, term, priority, found.start()))
+        return matches
+
+    def best(self, text: str) -> Dict[str, str]:
+        """
+        Return the highest-priority term of each kind found in `text`.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Dict of kind -> term, for kinds with at least one match
+        """
+        best: Dict[str, TermMatch] = {}
+        for match in self.scan(text):
+            current = best.get(match.kind)
+            if current is None or match.priority < current.priority:
+                best[match.kind] = match
+        return {kind: match.term for kind, match in best.items()}
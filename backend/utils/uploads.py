@@ -0,0 +1,250 @@
+"""Bounded, chunked reading of image uploads."""
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional, Tuple
+
+from fastapi import UploadFile
+
+from config import settings
+from utils.error_handlers import InvalidImageException, ServerBusyException
+
+# Leading bytes of the image formats Vision and Pillow both accept
+IMAGE_SIGNATURES: Tuple[Tuple[bytes, str], ...] = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+)
+
+# Bytes needed to recognise every signature above (WebP needs 12)
+SIGNATURE_BYTES = 12
+
+# Allowance for multipart boundaries and part headers around each image
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def detect_image_type(header: bytes) -> Optional[str]:
+    """
+    Identify an image format from its first bytes.
+
+    Args:
+        header: At least the first SIGNATURE_BYTES of the file
+
+    Returns:
+        Format name (e.g. "jpeg"), or None if not a supported image
+    """
+    for signature, kind in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return kind
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+class ByteBudget:
+    """
+    Global budget of upload bytes held in memory at once.
+
+    Callers reserve the bytes they are about to buffer and release them when
+    the scan finishes. Reservations that do not fit wait in FIFO order for up
+    to `wait_timeout_s`, then are rejected; reservations larger than the
+    whole budget are rejected at once.
+    """
+
+    def __init__(self, capacity: int, wait_timeout_s: float):
+        """
+        Args:
+            capacity: Maximum bytes reserved at any time
+            wait_timeout_s: How long a reservation may queue before rejection
+        """
+        self.capacity = capacity
+        self.wait_timeout_s = wait_timeout_s
+        self.in_use = 0
+        self.peak_in_use = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+
+        self.reservations = 0
+        self.waited = 0
+        self.rejected = 0
+        self.oversized = 0
+
+    @asynccontextmanager
+    async def reserve(self, size: int) -> AsyncIterator[None]:
+        """
+        Hold `size` bytes of the budget for the duration of the block.
+
+        Raises:
+            InvalidImageException: If `size` is larger than the whole budget
+            ServerBusyException: If the bytes cannot be reserved in time
+        """
+        if size > self.capacity:
+            self.oversized += 1
+            raise InvalidImageException(
+                "Upload too large. It exceeds the server's upload memory budget.",
+                details={"size_bytes": size, "capacity_bytes": self.capacity}
+            )
+        await self._acquire(size)
+        try:
+            yield
+        finally:
+            self._release(size)
+
+    async def _acquire(self, size: int) -> None:
+        if not self._waiters and self.in_use + size <= self.capacity:
+            self._take(size)
+            return
+
+        self.waited += 1
+        future = asyncio.get_running_loop().create_future()
+        waiter = (size, future)
+        self._waiters.append(waiter)
+        # asyncio.wait, unlike wait_for, never swallows the caller's
+        # cancellation, so a grant is always either used or given back
+        try:
+            await asyncio.wait((future,), timeout=self.wait_timeout_s)
+        except asyncio.CancelledError:
+            if future.done():
+                # Granted to a caller that went away; give the bytes back
+                self._release(size)
+            else:
+                self._waiters.remove(waiter)
+                self._wake()
+            raise
+        if future.done():
+            return
+
+        self._waiters.remove(waiter)
+        self.rejected += 1
+        self._wake()
+        raise ServerBusyException(
+            "Server is busy processing other uploads. Please try again shortly.",
+            details={"retry_after_s": 1}
+        )
+
+    def _take(self, size: int) -> None:
+        self.in_use += size
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        self.reservations += 1
+
+    def _release(self, size: int) -> None:
+        self.in_use -= size
+        self._wake()
+
+    def _wake(self) -> None:
+        """Grant queued reservations, oldest first, while they fit."""
+        while self._waiters:
+            size, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if self.in_use + size > self.capacity:
+                break
+            self._waiters.popleft()
+            self._take(size)
+            future.set_result(None)
+
+    def stats(self) -> dict:
+        """Return budget usage counters."""
+        return {
+            "capacity_bytes": self.capacity,
+            "in_use_bytes": self.in_use,
+            "peak_in_use_bytes": self.peak_in_use,
+            "waiting": len(self._waiters),
+            "reservations": self.reservations,
+            "waited": self.waited,
+            "rejected": self.rejected,
+            "oversized": self.oversized,
+        }
+
+
+def batch_image_limit() -> int:
+    """
+    Most images accepted in one batch scan.
+
+    A batch reserves room for its largest possible upload in the upload
+    budget, so BATCH_MAX_IMAGES is capped at the number of maximum-size
+    images that fit in the budget.
+    """
+    fit = settings.upload_memory_budget_bytes // (settings.max_upload_bytes + MULTIPART_OVERHEAD_BYTES)
+    return max(1, min(settings.batch_max_images, fit))
+
+
+async def read_image_upload(upload: UploadFile, max_bytes: int, chunk_size: int = 64 * 1024) -> bytearray:
+    """
+    Read an uploaded image in chunks into a single buffer.
+
+    The upload is rejected before reading when its parsed size is already
+    over the limit, as soon as the running total passes the limit, or when
+    the first bytes are not a supported image signature. When the size is
+    known the buffer is allocated once and filled in place.
+
+    Args:
+        upload: Uploaded file
+        max_bytes: Maximum accepted size in bytes
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Image bytes in a single bytearray
+
+    Raises:
+        InvalidImageException: If the upload is too large or not an image
+    """
+    max_mb = max_bytes // (1024 * 1024)
+    if upload.size is not None and upload.size > max_bytes:
+        raise InvalidImageException(
+            f"Image file too large. Maximum size is {max_mb}MB.",
+            details={"size_bytes": upload.size}
+        )
+
+    known_size = upload.size if upload.size else None
+    buffer = bytearray(known_size) if known_size else bytearray()
+    view = memoryview(buffer) if known_size else None
+    received = 0
+
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+
+            # Reject non-images on the first chunk, before buffering the rest
+            if received == 0 and len(chunk) >= SIGNATURE_BYTES and detect_image_type(chunk) is None:
+                raise InvalidImageException(
+                    "Invalid image format. Please upload a JPEG or PNG image.",
+                    details={"content_type": upload.content_type}
+                )
+
+            end = received + len(chunk)
+            if end > max_bytes or (known_size and end > known_size):
+                raise InvalidImageException(
+                    f"Image file too large. Maximum size is {max_mb}MB.",
+                    details={"size_bytes": end}
+                )
+
+            if view is not None:
+                view[received:end] = chunk
+            else:
+                buffer += chunk
+            received = end
+    finally:
+        if view is not None:
+            view.release()
+
+    if received == 0 or detect_image_type(bytes(buffer[:SIGNATURE_BYTES])) is None:
+        raise InvalidImageException(
+            "Invalid image format. Please upload a JPEG or PNG image.",
+            details={"content_type": upload.content_type}
+        )
+
+    if known_size and received < known_size:
+        del buffer[received:]
+    return buffer
+
+
+# Global per-worker upload memory budget
+upload_budget = ByteBudget(
+    capacity=settings.upload_memory_budget_bytes,
+    wait_timeout_s=settings.upload_budget_wait_ms / 1000
+)